@@ -102,60 +102,70 @@ class Domain(CredentialsAction):
 		get = get_action('get')
 		ret = []
 		app_ldap_objects = search_objects('appcenter/app', lo, pos)
+		installed_versions = self._get_installed_versions(app_ldap_objects)
+		apps_cache = Apps()
+		candidates = {}
+		local_fqdn = get_local_fqdn()
 		for app in apps:
 			if not app:
 				ret.append(None)
 			else:
 				app_dict = get.to_dict(app)
-				app_dict['installations'] = self._get_installations(app, hosts, app_ldap_objects, lo, pos)
+				app_dict['installations'] = self._get_installations(app, hosts, installed_versions, apps_cache, candidates, local_fqdn)
 				app_dict['is_installed_anywhere'] = any(inst['version'] for inst in app_dict['installations'].itervalues())
 				app_dict['fully_loaded'] = True
 				ret.append(app_dict)
 		return ret
 
-	def _get_installations(self, app, hosts, app_ldap_objects, lo, pos):
+	def _get_installed_versions(self, app_ldap_objects):
+		# (app id, fqdn) -> version of the first matching appcenter/app object
+		ret = {}
+		for app_obj in app_ldap_objects:
+			app_obj_version = app_obj.info.get('version')
+			app_obj_id = app_obj.info.get('id')[:-len(app_obj_version) - 1]
+			for fqdn in app_obj.info.get('server', []):
+				ret.setdefault((app_obj_id, fqdn), app_obj_version)
+		return ret
+
+	def _get_installations(self, app, hosts, installed_versions, apps_cache, candidates, local_fqdn):
 		ret = {}
 		local_ucs_version = ucr_get('version/version')
+		candidate = self._find_candidate(apps_cache, candidates, app) or app
 		for host in hosts:
-			candidate = self._find_latest_app_version(app)
 			role = host.info.get('serverRole')[0]
 			description = host.info.get('description')
 			remote_ucs_version = host.info.get('operatingSystemVersion')
-			is_local = host.info.get('fqdn') == get_local_fqdn()
+			is_local = host.info.get('fqdn') == local_fqdn
 			if remote_ucs_version:
 				remote_ucs_version = re.sub('.*([0-9]+\.[0-9]+).*', '\\1', remote_ucs_version)
 			ip = host.info.get('ip')  # list
-			version = None
+			version = installed_versions.get((app.id, host.info.get('fqdn')))
 			update_available = None
-			for app_obj in app_ldap_objects:
-				app_obj_version = app_obj.info.get('version')
-				app_obj_id = app_obj.info.get('id')[:-len(app_obj_version) - 1]
-				if app_obj_id == app.id:
-					if host.info.get('fqdn') in app_obj.info.get('server', []):
-						version = app_obj_version
-						break
+			host_candidate = candidate
 			if local_ucs_version != remote_ucs_version:
 				# unable to compute directly... better treat as not available
 				update_available = False
 			elif version:
-				remote_app = Apps().find(app.id, app_version=version)
+				remote_app = apps_cache.find(app.id, app_version=version)
 				if remote_app:
 					prevent_docker = None
 					if not is_local:
 						prevent_docker = True
-					candidate = Apps().find_candidate(remote_app, prevent_docker=prevent_docker) or remote_app
-					update_available = remote_app < candidate
+					host_candidate = self._find_candidate(apps_cache, candidates, remote_app, prevent_docker) or remote_app
+					update_available = remote_app < host_candidate
 			ret[host['name']] = {
 				'ucs_version': remote_ucs_version,
 				'version': version,
 				'update_available': update_available,
-				'candidate_version': candidate.version,
+				'candidate_version': host_candidate.version,
 				'description': description,
 				'ip': ip,
 				'role': role,
 			}
 		return ret
 
-	def _find_latest_app_version(self, app):
-		candidate = Apps().find_candidate(app)
-		return candidate or app
+	def _find_candidate(self, apps_cache, candidates, app, prevent_docker=None):
+		key = app.id, app.version, app.component_id, prevent_docker
+		if key not in candidates:
+			candidates[key] = apps_cache.find_candidate(app, prevent_docker=prevent_docker)
+		return candidates[key]
@@ -35,16 +35,13 @@
 import os
 import os.path
 import shutil
-from math import ceil
 from argparse import SUPPRESS
-import time
-from threading import Thread
 from glob import glob
 from gzip import open as gzip_open
 from json import loads
 import tarfile
 from urlparse import urlsplit
-from urllib2 import quote, Request, HTTPError
+from urllib2 import quote
 
 from univention.config_registry import handler_commit
 
@@ -52,8 +49,8 @@ from univention.appcenter.log import catch_stdout
 from univention.appcenter.app import LOCAL_ARCHIVE_DIR
 from univention.appcenter.app_cache import Apps, AppCenterCache
 from univention.appcenter.actions import UniventionAppAction, Abort, possible_network_error
-from univention.appcenter.utils import urlopen, get_md5_from_file, gpg_verify, container_mode, mkdir
-from univention.appcenter.ucr import ucr_save, ucr_is_false
+from univention.appcenter.utils import Downloader, DownloadJob, get_md5_from_file, gpg_verify, container_mode, mkdir
+from univention.appcenter.ucr import ucr_save, ucr_get, ucr_is_false
 
 
 class Update(UniventionAppAction):
@@ -67,6 +64,7 @@ class Update(UniventionAppAction):
 		self._ucs_version = None
 		self._appcenter_server = None
 		self._files_downloaded = {}
+		self._downloader = None
 
 	def setup_parser(self, parser):
 		parser.add_argument('--ucs-version', help=SUPPRESS)
@@ -74,34 +72,39 @@ class Update(UniventionAppAction):
 		parser.add_argument('--cache-dir', help=SUPPRESS)
 
 	def main(self, args):
-		something_changed = False
-		for app_cache in self._app_caches(args):
-			# first of all, set up local cache
-			mkdir(app_cache.get_cache_dir())
-			if self._extract_local_archive(app_cache):
-				something_changed = True
-		for appcenter_cache in self._appcenter_caches(args):
-			# download meta files like index.json
-			mkdir(appcenter_cache.get_cache_dir())
-			if self._download_supra_files(appcenter_cache):
-				appcenter_cache.clear_cache()
-				something_changed = True
-		for app_cache in self._app_caches(args):
-			# try it one more time (ucs.ini may have changed)
-			mkdir(app_cache.get_cache_dir())
-			if self._extract_local_archive(app_cache):
-				something_changed = True
-			# download apps based on meta files
-			if self._download_apps(app_cache):
-				app_cache.clear_cache()
-				something_changed = True
-		if something_changed:
-			apps_cache = Apps()
-			for app in apps_cache.get_all_locally_installed_apps():
-				newest_app = apps_cache.find_candidate(app) or app
-				if app < newest_app:
-					ucr_save({app.ucr_upgrade_key: 'yes'})
-			self._update_local_files()
+		try:
+			something_changed = False
+			for app_cache in self._app_caches(args):
+				# first of all, set up local cache
+				mkdir(app_cache.get_cache_dir())
+				if self._extract_local_archive(app_cache):
+					something_changed = True
+			for appcenter_cache in self._appcenter_caches(args):
+				# download meta files like index.json
+				mkdir(appcenter_cache.get_cache_dir())
+				if self._download_supra_files(appcenter_cache):
+					appcenter_cache.clear_cache()
+					something_changed = True
+			for app_cache in self._app_caches(args):
+				# try it one more time (ucs.ini may have changed)
+				mkdir(app_cache.get_cache_dir())
+				if self._extract_local_archive(app_cache):
+					something_changed = True
+				# download apps based on meta files
+				if self._download_apps(app_cache):
+					app_cache.clear_cache()
+					something_changed = True
+			if something_changed:
+				apps_cache = Apps()
+				for app in apps_cache.get_all_locally_installed_apps():
+					newest_app = apps_cache.find_candidate(app) or app
+					if app < newest_app:
+						ucr_save({app.ucr_upgrade_key: 'yes'})
+				self._update_local_files()
+		finally:
+			if self._downloader is not None:
+				self._downloader.close()
+				self._downloader = None
 
 	def get_app_info(self, app):
 		json_apps = self._load_index_json(app.get_app_cache_obj())
@@ -129,46 +132,65 @@ class Update(UniventionAppAction):
 				else:
 					yield app_cache
 
-	def _get_etags(self, etags_file):
+	def _get_downloader(self):
+		if self._downloader is None:
+			self._downloader = Downloader(proxy=ucr_get('proxy/http'))
+		return self._downloader
+
+	def _get_validators(self, cache_dir):
 		ret = {}
 		try:
-			with open(etags_file, 'rb') as f:
+			with open(os.path.join(cache_dir, '.etags'), 'rb') as f:
 				for line in f:
+					fields = line.rstrip('\n').split('\t')
+					if len(fields) == 2:
+						fields.append('')
 					try:
-						fname, etag = line.split('\t')
+						fname, etag, last_modified = fields
 					except ValueError:
 						pass
 					else:
-						ret[fname] = etag.rstrip('\n')
+						ret[fname] = etag or None, last_modified or None
 		except EnvironmentError:
 			pass
 		return ret
 
-	def _save_etags(self, cache, etags):
-		etags_file = os.path.join(cache.get_cache_dir(), '.etags')
+	def _save_validators(self, cache_dir, validators):
+		etags_file = os.path.join(cache_dir, '.etags')
 		with open(etags_file, 'wb') as f:
-			for fname, etag in etags.iteritems():
-				f.write('%s\t%s\n' % (fname, etag))
+			for fname, (etag, last_modified) in validators.iteritems():
+				if etag or last_modified:
+					f.write('%s\t%s\t%s\n' % (fname, etag or '', last_modified or ''))
 
 	def _download_supra_files(self, appcenter_cache):
 		return self._download_files(appcenter_cache, ['categories.ini', 'rating.ini', 'license_types.ini', 'ucs.ini'])
 
+	@possible_network_error
 	def _download_files(self, cache, filenames):
-		updated = False
 		server = cache.get_server()
 		cache_dir = cache.get_cache_dir()
-		etags_file = os.path.join(cache_dir, '.etags')
-		present_etags = self._get_etags(etags_file)
+		validators = self._get_validators(cache_dir)
 		ucs_version = None
 		if hasattr(cache, 'get_ucs_version'):
 			ucs_version = cache.get_ucs_version()
+		jobs = []
 		for filename in filenames:
-			etag = present_etags.get(filename)
-			new_etag = self._download_file(server, filename, cache_dir, etag, ucs_version)
-			if new_etag:
-				present_etags[filename] = new_etag
+			url = os.path.join(server, 'meta-inf', ucs_version or '', filename)
+			etag, last_modified = validators.get(filename, (None, None))
+			self.log('Downloading "%s"...' % url)
+			jobs.append(DownloadJob(url, os.path.join(cache_dir, '.%s' % filename), etag=etag, last_modified=last_modified))
+		self._get_downloader().download(jobs)
+		updated = False
+		for filename, job in zip(filenames, jobs):
+			if job.modified:
+				validators[filename] = job.etag, job.last_modified
 				updated = True
-		self._save_etags(cache, present_etags)
+			elif not job.error:
+				self.debug('  ... %s Not Modified' % filename)
+		self._save_validators(cache_dir, validators)
+		for job in jobs:
+			if job.error:
+				raise job.error
 		return updated
 
 	def _download_apps(self, app_cache):
@@ -183,46 +205,14 @@ class Update(UniventionAppAction):
 		num_files_threshold = 5
 		if num_files_to_be_downloaded > num_files_threshold:
 			files_to_download = self._download_archive(app_cache, files_to_download)
-		threads = []
-		max_threads = 10
-		files_per_thread = max(num_files_threshold, int(ceil(float(len(files_to_download)) / max_threads)))
-		while files_to_download:
-			# normally, this should be only one thread as
-			# _download_archive() is used if many files are to be downloaded
-			# but if all.tar.gz fails, everything needs to be downloaded
-			# don't do this at once as this opens 100 connections.
-			files_to_download_in_thread, files_to_download = files_to_download[:files_per_thread], files_to_download[files_per_thread:]
-			self.log('Starting to download %d file(s) directly' % len(files_to_download_in_thread))
-			thread = Thread(target=self._download_directly, args=(app_cache, files_to_download_in_thread,))
-			thread.start()
-			threads.append(thread)
-			time.sleep(0.1)  # wait 100 milliseconds so that not all threads start at the same time
-		for thread in threads:
-			thread.join()
+		if files_to_download:
+			# normally, these are only a few files as _download_archive()
+			# is used if many files are to be downloaded. but if all.tar.gz
+			# fails, everything needs to be downloaded
+			self.log('Starting to download %d file(s) directly' % len(files_to_download))
+			self._download_directly(app_cache, files_to_download)
 		return something_changed_remotely
 
-	@possible_network_error
-	def _download_file(self, base_url, filename, cache_dir, etag, ucs_version=None):
-		url = os.path.join(base_url, 'meta-inf', ucs_version or '', filename)
-		self.log('Downloading "%s"...' % url)
-		headers = {}
-		if etag:
-			headers['If-None-Match'] = etag
-		request = Request(url, headers=headers)
-		try:
-			response = urlopen(request)
-		except HTTPError as exc:
-			if exc.getcode() == 304:
-				self.debug('  ... Not Modified')
-				return None
-			raise
-		etag = response.headers.get('etag')
-		content = response.read()
-		with open(os.path.join(cache_dir, '.%s' % filename), 'wb') as f:
-			f.write(content)
-		return etag
-
-	@possible_network_error
 	def _download_archive(self, app_cache, files_to_download):
 		# a lot of files to download? Do not download them
 		#   one at a time. Download the full archive!
@@ -234,9 +224,12 @@ class Update(UniventionAppAction):
 			# using StringIO and GZip objects has issues
 			# with "empty" files in tar.gz archives, i.e.
 			# doublets like .png logos
-			with open(os.path.join(app_cache.get_cache_dir(), 'all.tar.gz'), 'wb') as f:
-				f.write(urlopen(archive_url).read())
-			archive = tarfile.open(f.name, 'r:*')
+			archive_filename = os.path.join(app_cache.get_cache_dir(), 'all.tar.gz')
+			job = DownloadJob(archive_url, archive_filename)
+			self._get_downloader().download([job])
+			if job.error:
+				raise job.error
+			archive = tarfile.open(archive_filename, 'r:*')
 			try:
 				for filename_url, filename, remote_md5sum in files_to_download:
 					self.debug('Extracting %s' % filename)
@@ -255,35 +248,32 @@ class Update(UniventionAppAction):
 						files_still_to_download.append((filename_url, filename, remote_md5sum))
 			finally:
 				archive.close()
-				os.unlink(f.name)
+				os.unlink(archive_filename)
 			return files_still_to_download
 		except Exception as exc:
 			self.fatal('Could not read "%s": %s' % (archive_url, exc))
 			return files_to_download
 
-	@possible_network_error
 	def _download_directly(self, app_cache, files_to_download):
+		cache_dir = app_cache.get_cache_dir()
+		validators = self._get_validators(cache_dir)
+		jobs = []
 		for filename_url, filename, remote_md5sum in files_to_download:
 			# dont forget to quote: 'foo & bar.ini' -> 'foo%20&%20bar.ini'
 			# but dont quote https:// -> https%3A//
 			path = quote(urlsplit(filename_url).path)
 			filename_url = '%s%s' % (app_cache.get_server(), path)
-
-			cached_filename = os.path.join(app_cache.get_cache_dir(), filename)
-
+			etag, last_modified = validators.get(filename, (None, None))
 			self.debug('Downloading %s' % filename_url)
-			try:
-				urlcontent = urlopen(filename_url)
-			except Exception as e:
-				self.fatal('Error downloading %s: %s' % (filename_url, e))
-			else:
-				with open(cached_filename, 'wb') as f:
-					f.write(urlcontent.read())
-				local_md5sum = get_md5_from_file(cached_filename)
-				if local_md5sum != remote_md5sum:
-					self.fatal('Checksum for %s should be %r but was %r! Rather removing this file...' % (filename, remote_md5sum, local_md5sum))
-					os.unlink(cached_filename)
-				self._files_downloaded[filename] = remote_md5sum
+			jobs.append(DownloadJob(filename_url, os.path.join(cache_dir, filename), remote_md5sum, etag, last_modified))
+		self._get_downloader().download(jobs)
+		for (filename_url, filename, remote_md5sum), job in zip(files_to_download, jobs):
+			if job.error:
+				self.fatal('Error downloading %s: %s' % (job.url, job.error))
+				continue
+			validators[filename] = job.etag, job.last_modified
+			self._files_downloaded[filename] = remote_md5sum
+		self._save_validators(cache_dir, validators)
 
 	def _update_local_files(self):
 		self.debug('Updating app files...')
@@ -117,6 +117,14 @@ class AppAttribute(UniventionMetaInfo):
 		self.localisable_by_file = localisable_by_file
 		self.strict = strict
 
+	def __get__(self, instance, owner):
+		# only reached if the instance has no value of its own (yet),
+		# i.e. for Apps created by App.from_cache() that were not yet
+		# decoded
+		if instance is not None and instance._decode_cached_values():
+			return getattr(instance, self.name)
+		return self
+
 	def test_regex(self, regex, value):
 		if value is not None and not re.match(regex, value):
 			raise ValueError('Invalid format')
@@ -894,6 +902,33 @@ class App(object):
 			self.auto_mod_proxy = False
 			self.ports_redirection = []
 
+	@classmethod
+	def from_cache(cls, attr_names, attr_values, cache=None):
+		'''Creates an App from values stored in an AppCache without
+		calling __init__. The values are only passed to __init__ when
+		the first of the attributes is accessed. id, version,
+		component_id and supported_ucs_versions are set right away as
+		they are needed for indexing and sorting the apps of a cache,
+		ucs_version as it is set by __init__ for compatibility.'''
+		app = cls.__new__(cls)
+		app.set_app_cache_obj(cache)
+		app._cached_values = attr_names, attr_values, cache
+		for attr_name, attr_value in zip(attr_names, attr_values):
+			if attr_name in ('id', 'version', 'component_id', 'supported_ucs_versions'):
+				app.__dict__[attr_name] = attr_value
+		app.__dict__['ucs_version'] = app.get_ucs_version()  # compatibility
+		return app
+
+	def _decode_cached_values(self):
+		cached_values = self.__dict__.pop('_cached_values', None)
+		if cached_values is None:
+			return False
+		attr_names, attr_values, cache = cached_values
+		kwargs = dict(zip(attr_names, attr_values))
+		kwargs['_cache'] = cache
+		self.__init__(**kwargs)
+		return True
+
 	def attrs_dict(self):
 		ret = {}
 		for attr in self._attrs:
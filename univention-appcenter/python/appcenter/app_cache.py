@@ -39,7 +39,7 @@ import os.path
 from contextlib import contextmanager
 from time import sleep
 from glob import glob
-from json import dump, load
+import marshal
 from urlparse import urlsplit
 from distutils.version import LooseVersion
 
@@ -55,16 +55,53 @@ CACHE_DIR = '/var/cache/univention-appcenter'
 cache_logger = get_base_logger().getChild('cache')
 
 
+class _AppIndex(object):
+	def __init__(self, apps):
+		self.by_id = {}
+		self.by_version = {}
+		self.by_component_id = {}
+		self.latest = {}
+		for app in apps:
+			self.by_id.setdefault(app.id, []).append(app)
+			self.by_version.setdefault((app.id, app.version), app)
+			self.by_component_id.setdefault(app.component_id, app)
+		for app_id, id_apps in self.by_id.iteritems():
+			latest_app = max(id_apps)
+			for app in id_apps:
+				if app == latest_app:
+					self.latest[app_id] = app
+					break
+		self.ids = sorted(self.by_id)
+
+
 class _AppCache(object):
+	_app_index = None
+	_app_index_generation = None
+
 	def get_every_single_app(self):
 		raise NotImplementedError()
 
+	def _get_generation(self):
+		# identifies the current content of get_every_single_app(). None
+		# means that the content cannot be identified and the index is
+		# rebuilt on every use
+		return None
+
+	def _get_index(self):
+		generation = self._get_generation()
+		if self._app_index is None or generation is None or generation != self._app_index_generation:
+			self._app_index = _AppIndex(self.get_every_single_app())
+			self._app_index_generation = generation
+		return self._app_index
+
+	def _installed_or_latest(self, index, app_id):
+		for app in index.by_id.get(app_id, []):
+			if app.is_installed():
+				return app
+		return index.latest.get(app_id)
+
 	def get_all_apps_with_id(self, app_id):
-		ret = []
-		for app in self.get_every_single_app():
-			if app.id == app_id:
-				ret.append(app)
-		return ret
+		return list(self._get_index().by_id.get(app_id, []))
 
 	def get_all_locally_installed_apps(self):
 		ret = []
@@ -74,21 +111,12 @@ class _AppCache(object):
 		return ret
 
 	def find(self, app_id, app_version=None, latest=False):
-		apps = self.get_all_apps_with_id(app_id)
+		index = self._get_index()
 		if app_version:
-			for app in apps:
-				if app.version == app_version:
-					return app
-			return None
+			return index.by_version.get((app_id, app_version))
 		elif not latest:
-			for app in apps:
-				if app.is_installed():
-					return app
-		if apps:
-			latest_app = sorted(apps)[-1]
-			for app in apps:
-				if app == latest_app:
-					return app
+			return self._installed_or_latest(index, app_id)
+		return index.latest.get(app_id)
 
 	def find_candidate(self, app, prevent_docker=None):
 		if prevent_docker is None:
@@ -108,22 +136,19 @@ class _AppCache(object):
 			return _app
 
 	def get_all_apps(self):
+		index = self._get_index()
 		ret = []
-		ids = set()
-		for app in self.get_every_single_app():
-			ids.add(app.id)
-		for app_id in sorted(ids):
-			ret.append(self.find(app_id))
+		for app_id in index.ids:
+			ret.append(self._installed_or_latest(index, app_id))
 		return ret
 
 	def find_by_component_id(self, component_id):
-		for app in self.get_every_single_app():
-			if app.component_id == component_id:
-				return app
+		return self._get_index().by_component_id.get(component_id)
 
 
 class AppCache(_AppCache):
 	_app_cache_cache = {}
+	_code_modified = {}
 
 	def __init__(self, app_class=None, ucs_version=None, server=None, locale=None, cache_dir=None):
 		self._app_class = app_class
@@ -136,6 +161,7 @@ class AppCache(_AppCache):
 		self._cache_file = None
 		self._cache = []
 		self._cache_modified = None
+		self._cache_generation = 0
 		self._lock = False
 
 	def copy(self, app_class=None, ucs_version=None, server=None, locale=None, cache_dir=None):
@@ -180,7 +206,7 @@ class AppCache(_AppCache):
 		if self._cache_file is None:
 			cache_dir = self.get_cache_dir()
 			locale = self.get_locale()
-			self._cache_file = os.path.join(cache_dir, '.apps.%s.json' % locale)
+			self._cache_file = os.path.join(cache_dir, '.apps.%s.marshal' % locale)
 		return self._cache_file
 
 	@classmethod
@@ -196,7 +222,7 @@ class AppCache(_AppCache):
 
 	def _invalidate_cache_file(self):
 		cache_dir = self.get_cache_dir()
-		for cache_file in glob(os.path.join(cache_dir, '.*apps*.json')):
+		for cache_file in glob(os.path.join(cache_dir, '.*apps*.json')) + glob(os.path.join(cache_dir, '.*apps*.marshal')):
 			try:
 				os.unlink(cache_file)
 			except EnvironmentError:
@@ -205,10 +231,15 @@ class AppCache(_AppCache):
 	def _save_cache(self):
 		cache_file = self.get_cache_file()
 		if cache_file:
+			attr_names = tuple(attr.name for attr in self.get_app_class()._attrs)
+			cache = {
+				'attrs': attr_names,
+				'apps': [tuple(getattr(app, attr_name) for attr_name in attr_names) for app in self._cache],
+			}
 			try:
 				with open(cache_file, 'wb') as fd:
-					dump([app.attrs_dict() for app in self._cache], fd, indent=2)
-			except (IOError, TypeError):
+					marshal.dump(cache, fd)
+			except (IOError, ValueError):
 				return False
 			else:
 				cache_modified = os.stat(cache_file).st_mtime
@@ -220,29 +251,52 @@ class AppCache(_AppCache):
 		if cache_file:
 			try:
 				cache_modified = os.stat(cache_file).st_mtime
+				code_modified = self._get_code_modified()
+				if code_modified is None or cache_modified < code_modified:
+					return None
 				for master_file in self._relevant_master_files():
 					master_file_modified = os.stat(master_file).st_mtime
 					if cache_modified < master_file_modified:
 						return None
 				with open(cache_file, 'rb') as fd:
-					cache = load(fd)
+					cache = marshal.load(fd)
 				self._cache_modified = cache_modified
-			except (OSError, IOError, ValueError):
+			except (OSError, IOError, ValueError, EOFError, TypeError):
 				return None
 			else:
 				try:
-					cache_attributes = set(cache[0].keys())
-				except (TypeError, AttributeError, IndexError, KeyError):
+					cache_attributes = cache['attrs']
+					cached_apps = cache['apps']
+				except (TypeError, KeyError):
 					return None
 				else:
-					code_attributes = set(attr.name for attr in self.get_app_class()._attrs)
+					code_attributes = tuple(attr.name for attr in self.get_app_class()._attrs)
 					if cache_attributes != code_attributes:
 						return None
-					return [self._build_app_from_attrs(attrs) for attrs in cache]
+					app_class = self.get_app_class()
+					return [app_class.from_cache(code_attributes, attr_values, self) for attr_values in cached_apps]
+
+	def _get_code_modified(self):
+		# the code does not change while the process is running, so the
+		# modules of the App class are only stat'ed once per process
+		app_class = self.get_app_class()
+		try:
+			return self._code_modified[app_class]
+		except KeyError:
+			try:
+				code_modified = max(os.stat(code_file).st_mtime for code_file in self._relevant_code_files())
+			except (OSError, ValueError):
+				return None
+			self._code_modified[app_class] = code_modified
+			return code_modified
 
 	def _relevant_master_files(self):
 		ret = set()
 		ret.add(os.path.join(self.get_cache_dir(), '.index.json.gz'))
+		return ret
+
+	def _relevant_code_files(self):
+		ret = set()
 		classes_visited = set()
 
 		def add_class(klass):
@@ -266,12 +320,6 @@ class AppCache(_AppCache):
 	def _relevant_ini_files(self):
 		return glob(os.path.join(self.get_cache_dir(), '*.ini'))
 
-	def _build_app_from_attrs(self, attrs):
-		attrs = attrs.copy()
-		attrs['_cache'] = self
-		app = self.get_app_class()(**attrs)
-		return app
-
 	def _build_app_from_ini(self, ini):
 		app = self.get_app_class().from_ini(ini, locale=self.get_locale(), cache=self)
 		if app:
@@ -283,6 +331,7 @@ class AppCache(_AppCache):
 		ucr_load()
 		self._cache[:] = []
 		self._cache_modified = None
+		self._cache_generation += 1
 		self._invalidate_cache_file()
 
 	@contextmanager
@@ -300,7 +349,7 @@ class AppCache(_AppCache):
 		finally:
 			self._lock = False
 
-	def get_every_single_app(self):
+	def _refresh(self):
 		with self._locked():
 			cache_file = self.get_cache_file()
 			if cache_file:
@@ -312,6 +361,7 @@ class AppCache(_AppCache):
 					cache_logger.debug('Cache outdated. Need to rebuild')
 					self._cache[:] = []
 			if not self._cache:
+				self._cache_generation += 1
 				cached_apps = self._load_cache()
 				if cached_apps is not None:
 					self._cache = cached_apps
@@ -326,8 +376,17 @@ class AppCache(_AppCache):
 						cache_logger.debug('Saved %d apps into cache' % len(self._cache))
 					else:
 						cache_logger.warn('Unable to cache apps')
+
+	def get_every_single_app(self):
+		self._refresh()
 		return self._cache
 
+	def _get_generation(self):
+		# checks the cache file, so the generation changes as soon as the
+		# apps have to be reloaded
+		self._refresh()
+		return id(self), self._cache_generation
+
 	def get_app_class(self):
 		if self._app_class is None:
 			self._app_class = App
@@ -418,6 +477,9 @@ class AppCenterCache(_AppCache):
 			ret.extend(app_cache.get_every_single_app())
 		return ret
 
+	def _get_generation(self):
+		return tuple(app_cache._get_generation() for app_cache in self.get_app_caches())
+
 	def clear_cache(self):
 		ucr_load()
 		self._license_type_cache = None
@@ -463,6 +525,9 @@ class Apps(_AppCache):
 					ret.append(app)
 		return ret
 
+	def _get_generation(self):
+		return tuple(app_cache._get_generation() for app_cache in self.get_appcenter_caches())
+
 	def include_app(self, app):
 		return app.supports_ucs_version()
 
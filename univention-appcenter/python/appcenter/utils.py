@@ -38,11 +38,13 @@ import re
 import shutil
 from subprocess import Popen, PIPE, STDOUT, list2cmdline
 import pipes
-from threading import Thread
+from threading import Thread, Lock
+from Queue import Queue, Empty
 from uuid import uuid4
 import time
 import urllib2
 import urllib
+from urlparse import urlsplit, urlunsplit, urljoin
 import httplib
 import ipaddr
 import ssl
@@ -318,6 +320,189 @@ def urlopen(request):
 urlopen._opener_installed = False
 
 
+class DownloadJob(object):
+
+	'''A file to be fetched by Downloader. *etag* and *last_modified*
+	are the validators of the present *filename* and turn the request
+	into a conditional GET. After Downloader.download(), *modified*
+	tells whether *filename* was replaced, *error* holds the exception
+	if it failed and *etag*, *last_modified* and *md5* describe the
+	new file.'''
+
+	def __init__(self, url, filename, md5=None, etag=None, last_modified=None):
+		self.url = url
+		self.filename = filename
+		self.md5 = md5
+		self.etag = etag
+		self.last_modified = last_modified
+		self.modified = False
+		self.error = None
+
+
+class Downloader(object):
+
+	'''Downloads files with a bounded number of worker threads. The HTTP
+	connections are kept alive and shared between the workers and
+	subsequent calls of download() until close() is called. Files are
+	streamed to a temporary file next to their target while their MD5
+	sum is computed and are only moved into place if it matches the
+	expected one.'''
+
+	redirect_codes = (301, 302, 303, 307, 308)
+	max_redirects = 5
+
+	def __init__(self, max_workers=4, proxy=None, timeout=60, chunk_size=64 * 1024):
+		self.max_workers = max_workers
+		self.timeout = timeout
+		self.chunk_size = chunk_size
+		self._proxy = None
+		self._proxy_headers = {}
+		if proxy:
+			if '://' not in proxy:
+				proxy = 'http://%s' % proxy
+			self._proxy = urlsplit(proxy)
+			if self._proxy.username:
+				credentials = '%s:%s' % (urllib.unquote(self._proxy.username), urllib.unquote(self._proxy.password or ''))
+				self._proxy_headers['Proxy-Authorization'] = 'Basic %s' % credentials.encode('base64').replace('\n', '')
+		self._idle_connections = {}
+		self._lock = Lock()
+
+	def download(self, jobs):
+		queue = Queue()
+		for job in jobs:
+			queue.put(job)
+		threads = []
+		for i in range(min(self.max_workers, len(jobs))):
+			thread = Thread(target=self._work, args=(queue,))
+			thread.start()
+			threads.append(thread)
+		for thread in threads:
+			thread.join()
+		return jobs
+
+	def close(self):
+		with self._lock:
+			idle_connections, self._idle_connections = self._idle_connections, {}
+		for connections in idle_connections.itervalues():
+			for connection in connections:
+				connection.close()
+
+	def _work(self, queue):
+		while True:
+			try:
+				job = queue.get_nowait()
+			except Empty:
+				return
+			try:
+				self._download(job, conditional=True)
+			except socket.error as exc:
+				job.error = urllib2.URLError(exc)
+			except (EnvironmentError, httplib.HTTPException, ValueError) as exc:
+				job.error = exc
+
+	def _download(self, job, conditional):
+		headers = {}
+		if conditional and os.path.exists(job.filename):
+			if job.etag:
+				headers['If-None-Match'] = job.etag
+			if job.last_modified:
+				headers['If-Modified-Since'] = job.last_modified
+		url = job.url
+		for i in range(self.max_redirects + 1):
+			key, connection, response = self._request(url, headers)
+			if response.status not in self.redirect_codes or not response.getheader('location'):
+				break
+			response.read()
+			self._release(key, connection, response)
+			url = urljoin(url, response.getheader('location'))
+		else:
+			# the last response has been released already
+			raise urllib2.HTTPError(url, response.status, 'Too many redirects', response.msg, None)
+		if response.status == 304:
+			response.read()
+			self._release(key, connection, response)
+			if job.md5 and job.md5 != get_md5_from_file(job.filename):
+				# the validators do not fit the present file (anymore)
+				return self._download(job, conditional=False)
+			return
+		if response.status != 200:
+			response.read()
+			self._release(key, connection, response)
+			raise urllib2.HTTPError(url, response.status, response.reason, response.msg, None)
+		checksum = md5()
+		dirname, basename = os.path.split(job.filename)
+		with tempfile.NamedTemporaryFile(dir=dirname, prefix='.%s.' % basename, delete=False) as fd:
+			try:
+				while True:
+					chunk = response.read(self.chunk_size)
+					if not chunk:
+						break
+					checksum.update(chunk)
+					fd.write(chunk)
+			except BaseException:
+				connection.close()
+				os.unlink(fd.name)
+				raise
+		self._release(key, connection, response)
+		local_md5 = checksum.hexdigest()
+		if job.md5 and job.md5 != local_md5:
+			os.unlink(fd.name)
+			raise ValueError('Checksum for %s should be %r but was %r' % (url, job.md5, local_md5))
+		os.chmod(fd.name, 0o644)
+		os.rename(fd.name, job.filename)
+		job.md5 = local_md5
+		job.etag = response.getheader('etag')
+		job.last_modified = response.getheader('last-modified')
+		job.modified = True
+
+	def _request(self, url, headers):
+		scheme, netloc, path, query, fragment = urlsplit(url)
+		key = scheme, netloc
+		if self._proxy and scheme == 'http':
+			selector = urlunsplit((scheme, netloc, path or '/', query, ''))
+			headers = dict(headers, **self._proxy_headers)
+		else:
+			selector = urlunsplit(('', '', path or '/', query, ''))
+		while True:
+			connection = self._acquire(key)
+			reused = connection.sock is not None
+			try:
+				connection.request('GET', selector, headers=headers)
+				return key, connection, connection.getresponse()
+			except (httplib.HTTPException, socket.error):
+				connection.close()
+				if not reused:
+					raise
+				# the server closed the idle connection in the meantime
+
+	def _acquire(self, key):
+		with self._lock:
+			connections = self._idle_connections.get(key)
+			if connections:
+				return connections.pop()
+		scheme, netloc = key
+		if scheme == 'https':
+			connection_class = HTTPSConnection
+		elif scheme == 'http':
+			connection_class = httplib.HTTPConnection
+		else:
+			raise urllib2.URLError('unknown url type: %s' % scheme)
+		if self._proxy:
+			connection = connection_class(self._proxy.hostname, self._proxy.port or 80, timeout=self.timeout)
+			if scheme == 'https':
+				connection.set_tunnel(netloc, headers=self._proxy_headers)
+		else:
+			connection = connection_class(netloc, timeout=self.timeout)
+		return connection
+
+	def _release(self, key, connection, response):
+		if response.will_close:
+			connection.close()
+			return
+		with self._lock:
+			self._idle_connections.setdefault(key, []).append(connection)
+
+
 def get_md5(content):
 	m = md5()
 	m.update(str(content))
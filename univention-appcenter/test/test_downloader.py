@@ -0,0 +1,154 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# Univention App Center
+#  tests for the concurrent downloader against a local HTTP server
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+import urllib2
+from threading import Thread
+from hashlib import md5
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+from univention.appcenter.utils import Downloader, DownloadJob
+
+CONTENT = 'univention' * 10000
+ETAG = '"%s"' % md5(CONTENT).hexdigest()
+
+
+class Handler(BaseHTTPRequestHandler):
+
+	protocol_version = 'HTTP/1.1'
+
+	def do_GET(self):
+		self.server.requests.append(self.path)
+		self.server.connections.add(self.client_address)
+		if self.path == '/file':
+			if self.headers.get('If-None-Match') == ETAG:
+				self._respond(304)
+			else:
+				self._respond(200, CONTENT, ETag=ETAG)
+		elif self.path == '/redirect':
+			self._respond(302, Location='/file')
+		elif self.path == '/loop':
+			self._respond(302, Location='/loop')
+		else:
+			self._respond(404, 'not found')
+
+	def _respond(self, status, body='', **headers):
+		self.send_response(status)
+		for name, value in headers.iteritems():
+			self.send_header(name, value)
+		if status != 304:
+			self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+
+	daemon_threads = True
+
+	def __init__(self):
+		HTTPServer.__init__(self, ('127.0.0.1', 0), Handler)
+		self.requests = []
+		self.connections = set()
+
+
+class TestDownloader(unittest.TestCase):
+
+	def setUp(self):
+		self.server = Server()
+		self.thread = Thread(target=self.server.serve_forever)
+		self.thread.daemon = True
+		self.thread.start()
+		self.url = 'http://127.0.0.1:%d' % (self.server.server_address[1],)
+		self.tmpdir = tempfile.mkdtemp()
+		self.downloader = Downloader(max_workers=1)
+
+	def tearDown(self):
+		self.downloader.close()
+		self.server.shutdown()
+		self.server.server_close()
+		shutil.rmtree(self.tmpdir)
+
+	def job(self, path, **kwargs):
+		return DownloadJob('%s%s' % (self.url, path), os.path.join(self.tmpdir, 'file'), **kwargs)
+
+	def assertIdleConnectionsUnique(self):
+		for connections in self.downloader._idle_connections.itervalues():
+			self.assertEqual(len(connections), len(set(map(id, connections))))
+
+	def test_redirect(self):
+		job, = self.downloader.download([self.job('/redirect')])
+		self.assertIsNone(job.error)
+		self.assertTrue(job.modified)
+		self.assertEqual(job.etag, ETAG)
+		with open(job.filename) as fd:
+			self.assertEqual(fd.read(), CONTENT)
+		self.assertEqual(self.server.requests, ['/redirect', '/file'])
+
+	def test_not_modified(self):
+		job, = self.downloader.download([self.job('/file')])
+		job, = self.downloader.download([self.job('/file', md5=job.md5, etag=job.etag)])
+		self.assertIsNone(job.error)
+		self.assertFalse(job.modified)
+		self.assertEqual(self.server.requests, ['/file', '/file'])
+
+	def test_keep_alive(self):
+		self.downloader.download([self.job('/file'), self.job('/redirect'), self.job('/file')])
+		self.downloader.download([self.job('/file')])
+		self.assertEqual(len(self.server.requests), 5)
+		self.assertEqual(len(self.server.connections), 1)
+		self.assertIdleConnectionsUnique()
+
+	def test_too_many_redirects(self):
+		job, = self.downloader.download([self.job('/loop')])
+		self.assertIsInstance(job.error, urllib2.HTTPError)
+		self.assertEqual(len(self.server.requests), Downloader.max_redirects + 1)
+		self.assertFalse(os.path.exists(job.filename))
+		self.assertIdleConnectionsUnique()
+
+	def test_not_found(self):
+		job, = self.downloader.download([self.job('/missing')])
+		self.assertIsInstance(job.error, urllib2.HTTPError)
+		self.assertEqual(job.error.code, 404)
+		self.assertIdleConnectionsUnique()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -43,7 +43,6 @@ import logging
 # related third party
 import notifier
 import notifier.threads
-import apt  # for independent apt.Cache
 
 # univention
 from univention.lib.package_manager import PackageManager, LockError
@@ -153,6 +152,7 @@ class Instance(umcm.Base, ProgressMixin):
 		self.uu = UniventionUpdater(False)
 		self.component_manager = util.ComponentManager(self.ucr, self.uu)
 		get_package_manager._package_manager = self.package_manager
+		self.package_index = util.PackageIndex(str(self.locale))
 
 		# in order to set the correct locale for Application
 		locale.setlocale(locale.LC_ALL, str(self.locale))
@@ -595,30 +595,23 @@ class Instance(umcm.Base, ProgressMixin):
 	@simple_response
 	def packages_sections(self):
 		""" fills the 'sections' combobox in the search form """
-
-		sections = set()
-		cache = apt.Cache()
-		for package in cache:
-			sections.add(package.section)
-
-		return sorted(sections)
+		return self.package_index.get_sections()
 
 	@sanitize(pattern=PatternSanitizer(required=True))
 	@simple_response
 	def packages_query(self, pattern, section='all', key='package'):
 		""" Query to fill the grid. Structure is fixed here. """
 		result = []
-		for package in self.package_manager.packages(reopen=True):
-			if section == 'all' or package.section == section:
-				toshow = False
-				if pattern.pattern == '^.*$':
-					toshow = True
-				elif key == 'package' and pattern.search(package.name):
-					toshow = True
-				elif key == 'description' and package.candidate and pattern.search(package.candidate.raw_description):
-					toshow = True
-				if toshow:
-					result.append(self._package_to_dict(package, full=False))
+		for name, package_section, is_installed, is_upgradable, found, summary in self.package_index.search(pattern, section, key):
+			if not found:
+				summary = NoneCandidate().summary
+			result.append({
+				'package': name,
+				'installed': is_installed,
+				'upgradable': is_upgradable and found,
+				'summary': summary,
+				'status': self._package_status(is_installed, is_upgradable),
+			})
 		return result
 
 	@simple_response
@@ -710,6 +703,17 @@ class Instance(umcm.Base, ProgressMixin):
 		timeout = 5
 		return self.package_manager.poll(timeout)
 
+	def _package_status(self, is_installed, is_upgradable):
+		""" Helper for the combined status field of a package.
+			*** NOTE *** we translate it here: if we would use the Custom Formatter
+				of the grid then clicking on the sort header would not work.
+		"""
+		if is_installed:
+			if is_upgradable:
+				return _('upgradable')
+			return _('installed')
+		return _('not installed')
+
 	def _package_to_dict(self, package, full):
 		""" Helper that extracts properties from a 'apt_pkg.Package' object
 			and stores them into a dictionary. Depending on the 'full'
@@ -730,16 +734,7 @@ class Instance(umcm.Base, ProgressMixin):
 			'summary': candidate.summary,
 		}
 
-		# add (and translate) a combined status field
-		# *** NOTE *** we translate it here: if we would use the Custom Formatter
-		#		of the grid then clicking on the sort header would not work.
-		if package.is_installed:
-			if package.is_upgradable:
-				result['status'] = _('upgradable')
-			else:
-				result['status'] = _('installed')
-		else:
-			result['status'] = _('not installed')
+		result['status'] = self._package_status(package.is_installed, package.is_upgradable)
 
 		# additional fields needed for detail view
 		if full:
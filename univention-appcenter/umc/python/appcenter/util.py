@@ -33,6 +33,9 @@
 
 # standard library
 import os.path
+import re
+import cPickle
+from tempfile import NamedTemporaryFile
 from contextlib import contextmanager
 import urllib2
 import httplib
@@ -41,6 +44,7 @@ import ssl
 from hashlib import md5
 
 # related third party
+import apt
 # import psutil # our psutil is outdated. reenable when methods are supported
 
 # univention
@@ -132,6 +136,169 @@ def get_md5(filename):
 			return m.hexdigest()
 
 
+class PackageIndex(object):
+
+	''' Search index over all packages known to apt. Holds name,
+	section, status, summary and description of every package plus
+	a token index over the descriptions. The index is pickled to
+	CACHE_FILE (per locale, as apt translates the descriptions) and
+	only rebuilt when the apt lists or the dpkg status change.
+	'''
+
+	APT_LISTS = '/var/lib/apt/lists'
+	DPKG_STATUS = '/var/lib/dpkg/status'
+	CACHE_FILE = '/var/cache/univention-appcenter/.packages.%(locale)s.pickle'
+	FORMAT_VERSION = 1
+
+	_tokenize = re.compile(r'\w+', re.UNICODE).findall
+	_literal = re.compile(r'^[A-Za-z0-9_]+$')
+
+	def __init__(self, locale):
+		self.locale = locale
+		self.signature = None
+		self.packages = []  # (name, section, is_installed, is_upgradable, has_candidate, summary)
+		self.descriptions = []
+		self.sections = []
+		self.tokens = {}  # token -> frozenset of positions in self.packages
+
+	def get_signature(self):
+		signature = []
+		for path in [self.APT_LISTS, self.DPKG_STATUS]:
+			try:
+				stat = os.stat(path)
+			except OSError:
+				signature.append(None)
+			else:
+				signature.append((stat.st_mtime, stat.st_size, stat.st_ino))
+		return tuple(signature)
+
+	def get_cache_file(self):
+		return self.CACHE_FILE % {'locale': self.locale}
+
+	def refresh(self):
+		signature = self.get_signature()
+		if signature == self.signature:
+			return
+		if self._load(signature):
+			return
+		self._build(signature)
+		self._save()
+
+	def _load(self, signature):
+		try:
+			with open(self.get_cache_file(), 'rb') as fd:
+				data = cPickle.load(fd)
+		except (IOError, EOFError, cPickle.UnpicklingError, AttributeError, ValueError, TypeError) as exc:
+			MODULE.info('Could not load package index: %s' % (exc,))
+			return False
+		if data.get('version') != self.FORMAT_VERSION or data.get('signature') != signature:
+			return False
+		self.signature = signature
+		self.packages = data['packages']
+		self.descriptions = data['descriptions']
+		self.sections = data['sections']
+		self.tokens = data['tokens']
+		return True
+
+	def _build(self, signature):
+		MODULE.process('Building package index')
+		packages = []
+		descriptions = []
+		sections = set()
+		tokens = {}
+		for package in apt.Cache():
+			candidate = package.candidate
+			position = len(packages)
+			if candidate is not None:
+				summary = candidate.summary
+				description = candidate.raw_description
+			else:
+				summary = description = None
+			packages.append((package.name, package.section, package.is_installed, package.is_upgradable, candidate is not None, summary))
+			descriptions.append(description)
+			sections.add(package.section)
+			if description:
+				for token in set(self._tokenize(description.lower())):
+					tokens.setdefault(token, []).append(position)
+		self.signature = signature
+		self.packages = packages
+		self.descriptions = descriptions
+		self.sections = sorted(sections)
+		self.tokens = dict((token, frozenset(positions)) for token, positions in tokens.iteritems())
+
+	def _save(self):
+		data = {
+			'version': self.FORMAT_VERSION,
+			'signature': self.signature,
+			'packages': self.packages,
+			'descriptions': self.descriptions,
+			'sections': self.sections,
+			'tokens': self.tokens,
+		}
+		cache_file = self.get_cache_file()
+		try:
+			with NamedTemporaryFile(dir=os.path.dirname(cache_file), prefix='.packages.', delete=False) as fd:
+				cPickle.dump(data, fd, cPickle.HIGHEST_PROTOCOL)
+			os.rename(fd.name, cache_file)
+		except (IOError, OSError) as exc:
+			MODULE.warn('Could not save package index: %s' % (exc,))
+
+	def _description_candidates(self, pattern):
+		# PatternSanitizer compiles ^<escaped input>$ with .* for every
+		# asterisk. Each purely alphanumeric part of it has to be inside
+		# a single token of a matching description, so only packages
+		# having such tokens need to be checked against the pattern
+		expression = pattern.pattern
+		if not expression.startswith('^') or not expression.endswith('$'):
+			return None
+		candidates = None
+		for part in expression[1:-1].split('.*'):
+			if not self._literal.match(part):
+				continue
+			part = part.lower()
+			positions = set()
+			for token, token_positions in self.tokens.iteritems():
+				if part in token:
+					positions.update(token_positions)
+			if candidates is None:
+				candidates = positions
+			else:
+				candidates &= positions
+		if candidates is None:
+			return None
+		return sorted(candidates)
+
+	def search(self, pattern, section='all', key='package'):
+		''' Yields (name, section, is_installed, is_upgradable,
+		has_candidate, summary) of every package in *section* whose
+		name or description (depending on *key*) matches *pattern*
+		'''
+		self.refresh()
+		match_all = pattern.pattern == '^.*$'
+		positions = None
+		if key == 'description' and not match_all:
+			positions = self._description_candidates(pattern)
+		if positions is None:
+			positions = xrange(len(self.packages))
+		for position in positions:
+			package = self.packages[position]
+			if section != 'all' and package[1] != section:
+				continue
+			if match_all:
+				yield package
+			elif key == 'package':
+				if pattern.search(package[0]):
+					yield package
+			elif key == 'description':
+				description = self.descriptions[position]
+				if description and pattern.search(description):
+					yield package
+
+	def get_sections(self):
+		self.refresh()
+		return self.sections
+
+
 class HTTPSConnection(httplib.HTTPSConnection):
 
 	def connect(self):
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Directory Manager
+"""listener script invalidating the cached directory facts of UDM processes."""
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+__package__ = ''  # workaround for PEP 366
+import listener
+import os
+import time
+import univention.debug as ud
+import univention.admin.facts as udm_facts
+
+name = 'directory_facts'
+description = 'Invalidate cached directory facts of UDM processes'
+filter = '(|(objectClass=univentionDefault)(objectClass=univentionDirectory)%s%s)' % (udm_facts.MAIL_DOMAIN_FILTER, udm_facts.S4CONNECTOR_FILTER)
+attributes = []
+
+
+def handler(dn, new, old):
+	"""Touch the stamp file so that UDM processes re-read the facts."""
+	listener.setuid(0)
+	try:
+		dirname = os.path.dirname(udm_facts.STAMP_FILE)
+		if not os.path.isdir(dirname):
+			os.makedirs(dirname, 0755)
+		with open(udm_facts.STAMP_FILE, 'a'):
+			now = time.time()
+			os.utime(udm_facts.STAMP_FILE, (now, now))
+	except EnvironmentError as exc:
+		ud.debug(ud.LISTENER, ud.ERROR, 'directory_facts: could not touch %s: %s' % (udm_facts.STAMP_FILE, exc))
+	finally:
+		listener.unsetuid()
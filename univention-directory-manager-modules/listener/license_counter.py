@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Directory Manager
+"""listener script maintaining the object counts for the license check."""
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+__package__ = ''  # workaround for PEP 366
+import listener
+import univention.debug as ud
+import univention.uldap
+import univention.admin.filter as udm_filter
+import univention.admin.license as udm_license
+import univention.admin.license_counter as udm_license_counter
+
+FILTERS = udm_license_counter.parse_filters(udm_license._license.countedFilters())
+
+
+def _variables(filters):
+	variables = {}
+	for filter_p in filters.itervalues():
+		udm_filter.walk(filter_p, lambda e, a: variables.setdefault(e.variable.lower(), e.variable))
+	return sorted(variables.itervalues())
+
+
+name = 'license_counter'
+description = 'Maintain object counts for the license check'
+filter = '(|%s)' % ''.join(sorted(FILTERS))
+attributes = _variables(FILTERS)
+
+store = udm_license_counter.CounterStore().load()
+
+
+def _reconcile_interval():
+	try:
+		return int(listener.configRegistry.get('directory/manager/license/counter/interval', 3600))
+	except ValueError:
+		return 3600
+
+
+def handler(dn, new, old):
+	"""Adjust the counts of the license filters matched by old and new object."""
+	store.update(FILTERS, new, old)
+
+
+def postrun():
+	"""Write the counts and recount everything once the reconciliation interval has passed."""
+	age = store.age()
+	listener.setuid(0)
+	try:
+		if age is None or age > _reconcile_interval():
+			lo = univention.uldap.getMachineConnection()
+			store.reconcile(lo, FILTERS)
+		if store.dirty:
+			store.save()
+	except Exception as exc:
+		ud.debug(ud.LISTENER, ud.ERROR, 'license_counter: updating object counts failed: %s' % (exc,))
+	finally:
+		listener.unsetuid()
+
+
+def initialize():
+	"""Drop the counts so a resync does not count objects twice; :func:`postrun` recounts them."""
+	clean()
+
+
+def clean():
+	listener.setuid(0)
+	try:
+		store.remove()
+	finally:
+		listener.unsetuid()
@@ -86,8 +86,8 @@ def ucr_overwrite_properties(module, lo):
 					prop_val_type = type(old_prop_val)
 					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'ucr_overwrite_properties: set property attribute %s to %s' % (attr, new_prop_val))
 					if attr in ('syntax', ):
-						if hasattr(univention.admin.syntax, new_prop_val):
-							syntax = getattr(univention.admin.syntax, new_prop_val)
+						syntax = univention.admin.syntax.get_syntax(new_prop_val)
+						if syntax is not None:
 							setattr(prop, attr, syntax())
 						else:
 							if lo.search(filter=filter_format(univention.admin.syntax.LDAP_Search.FILTER_PATTERN, [new_prop_val])):
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  cached configuration objects of the directory
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""Directory facts: well-known configuration objects read by many objects.
+
+Every UDM object needs to know whether an S4 connector is present, users
+read the default group and policies the policy containers from
+`cn=directory,cn=univention`; mail addresses are checked against the
+configured mail domains. These values change rarely, so they are cached
+per process for `directory/manager/facts/ttl` seconds. The listener module
+`directory_facts` touches :data:`STAMP_FILE` when one of the objects
+changes; a newer stamp discards the cache immediately, which keeps
+long-running UMC processes correct.
+
+The returned dictionaries are copies and may be modified by the caller.
+"""
+
+import os
+import time
+
+from univention.admin import configRegistry
+import univention.admin.log
+
+STAMP_FILE = '/var/lib/univention-directory-manager/directory-facts.stamp'
+MAIL_DOMAIN_FILTER = '(objectClass=univentionMailDomainname)'
+S4CONNECTOR_FILTER = '(&(|(objectClass=univentionDomainController)(objectClass=univentionMemberServer))(univentionService=S4 Connector))'
+
+try:
+	TTL = int(configRegistry.get('directory/manager/facts/ttl', 300))
+except ValueError:
+	TTL = 300
+
+_cache = {}
+_stamp = [None]
+
+
+def _stamp_mtime():
+	try:
+		return os.stat(STAMP_FILE).st_mtime
+	except OSError:
+		return None
+
+
+def invalidate():
+	"""Forget all cached facts of this process."""
+	_cache.clear()
+
+
+def _get(lo, key, compute):
+	mtime = _stamp_mtime()
+	if mtime != _stamp[0]:
+		_stamp[0] = mtime
+		invalidate()
+	key = (lo.base,) + key
+	now = time.time()
+	try:
+		expires, value = _cache[key]
+		if now < expires:
+			return value
+	except KeyError:
+		pass
+	value = compute()
+	univention.admin.log.info('facts: %r = %r', key, value)
+	_cache[key] = (now + TTL, value)
+	return value
+
+
+def _copy(attrs):
+	return dict((key, list(values)) for key, values in attrs.iteritems())
+
+
+def s4connector_present(lo):
+	"""Whether a server with the service "S4 Connector" and an IP address exists.
+
+	`directory/manager/samba3/legacy` overrides the search when it is set.
+	"""
+	if configRegistry.is_true('directory/manager/samba3/legacy', False):
+		return False
+	elif configRegistry.is_false('directory/manager/samba3/legacy', False):
+		return True
+
+	def compute():
+		return any(dn for (dn, attrs) in lo.search(S4CONNECTOR_FILTER, attr=['aRecord']) if 'aRecord' in attrs)
+	return _get(lo, ('s4connector_present',), compute)
+
+
+def mail_domains(lo):
+	"""Lower-cased names of all mail domains as a frozenset."""
+	def compute():
+		return frozenset(name.lower() for dn, attrs in lo.search(filter=MAIL_DOMAIN_FILTER, attr=['cn']) for name in attrs.get('cn', []))
+	return _get(lo, ('mail_domains',), compute)
+
+
+def default_object(lo, domain):
+	"""Attributes of the `univentionDefault` object below `cn=univention,<domain>` or an empty dictionary."""
+	def compute():
+		result = lo.search(filter='(objectClass=univentionDefault)', base='cn=univention,' + domain)
+		return result[0][1] if result else {}
+	return _copy(_get(lo, ('default_object', domain), compute))
+
+
+def default_group(lo, domain):
+	"""DN of the default primary group for users or `None`."""
+	return default_object(lo, domain).get('univentionDefaultGroup', [None])[0]
+
+
+def directory_object(lo, domain):
+	"""Return (dn, attributes) of `cn=directory,cn=univention,<domain>`.
+
+	Falls back to the old `cn=default containers` object; the attributes are
+	empty if neither exists.
+	"""
+	def compute():
+		for dn in ('cn=directory,cn=univention,' + domain, 'cn=default containers,cn=univention,' + domain):
+			attrs = lo.get(dn)
+			if attrs:
+				return dn, attrs
+		return dn, {}
+	dn, attrs = _get(lo, ('directory_object', domain), compute)
+	return dn, _copy(attrs)
@@ -225,6 +225,98 @@ def walk(filter, expression_walk_function=None, conjunction_walk_function=None,
 			expression_walk_function(filter, arg)
 
 
+def match(filter, attributes):
+	"""Evaluate LDAP filter against an attribute dictionary.
+
+	Attribute names and values are compared case insensitively and ignoring
+	insignificant spaces, which is what the directory does for the attributes
+	used in UDM filters.
+
+	>>> match('(&(objectClass=person)(!(uid=*$)))', {'objectClass': ['Person'], 'uid': ['user1']})
+	True
+	>>> match('(|(uid=dns-*)(uid=krbtgt))', {'uid': ['dns-master']})
+	True
+	>>> match('(uidNumber>=1000)', {'uidNumber': ['999']})
+	False
+	>>> match('(mail=*)', {})
+	False
+
+	The filter of enabled accounts from :mod:`univention.admin.license`
+	matches the flags written by UDM with a different number of spaces:
+
+	>>> not_disabled = '(!(&(shadowExpire=1)(krb5KDCFlags=254)(|(sambaAcctFlags=[UD       ])(sambaAcctFlags=[ULD       ]))))'
+	>>> match(not_disabled, {'shadowExpire': ['1'], 'krb5KDCFlags': ['254'], 'sambaAcctFlags': ['[UD         ]']})
+	False
+	>>> match(not_disabled, {'shadowExpire': ['1'], 'krb5KDCFlags': ['254'], 'sambaAcctFlags': ['[ULD        ]']})
+	False
+	>>> match(not_disabled, {'shadowExpire': ['1'], 'krb5KDCFlags': ['126'], 'sambaAcctFlags': ['[U          ]']})
+	True
+	>>> managedclients = '(|(objectClass=univentionThinClient)(&(objectClass=univentionClient)(objectClass=posixAccount))(objectClass=univentionMobileClient)(objectClass=univentionWindows)(objectclass=univentionUbuntuClient)(objectClass=univentionLinuxClient)(objectClass=univentionCorporateClient)(objectClass=univentionMacOSClient))'
+	>>> match(managedclients, {'objectClass': ['univentionHost', 'univentionWindows']})
+	True
+	>>> match('(&(|(&(objectClass=posixAccount)(objectClass=shadowAccount))(objectClass=sambaSamAccount))(!(uidNumber=0))(!(uid=*$)))', {'objectClass': ['posixAccount', 'shadowAccount'], 'uidNumber': ['2001'], 'uid': ['pc1$']})
+	False
+	"""
+	lower = dict((key.lower(), values) for key, values in attributes.iteritems())
+	return _match(parse(filter), lower)
+
+
+def _match(filter, attributes):
+	if filter._type_ == 'conjunction':
+		if filter.type == '&':
+			return all(_match(e, attributes) for e in filter.expressions)
+		elif filter.type == '|':
+			return any(_match(e, attributes) for e in filter.expressions)
+		return not any(_match(e, attributes) for e in filter.expressions)
+
+	values = attributes.get(filter.variable.lower(), [])
+	if filter.operator in ('=', '!='):
+		if filter.value == '*':
+			found = bool(values)
+		else:
+			pattern = _value_pattern(filter.value)
+			found = any(pattern.match(_normalize(value)) for value in values)
+		return found if filter.operator == '=' else not found
+
+	ordering = {
+		'<=': lambda x, y: x <= y,
+		'<': lambda x, y: x < y,
+		'>=': lambda x, y: x >= y,
+		'>': lambda x, y: x > y,
+	}[filter.operator]
+	assertion = _unescape(filter.value)
+	for value in values:
+		try:
+			if ordering(int(value), int(assertion)):
+				return True
+		except ValueError:
+			if ordering(value.lower(), assertion.lower()):
+				return True
+	return False
+
+
+_ESCAPED = re.compile(r'\\([0-9a-fA-F]{2})')
+
+
+def _unescape(value):
+	return _ESCAPED.sub(lambda m: chr(int(m.group(1), 16)), value)
+
+
+_SPACES = re.compile(r'\s+')
+
+
+def _normalize(value):
+	"""Remove insignificant spaces like the directory does for string matching."""
+	return _SPACES.sub(' ', value).strip()
+
+
+def _value_pattern(value):
+	parts = [_SPACES.sub(' ', _unescape(part)) for part in value.split('*')]
+	parts[0] = parts[0].lstrip()
+	parts[-1] = parts[-1].rstrip()
+	return re.compile('%s\\Z' % ('.*'.join(re.escape(part) for part in parts),), re.IGNORECASE | re.DOTALL)
+
+
 FQDN_REGEX = re.compile(r'(?:^|\()fqdn=([^)]+)(?:\)|$)')
 
 
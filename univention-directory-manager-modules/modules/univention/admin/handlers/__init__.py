@@ -32,6 +32,7 @@
 
 import copy
 import types
+import contextlib
 import re
 import time
 import ldap
@@ -39,8 +40,8 @@ import ipaddr
 from ldap.filter import filter_format
 from ldap.dn import explode_rdn, explode_dn, escape_dn_chars
 
-import univention.debug
-
+import univention.admin.log
+import univention.admin.facts
 import univention.admin.filter
 import univention.admin.uldap
 import univention.admin.mapping
@@ -49,24 +50,57 @@ import univention.admin.uexceptions
 import univention.admin.localization
 import univention.admin.syntax
 from univention.admin import configRegistry
+from univention.admin.tracking import ChangeTrackingDict
 from univention.admin.uldap import DN
 try:
 	import univention.lib.admember
 	_prevent_to_change_ad_properties = univention.lib.admember.is_localhost_in_admember_mode()
 except ImportError:
-	univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, "Failed to import univention.lib.admember")
+	univention.admin.log.warn("Failed to import univention.lib.admember")
 	_prevent_to_change_ad_properties = False
 
 translation = univention.admin.localization.translation('univention/admin/handlers')
 _ = translation.translate
 
-# global caching variable
-if configRegistry.is_true('directory/manager/samba3/legacy', False):
-	s4connector_present = False
-elif configRegistry.is_false('directory/manager/samba3/legacy', False):
-	s4connector_present = True
-else:
-	s4connector_present = None
+# move whole subtrees with a single modrdn if the LDAP server supports it;
+# disabled by default as the listener only receives the modrdn of the
+# container and no changes of the objects below it
+subtree_modrdn = configRegistry.is_true('directory/manager/move/subtree/modrdn', False)
+
+# modules whose move hooks only rewrite references which base._move_subtree()
+# rewrites in bulk for all objects of the subtree
+SUBTREE_MOVE_MODULES = ('container/cn', 'container/ou', 'groups/group', 'mail/domain')
+
+# attributes referencing other objects by DN
+REFERENCE_ATTRIBUTES = ('uniqueMember', 'univentionPolicyReference', 'secretary')
+
+# DN references held by the settings/default object
+DEFAULT_GROUP_ATTRIBUTES = (
+	'univentionDefaultGroup', 'univentionDefaultComputerGroup', 'univentionDefaultDomainControllerMasterGroup',
+	'univentionDefaultDomainControllerGroup', 'univentionDefaultMemberserverGroup', 'univentionDefaultClientGroup',
+)
+
+# DN references held by the settings/directory object
+DEFAULT_CONTAINER_ATTRIBUTES = (
+	'univentionPolicyObject', 'univentionDnsObject', 'univentionDhcpObject', 'univentionUsersObject',
+	'univentionGroupsObject', 'univentionComputersObject', 'univentionNetworksObject', 'univentionSharesObject',
+	'univentionPrintersObject', 'univentionMailObject', 'univentionLicenseObject',
+)
+
+
+def rebase_dn(dn, olddn, newdn):
+	"""Return `dn` with the suffix `olddn` replaced by `newdn`, or `None` if `dn` is not below `olddn`.
+
+	>>> rebase_dn('uid=a,ou=Old,dc=x', 'ou=old,dc=x', 'ou=new,dc=x')
+	'uid=a,ou=new,dc=x'
+	>>> rebase_dn('uid=a,ou=older,dc=x', 'ou=old,dc=x', 'ou=new,dc=x')
+	"""
+	lower, olddn_lower = dn.lower(), olddn.lower()
+	if lower == olddn_lower:
+		return newdn
+	if lower.endswith(',' + olddn_lower):
+		return dn[:-len(olddn)] + newdn
+	return None
 
 
 def disable_ad_restrictions(disable=True):
@@ -90,8 +124,6 @@ class base(object):
 			self.position = position
 		if not hasattr(self, 'info'):
 			self.info = {}
-		if not hasattr(self, 'oldinfo'):
-			self.oldinfo = {}
 		if not hasattr(self, 'policies'):
 			self.policies = []
 		if not hasattr(self, 'oldpolicies'):
@@ -109,33 +141,60 @@ class base(object):
 		self.old_options = []
 		self.alloc = []
 
+	def _get_info(self):
+		return self._info
+
+	def _set_info(self, info):
+		if not isinstance(info, ChangeTrackingDict):
+			info = ChangeTrackingDict(info)
+		previous = self.__dict__.get('_info')
+		if previous is not None and previous is not info:
+			info.reset(previous.original())
+		self._info = info
+
+	info = property(_get_info, _set_info, doc='''the current properties, tracking which of them were changed since the last save()''')
+
+	def _get_oldinfo(self):
+		return self.info.original()
+
+	def _set_oldinfo(self, oldinfo):
+		self.info.reset(oldinfo)
+
+	oldinfo = property(_get_oldinfo, _set_oldinfo, doc='''the properties as they were at the last save()''')
+
 	def open(self):
 		self._open = True
 
 	def save(self):
 		'''saves current state as old state'''
 
-		self.oldinfo = copy.deepcopy(self.info)
-		self.oldpolicies = copy.deepcopy(self.policies)
+		self.info.reset()
+		self.oldpolicies = list(self.policies)
 		self.options = list(set(self.options))
 		self.old_options = []
 		if self.exists():
-			self.old_options = copy.deepcopy(self.options)
+			self.old_options = list(self.options)
 
 	def diff(self):
 		'''returns differences between old and current state'''
 		changes = []
+		info = self.info
 
 		for key, prop in self.descriptions.items():
 			null = [] if prop.multivalue else None
 			# remove properties which are disabled by options
 			if prop.options and not set(prop.options) & set(self.options):
-				if self.oldinfo.get(key, null) not in (null, None):
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "simpleLdap.diff: key %s not valid (option not set)" % key)
-					changes.append((key, self.oldinfo[key], null))
+				if info.old_value(key, null) not in (null, None):
+					univention.admin.log.info("simpleLdap.diff: key %s not valid (option not set)", key)
+					changes.append((key, info.old_value(key), null))
+				continue
+			# properties which were not touched since save() are unchanged
+			if not info.is_dirty(key):
 				continue
-			if (self.oldinfo.get(key) or self.info.get(key)) and self.oldinfo.get(key, null) != self.info.get(key, null):
-				changes.append((key, self.oldinfo.get(key, null), self.info.get(key, null)))
+			old = info.old_value(key, null)
+			new = dict.get(info, key, null)
+			if (old or new) and old != new:
+				changes.append((key, old, new))
 
 		return changes
 
@@ -145,11 +204,14 @@ class base(object):
 
 		if isinstance(key, (list, tuple)):
 			return any(self.hasChanged(i) for i in key)
-		if (not self.oldinfo.get(key, '') or self.oldinfo[key] == [''] or self.oldinfo[key] == []) \
-			and (not self.info.get(key, '') or self.info[key] == [''] or self.info[key] == []):
+		if not self.info.is_dirty(key):
+			return False
+		old = self.info.old_value(key, '')
+		new = dict.get(self.info, key, '')
+		if (not old or old == [''] or old == []) and (not new or new == [''] or new == []):
 			return False
 
-		return not univention.admin.mapping.mapCmp(self.mapping, key, self.oldinfo.get(key, ''), self.info.get(key, ''))
+		return not univention.admin.mapping.mapCmp(self.mapping, key, old, new)
 
 	def ready(self):
 		'''checks if all properties marked required are set'''
@@ -161,7 +223,7 @@ class base(object):
 				continue
 
 			if p.required and (not self[name] or (isinstance(self[name], list) and self[name] == [''])):
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "property %s is required but not set." % name)
+				univention.admin.log.info("property %s is required but not set.", name)
 				missing.append(name)
 		if missing:
 			raise univention.admin.uexceptions.insufficientInformation(_('The following properties are missing:\n%s') % ('\n'.join(missing),))
@@ -188,7 +250,7 @@ class base(object):
 		def _changeable():
 			yield self.descriptions[key].editable
 			if not self.descriptions[key].may_change:
-				yield key not in self.oldinfo or self.oldinfo[key] == value
+				yield not self.oldinfo.has_key(key) or self.info.old_value(key) == value
 			# if _prevent_to_change_ad_properties:  # FIXME: users.user.object.__init__ modifies firstname and lastname by hand
 			#	yield not (self.descriptions[key].readonly_when_synced and self._is_synced_object() and self.exists())
 
@@ -209,7 +271,7 @@ class base(object):
 			raise univention.admin.uexceptions.valueRequired, _('The property %s is required') % self.descriptions[key].short_description
 		# do nothing
 		if self.info.get(key, None) == value:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'values are identical: %s:%s' % (key, value))
+			univention.admin.log.info('values are identical: %s:%s', key, value)
 			return
 
 		if self.info.get(key, None) == self.descriptions[key].default(self):
@@ -265,7 +327,6 @@ class base(object):
 			self.info[key] = p
 
 	def __getitem__(self, key):
-		_d = univention.debug.function('admin.handlers.base.__getitem__ key = %s' % key)
 		if not key:
 			return None
 
@@ -347,7 +408,7 @@ class base(object):
 
 	def move(self, newdn, ignore_license=0, temporary_ou=None):
 		'''move object'''
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'move: called for %s to %s' % (self.dn, newdn))
+		univention.admin.log.info('move: called for %s to %s', self.dn, newdn)
 
 		if not (univention.admin.modules.supports(self.module, 'move') or univention.admin.modules.supports(self.module, 'subtree_move')):  # this should have been checked before, but I want to be sure...
 			raise univention.admin.uexceptions.invalidOperation()
@@ -381,9 +442,12 @@ class base(object):
 		if univention.admin.modules.supports(self.module, 'subtree_move'):
 			# check if is subtree:
 			subelements = self.lo.search(base=self.dn, scope='one', attr=[])
+			if subelements and self._move_subtree(newdn, ignore_license):
+				self._delete_temporary_ou_if_empty(temporary_ou)
+				return newdn
 			if subelements:
 				olddn = self.dn
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'move: found subelements, do subtree move: newdn: %s' % newdn)
+				univention.admin.log.info('move: found subelements, do subtree move: newdn: %s', newdn)
 				# create copy of myself
 				module = univention.admin.modules.get(self.module)
 				position = univention.admin.uldap.position(self.lo.base)
@@ -397,7 +461,7 @@ class base(object):
 				moved = []
 				try:
 					for subolddn, suboldattrs in subelements:
-						univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'move: subelement %s' % subolddn)
+						univention.admin.log.info('move: subelement %s', subolddn)
 						# Convert the DNs to lowercase before the replacement. The cases might be mixed up if the python lib is
 						# used by the connector, for example:
 						#   subolddn: uid=user_test_h80,ou=TEST_H81,LDAP_BASE
@@ -418,7 +482,7 @@ class base(object):
 					self.remove()
 					self._delete_temporary_ou_if_empty(temporary_ou)
 				except:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'move: subtree move failed, trying to move back.')
+					univention.admin.log.error('move: subtree move failed, trying to move back.')
 					position = univention.admin.uldap.position(self.lo.base)
 					position.setDn(self.lo.parentDn(olddn))
 					for subolddn, subnewdn in moved:
@@ -443,13 +507,96 @@ class base(object):
 			self._delete_temporary_ou_if_empty(temporary_ou)
 			return res
 
+	def _move_subtree(self, newdn, ignore_license=0):
+		"""Move this object and all objects below it with a single modrdn.
+
+		References to the moved objects are rewritten in bulk afterwards
+		instead of opening and moving every object. Returns `False` without
+		changing anything if the subtree has to be moved object by object,
+		because it is disabled, an object below has move hooks of its own or
+		the LDAP server refuses to rename non-leaf objects. Like moving the
+		objects one by one, it fails if an object below has been synchronized
+		from Active Directory.
+		"""
+		if not subtree_modrdn:
+			return False
+
+		olddn = self.dn
+		# identifyOne() needs the complete entries, e.g. univentionServerRole of computers
+		for dn, attrs in self.lo.search(base=olddn, scope='sub'):
+			if self.lo.compare_dn(dn, olddn):
+				continue
+			if _prevent_to_change_ad_properties and 'synced' in attrs.get('univentionObjectFlag', []):
+				raise univention.admin.uexceptions.invalidOperation(_('Objects from Active Directory can not be moved.'))
+			module = univention.admin.modules.get(univention.admin.modules.identifyOne(dn, attrs))
+			if not module or not (univention.admin.modules.supports(module, 'move') or univention.admin.modules.supports(module, 'subtree_move')):
+				return False
+			if univention.admin.modules.name(module) in SUBTREE_MOVE_MODULES:
+				continue
+			obj = getattr(module, 'object', None)
+			if obj is None or any(getattr(obj, hook).im_func is not getattr(base, hook).im_func for hook in ('_ldap_pre_move', '_ldap_post_move')):
+				univention.admin.log.info('move: %s has move hooks, moving subtree object by object', dn)
+				return False
+
+		self._ldap_pre_move(newdn)
+		try:
+			self.lo.rename(olddn, newdn, ignore_license=ignore_license)
+		except univention.admin.uexceptions.ldapError as exc:
+			if isinstance(exc.original_exception, (ldap.NOT_ALLOWED_ON_NONLEAF, ldap.UNWILLING_TO_PERFORM, ldap.AFFECTS_MULTIPLE_DSAS)):
+				univention.admin.log.info('move: server refused subtree rename of %s: %s', olddn, exc)
+				return False
+			raise
+		self.dn = newdn
+
+		try:
+			self._rewrite_references(olddn, newdn)
+			self._ldap_post_move(olddn)
+		except:
+			univention.admin.log.warn('move: rewriting references failed, move subtree back to %s', olddn)
+			self.lo.rename(newdn, olddn, ignore_license=ignore_license)
+			self.dn = olddn
+			self._rewrite_references(newdn, olddn)
+			raise
+		finally:
+			univention.admin.facts.invalidate()
+		return True
+
+	def _rewrite_references(self, olddn, newdn):
+		"""Replace references to `olddn` and the objects below it by `newdn`.
+
+		Each of :data:`REFERENCE_ATTRIBUTES` is searched once, the settings
+		objects holding default groups and containers are read directly and
+		all modifications are sent pipelined.
+		"""
+		changes = {}
+
+		def _collect(dn, attr, values):
+			rebased = [rebase_dn(value, olddn, newdn) for value in values]
+			if any(value is not None for value in rebased):
+				newvalues = [new if new is not None else value for value, new in zip(values, rebased)]
+				changes.setdefault(dn, []).append((attr, values, newvalues))
+
+		for attr in REFERENCE_ATTRIBUTES:
+			for dn, attrs in self.lo.search(filter='(%s=*)' % (attr,), attr=[attr]):
+				_collect(dn, attr, attrs.get(attr, []))
+
+		directory_dn = univention.admin.facts.directory_object(self.lo, self.lo.base)[0]
+		for dn, attrnames in ((directory_dn, DEFAULT_CONTAINER_ATTRIBUTES), ('cn=default,cn=univention,%s' % (self.lo.base,), DEFAULT_GROUP_ATTRIBUTES)):
+			attrs = self.lo.get(dn, attr=list(attrnames)) if dn else {}
+			for attr in attrnames:
+				if attrs.get(attr):
+					_collect(dn, attr, attrs[attr])
+
+		univention.admin.log.info('move: rewriting references to %s in %d objects', olddn, len(changes))
+		self.lo.modify_many(changes.items(), ignore_license=1)
+
 	def move_subelements(self, olddn, newdn, subelements, ignore_license=False):
 		if subelements:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'move: found subelements, do subtree move')
+			univention.admin.log.info('move: found subelements, do subtree move')
 			moved = []
 			try:
 				for subolddn, suboldattrs in subelements:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'move: subelement %s' % subolddn)
+					univention.admin.log.info('move: subelement %s', subolddn)
 					subnewdn = subolddn.replace(olddn, newdn)
 					submodule = univention.admin.modules.identifyOne(subolddn, suboldattrs)
 					submodule = univention.admin.modules.get(submodule)
@@ -462,7 +609,7 @@ class base(object):
 					moved.append((subolddn, subnewdn))
 					return moved
 			except:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'move: subtree move failed, try to move back')
+				univention.admin.log.error('move: subtree move failed, try to move back')
 				for subolddn, subnewdn in moved:
 					submodule = univention.admin.modules.identifyOne(subnewdn, self.lo.get(subnewdn))
 					submodule = univention.admin.modules.get(submodule)
@@ -552,19 +699,11 @@ class simpleLdap(base):
 		self.exceptions = []
 		base.__init__(self, co, lo, position, dn, superordinate)
 
-		# s4connector_present is a global caching variable than can be
-		# None ==> ldap has not been checked for servers with service "S4 Connector"
-		# True ==> at least one server with IP address (aRecord) is present
-		# False ==> no server is present
-		global s4connector_present
-		if s4connector_present is None:
-			s4connector_present = False
-			searchResult = self.lo.search('(&(|(objectClass=univentionDomainController)(objectClass=univentionMemberServer))(univentionService=S4 Connector))', attr=['aRecord'])
-			s4connector_present = any(ddn for (ddn, attr) in searchResult if 'aRecord' in attr)
-		self.s4connector_present = s4connector_present
+		# True ==> at least one server with service "S4 Connector" and IP address (aRecord) is present
+		self.s4connector_present = univention.admin.facts.s4connector_present(self.lo)
 
 		if not univention.admin.modules.modules:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'univention.admin.modules.update() was not called')
+			univention.admin.log.warn('univention.admin.modules.update() was not called')
 			univention.admin.modules.update()
 
 		m = univention.admin.modules.get(self.module)
@@ -612,7 +751,7 @@ class simpleLdap(base):
 
 		if not self.superordinate:
 			if superordinate_names == set(['settings/cn']):
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'No settings/cn superordinate was given.')
+				univention.admin.log.warn('No settings/cn superordinate was given.')
 				return   # settings/cn might be misued as superordinate, don't risk currently
 			raise univention.admin.uexceptions.insufficientInformation(_('No superordinate object given'))
 
@@ -661,12 +800,12 @@ class simpleLdap(base):
 				if not option.disabled and option.matches(ocs):
 					self.options.append(opt)
 		else:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'reset options to default by _define_options')
+			univention.admin.log.info('reset options to default by _define_options')
 			self._define_options(options)
 
 	def _define_options(self, module_options):
 		# enable all default options
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'modules/__init__.py _define_options: reset to default options')
+		univention.admin.log.info('modules/__init__.py _define_options: reset to default options')
 		for name, opt in module_options.items():
 			if not opt.disabled and opt.default:
 				self.options.append(name)
@@ -727,7 +866,7 @@ class simpleLdap(base):
 		# evaluate extended attributes
 		ocs = set()
 		for prop in getattr(m, 'extended_udm_attributes', []):
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleLdap._create: info[%s]:%r = %r' % (prop.name, self.has_key(prop.name), self.info.get(prop.name)))
+			univention.admin.log.info('simpleLdap._create: info[%s]:%r = %r', prop.name, self.has_key(prop.name), self.info.get(prop.name))
 			if prop.syntax == 'boolean' and self.info.get(prop.name) == '0':
 				continue
 			if self.has_key(prop.name) and self.info.get(prop.name):
@@ -738,7 +877,7 @@ class simpleLdap(base):
 			try:
 				opt = m.options[option]
 			except KeyError:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, '%r does not specify option %r' % (m.module, option))
+				univention.admin.log.error('%r does not specify option %r', m.module, option)
 				continue
 			ocs |= set(opt.objectClasses)
 
@@ -756,8 +895,8 @@ class simpleLdap(base):
 		al.append(('objectClass', ['univentionObject', ]))
 		al.append(('univentionObjectType', [self.module, ]))
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "create object with dn: %s" % (self.dn,))
-		univention.debug.debug(univention.debug.ADMIN, 99, 'Create dn=%r;\naddlist=%r;' % (self.dn, al))
+		univention.admin.log.info("create object with dn: %s", self.dn)
+		univention.admin.log.debug(99, 'Create dn=%r;\naddlist=%r;', self.dn, al)
 		self.lo.add(self.dn, al)
 		self._exists = True
 
@@ -769,15 +908,15 @@ class simpleLdap(base):
 			import traceback
 			import sys
 			exc = sys.exc_info()
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, "Post-Create operation failed: %s" % (traceback.format_exc(),))
+			univention.admin.log.error("Post-Create operation failed: %s", traceback.format_exc())
 			try:
 				self.cancel()
 			except:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, "Post-create: cancel() failed: %s" % (traceback.format_exc(),))
+				univention.admin.log.error("Post-create: cancel() failed: %s", traceback.format_exc())
 			try:
 				self.remove()
 			except:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, "Post-create: remove() failed: %s" % (traceback.format_exc(),))
+				univention.admin.log.error("Post-create: remove() failed: %s", traceback.format_exc())
 			raise exc[0], exc[1], exc[2]
 
 		self.call_udm_property_hook('hook_ldap_post_create', self)
@@ -808,7 +947,7 @@ class simpleLdap(base):
 		ml = self._ldap_object_classes(ml)
 
 		# FIXME: timeout without exception if objectClass of Object is not exsistant !!
-		univention.debug.debug(univention.debug.ADMIN, 99, 'Modify dn=%r;\nmodlist=%r;\noldattr=%r;' % (self.dn, ml, self.oldattr))
+		univention.admin.log.debug(99, 'Modify dn=%r;\nmodlist=%r;\noldattr=%r;', self.dn, ml, self.oldattr)
 		self.lo.modify(self.dn, ml, ignore_license=ignore_license)
 
 		self._ldap_post_modify()
@@ -833,16 +972,16 @@ class simpleLdap(base):
 		options = set(self.options)
 		old_options = set(self.old_options)
 		if options != old_options:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'options=%r; old_options=%r' % (options, old_options))
+			univention.admin.log.info('options=%r; old_options=%r', options, old_options)
 		unavailable_options = (options - available_options) | (old_options - available_options)
 		if unavailable_options:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, '%r does not provide options: %r' % (self.module, unavailable_options))
+			univention.admin.log.error('%r does not provide options: %r', self.module, unavailable_options)
 		added_options = options - old_options - unavailable_options
 		removed_options = old_options - options - unavailable_options
 
 		# evaluate extended attributes
 		for prop in getattr(m, 'extended_udm_attributes', []):
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleLdap._modify: extended attribute=%r  oc=%r' % (prop.name, prop.objClass))
+			univention.admin.log.info('simpleLdap._modify: extended attribute=%r  oc=%r', prop.name, prop.objClass)
 
 			if self.has_key(prop.name) and self.info.get(prop.name) and (True if prop.syntax != 'boolean' else self.info.get(prop.name) != '0'):
 				required_ocs |= set([prop.objClass])
@@ -864,7 +1003,7 @@ class simpleLdap(base):
 		if lowerset(self.oldattr.get('objectClass', [])) == ocs:
 			return ml
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'OCS=%r; required=%r; removed: %r' % (ocs, required_ocs, unneeded_ocs))
+		univention.admin.log.info('OCS=%r; required=%r; removed: %r', ocs, required_ocs, unneeded_ocs)
 
 		# case normalize object class names
 		schema = self.lo.get_schema()
@@ -874,9 +1013,9 @@ class simpleLdap(base):
 		if not schema.get_structural_oc(ocs):
 			structural_ocs = schema.get_structural_oc(unneeded_ocs)
 			if not structural_ocs:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'missing structural object class. Modify will fail.')
+				univention.admin.log.error('missing structural object class. Modify will fail.')
 				return ml
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'Preventing to remove last structural object class %r' % (structural_ocs,))
+			univention.admin.log.warn('Preventing to remove last structural object class %r', structural_ocs)
 			ocs -= set(schema.get_obj(ldap.schema.models.ObjectClass, structural_ocs).names)
 
 		# validate removal of object classes
@@ -892,14 +1031,14 @@ class simpleLdap(base):
 			if not val:
 				continue
 			if re.sub(';binary$', '', attr.lower()) not in allowed:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'The attribute %r is not allowed by any object class.' % (attr,))
+				univention.admin.log.warn('The attribute %r is not allowed by any object class.', attr)
 				# ml.append((attr, val, [])) # TODO: Remove the now invalid attribute instead
 				return ml
 
 		# require all MUST attributes to be set
 		for attr in must.values():
 			if not any(newattr.get(name) or newattr.get('%s;binary' % (name,)) for name in attr.names):
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'The attribute %r is required by the current object classes.' % (attr.names,))
+				univention.admin.log.warn('The attribute %r is required by the current object classes.', attr.names)
 				return ml
 
 		ml = [x for x in ml if x[0].lower() != 'objectclass']
@@ -936,13 +1075,13 @@ class simpleLdap(base):
 			self._ldap_post_move(olddn)
 		except:
 			# move back
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'simpleLdap._move: self._ldap_post_move failed, move object back to %s' % olddn)
+			univention.admin.log.warn('simpleLdap._move: self._ldap_post_move failed, move object back to %s', olddn)
 			self.lo.rename(self.dn, olddn)
 			self.dn = olddn
 			raise
 
 	def _remove(self, remove_childs=0):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'handlers/__init__._remove() called for %r with remove_childs=%r' % (self.dn, remove_childs))
+		univention.admin.log.info('handlers/__init__._remove() called for %r with remove_childs=%r', self.dn, remove_childs)
 		self.exceptions = []
 
 		if _prevent_to_change_ad_properties and self._is_synced_object():
@@ -954,18 +1093,18 @@ class simpleLdap(base):
 		if remove_childs:
 			subelements = []
 			if 'FALSE' not in self.lo.getAttr(self.dn, 'hasSubordinates'):
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'handlers/__init__._remove() children of base dn %s' % (self.dn,))
+				univention.admin.log.info('handlers/__init__._remove() children of base dn %s', self.dn)
 				subelements = self.lo.search(base=self.dn, scope='one', attr=[])
 			if subelements:
 				try:
 					for subolddn, suboldattrs in subelements:
-						univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'remove: subelement %s' % subolddn)
+						univention.admin.log.info('remove: subelement %s', subolddn)
 						submodule = univention.admin.modules.identifyOne(subolddn, suboldattrs)
 						submodule = univention.admin.modules.get(submodule)
 						subobject = univention.admin.objects.get(submodule, None, self.lo, position='', dn=subolddn)
 						subobject.remove(remove_childs)
 				except:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'remove: could not remove subelements')
+					univention.admin.log.info('remove: could not remove subelements')
 
 		self.lo.delete(self.dn)
 		self._exists = False
@@ -980,7 +1119,7 @@ class simpleLdap(base):
 		errors = 0
 		pathResult = None
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "loadPolicyObject: policy_type: %s" % policy_type)
+		univention.admin.log.info("loadPolicyObject: policy_type: %s", policy_type)
 		policy_module = univention.admin.modules.get(policy_type)
 
 		# overwrite property descriptions
@@ -990,9 +1129,7 @@ class simpleLdap(base):
 
 		# retrieve path info from 'cn=directory,cn=univention,<current domain>' object
 		try:
-			pathResult = self.lo.get('cn=directory,cn=univention,' + self.position.getDomain())
-			if not pathResult:
-				pathResult = self.lo.get('cn=default containers,cn=univention,' + self.position.getDomain())
+			pathResult = univention.admin.facts.directory_object(self.lo, self.position.getDomain())[1]
 		except:
 			errors = 1
 		infoattr = "univentionPolicyObject"
@@ -1001,9 +1138,9 @@ class simpleLdap(base):
 				try:
 					self.lo.searchDn(base=i, scope='base')
 					pathlist.append(i)
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "loadPolicyObject: added path %s" % i)
+					univention.admin.log.info("loadPolicyObject: added path %s", i)
 				except Exception:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "loadPolicyObject: invalid path setting: %s does not exist in LDAP" % i)
+					univention.admin.log.info("loadPolicyObject: invalid path setting: %s does not exist in LDAP", i)
 					continue  # looking for next policy container
 				break  # at least one item has been found; so we can stop here since only pathlist[0] is used
 
@@ -1055,12 +1192,12 @@ class simpleLdap(base):
 					policy.mapping.unregister(pname)
 
 	def _update_policies(self):
-		_d = univention.debug.function('admin.handlers.simpleLdap._update_policies')
+		_d = univention.admin.log.function('admin.handlers.simpleLdap._update_policies')
 		for policy_type, policy_object in self.policyObjects.items():
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "simpleLdap._update_policies: processing policy of type: %s" % policy_type)
+			univention.admin.log.info("simpleLdap._update_policies: processing policy of type: %s", policy_type)
 			if policy_object.changes:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "simpleLdap._update_policies: trying to create policy of type: %s" % policy_type)
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "simpleLdap._update_policies: policy_object.info=%s" % policy_object.info)
+				univention.admin.log.info("simpleLdap._update_policies: trying to create policy of type: %s", policy_type)
+				univention.admin.log.info("simpleLdap._update_policies: policy_object.info=%s", policy_object.info)
 				policy_object.create()
 				univention.admin.objects.replacePolicyReference(self, policy_type, policy_object.dn)
 
@@ -1102,6 +1239,144 @@ class simpleLdap(base):
 		return 'synced' in self.oldattr.get('univentionObjectFlag', [])
 
 
+class RecordBatch(object):
+
+	"""DNS and DHCP record maintenance of :class:`simpleComputer` objects.
+
+	Every record change of a computer increases the serial of its DNS zone.
+	A batch only remembers the touched zones and increases each serial once
+	in :meth:`flush`. It also caches the reverse zones of the directory and
+	the host records and DHCP hosts of its computers; :meth:`prefetch` loads
+	the latter with one search per :attr:`CHUNK` computers. Cached entries
+	are dropped whenever a computer changes them.
+
+	A batch with `autoflush` increases zone serials immediately.
+	"""
+	CHUNK = 1000
+	REVERSE_ZONE_FILTER = '(&(objectClass=dNSZone)(relativeDomainName=@)(|(zoneName=*.in-addr.arpa)(zoneName=*.ip6.arpa)))'
+
+	def __init__(self, lo, autoflush=False):
+		self.lo = lo
+		self.autoflush = autoflush
+		self.zones = {}
+		self._reverse_zones = None
+		self._hosts = {}
+		self._dhcp = {}
+
+	def prefetch(self, computers):
+		names = set()
+		macs = set()
+		for computer in computers:
+			names.update(name for name in (computer.oldinfo.get('name'), computer.info.get('name')) if name)
+			macs.update(mac for mac in computer.oldinfo.get('mac', []) + computer.info.get('mac', []) if mac)
+		names, macs = sorted(names), sorted(macs)
+		for i in range(0, len(names), self.CHUNK):
+			self._load_hosts(names[i:i + self.CHUNK])
+		for i in range(0, len(macs), self.CHUNK):
+			self._load_dhcp(macs[i:i + self.CHUNK])
+
+	def _load_hosts(self, names):
+		for name in names:
+			self._hosts[name.lower()] = []
+		names = ''.join(filter_format('(relativeDomainName=%s)', [name]) for name in names)
+		for dn, attrs in self.lo.search(base=self.lo.base, scope='domain', filter='(&(objectClass=dNSZone)(|%s))' % (names,), attr=['relativeDomainName', 'zoneName', 'aRecord', 'aAAARecord']):
+			for name in set(name.lower() for name in attrs.get('relativeDomainName', [])):
+				if name in self._hosts:
+					self._hosts[name].append((dn, attrs))
+
+	def _load_dhcp(self, macs):
+		for mac in macs:
+			self._dhcp[mac.lower()] = []
+		ethernets = ''.join(filter_format('(dhcpHWAddress=%s)', ['ethernet %s' % (mac,)]) for mac in macs)
+		for dn, attrs in self.lo.search(base=self.lo.base, scope='domain', filter='(|%s)' % (ethernets,), attr=['dhcpHWAddress', 'univentionDhcpFixedAddress']):
+			for ethernet in attrs.get('dhcpHWAddress', []):
+				mac = ethernet.lower().replace('ethernet ', '', 1)
+				if mac in self._dhcp:
+					self._dhcp[mac].append((dn, attrs))
+
+	def host_records(self, name):
+		"""Return `(dn, attrs)` of all DNS records with the relativeDomainName `name`."""
+		if name.lower() not in self._hosts:
+			self._load_hosts([name])
+		return self._hosts[name.lower()]
+
+	def dhcp_hosts(self, mac, base=None):
+		"""Return `(dn, attrs)` of all DHCP hosts with the hardware address `mac` below `base`."""
+		if mac.lower() not in self._dhcp:
+			self._load_dhcp([mac])
+		hosts = self._dhcp[mac.lower()]
+		if base:
+			hosts = [(dn, attrs) for dn, attrs in hosts if dn.lower().endswith(',%s' % (base.lower(),))]
+		return hosts
+
+	def reverse_zones(self):
+		"""Return the DNs of all reverse zones."""
+		if self._reverse_zones is None:
+			self._reverse_zones = self.lo.searchDn(base=self.lo.base, scope='domain', filter=self.REVERSE_ZONE_FILTER)
+		return self._reverse_zones
+
+	def forget_host(self, *names):
+		for name in names:
+			if name:
+				self._hosts.pop(name.lower(), None)
+
+	def forget_dhcp(self, mac=None):
+		"""Drop the cached DHCP hosts of `mac`, or of all hardware addresses."""
+		if mac is None:
+			self._dhcp.clear()
+		else:
+			self._dhcp.pop(mac.lower(), None)
+
+	def touch_zone(self, dn, module):
+		"""Increase the serial of the zone `dn` handled by the UDM `module` on the next flush."""
+		if not dn:
+			return
+		self.zones[dn] = module
+		if self.autoflush:
+			self.flush()
+
+	def flush(self):
+		"""Increase the serials of all touched zones once.
+
+		Errors are only logged, as the batch is flushed in `finally` blocks
+		where they would replace the exception of a failed computer.
+		"""
+		zones, self.zones = self.zones, {}
+		position = univention.admin.uldap.position(self.lo.base)
+		for dn, module in sorted(zones.items()):
+			univention.admin.log.info('RecordBatch: increase serial of zone %s', dn)
+			try:
+				zone = module.object(None, self.lo, position, dn)
+				zone.open()
+				zone.modify()
+			except univention.admin.uexceptions.noObject:
+				univention.admin.log.warn('RecordBatch: zone %s has been removed', dn)
+			except Exception as exc:
+				univention.admin.log.error('RecordBatch: increasing the serial of zone %s failed: %s: %s', dn, type(exc).__name__, exc)
+
+
+def modify_computers(objects, ignore_license=0):
+	"""Modify many computer objects sharing one :class:`RecordBatch`, so that
+	their DNS and DHCP records are looked up together and each zone serial is
+	increased once."""
+	objects = list(objects)
+	if not objects:
+		return []
+	batch = RecordBatch(objects[0].lo)
+	batch.prefetch(objects)
+	dns = []
+	try:
+		for obj in objects:
+			obj._record_batch = batch
+			try:
+				dns.append(obj.modify(ignore_license=ignore_license))
+			finally:
+				obj._record_batch = None
+	finally:
+		batch.flush()
+	return dns
+
+
 class simpleComputer(simpleLdap):
 
 	def __init__(self, co, lo, position, dn='', superordinate=None, attributes=[]):
@@ -1137,6 +1412,40 @@ class simpleComputer(simpleLdap):
 				self.oldinfo['ip'].extend(map(lambda x: ipaddr.IPv6Address(x).exploded, self.oldattr['aAAARecord']))
 				self.info['ip'].extend(map(lambda x: ipaddr.IPv6Address(x).exploded, self.oldattr['aAAARecord']))
 
+	_record_batch = None
+
+	@contextlib.contextmanager
+	def _records(self):
+		"""Maintain the DNS and DHCP records in a :class:`RecordBatch`.
+
+		A batch set up by :func:`modify_computers` is used as is, otherwise a
+		new one is flushed when the block ends.
+		"""
+		if self._record_batch is not None:
+			yield self._record_batch
+			return
+		self._record_batch = RecordBatch(self.lo)
+		try:
+			yield self._record_batch
+		finally:
+			batch, self._record_batch = self._record_batch, None
+			batch.flush()
+
+	def __records(self):
+		return self._record_batch or RecordBatch(self.lo, autoflush=True)
+
+	def _create(self):
+		with self._records():
+			return simpleLdap._create(self)
+
+	def _modify(self, modify_childs=1, ignore_license=0):
+		with self._records():
+			return simpleLdap._modify(self, modify_childs, ignore_license)
+
+	def _remove(self, remove_childs=0):
+		with self._records():
+			return simpleLdap._remove(self, remove_childs)
+
 	def getMachineSid(self, lo, position, uidNum, rid=None):
 		# if rid is given, use it regardless of s4 connector
 		if rid:
@@ -1182,10 +1491,10 @@ class simpleComputer(simpleLdap):
 		# return True if valid IPv4 (0.0.0.0 is allowed) or IPv6 address
 		try:
 			ipaddr.IPAddress(ip)
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'IP[%s]? -> Yes' % ip)
+			univention.admin.log.info('IP[%s]? -> Yes', ip)
 			return True
 		except ValueError:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'IP[%s]? -> No' % ip)
+			univention.admin.log.info('IP[%s]? -> No', ip)
 			return False
 
 	def open(self):
@@ -1224,7 +1533,7 @@ class simpleComputer(simpleLdap):
 						if 'aAAARecord' in attr:
 							zoneNames.append((attr['zoneName'][0], map(lambda x: ipaddr.IPv6Address(x).exploded, attr['aAAARecord'])))
 
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'zoneNames: %s' % zoneNames)
+				univention.admin.log.info('zoneNames: %s', zoneNames)
 
 				if zoneNames:
 					for zoneName in zoneNames:
@@ -1235,12 +1544,12 @@ class simpleComputer(simpleLdap):
 						except univention.admin.uexceptions.insufficientInformation, msg:
 							raise univention.admin.uexceptions.insufficientInformation, msg
 
-						univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'results: %s' % results)
+						univention.admin.log.info('results: %s', results)
 						if results:
 							for result in results:
 								for ip in zoneName[1]:
 									self['dnsEntryZoneForward'].append([result, ip])
-							univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'dnsEntryZoneForward: %s' % str(self['dnsEntryZoneForward']))
+							univention.admin.log.info('dnsEntryZoneForward: %s', self['dnsEntryZoneForward'])
 
 			except univention.admin.uexceptions.insufficientInformation, msg:
 				self['dnsEntryZoneForward'] = []
@@ -1254,7 +1563,7 @@ class simpleComputer(simpleLdap):
 						for dn, attr in results:
 							ip = self.__ip_from_ptr(attr['zoneName'][0], attr['relativeDomainName'][0])
 							if not self.__is_ip(ip):
-								univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'simpleComputer: dnsEntryZoneReverse: invalid IP address generated: %r' % (ip,))
+								univention.admin.log.warn('simpleComputer: dnsEntryZoneReverse: invalid IP address generated: %r', ip)
 								continue
 							entry = [self.lo.parentDn(dn), ip]
 							if entry not in self['dnsEntryZoneReverse']:
@@ -1262,7 +1571,7 @@ class simpleComputer(simpleLdap):
 					except univention.admin.uexceptions.insufficientInformation, msg:
 						self['dnsEntryZoneReverse'] = []
 						raise univention.admin.uexceptions.insufficientInformation, msg
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: dnsEntryZoneReverse: %s' % self['dnsEntryZoneReverse'])
+			univention.admin.log.info('simpleComputer: dnsEntryZoneReverse: %s', self['dnsEntryZoneReverse'])
 
 			if zoneNames:
 				for zoneName in zoneNames:
@@ -1284,7 +1593,7 @@ class simpleComputer(simpleLdap):
 					except univention.admin.uexceptions.insufficientInformation, msg:
 						self['dnsEntryZoneAlias'] = []
 						raise univention.admin.uexceptions.insufficientInformation, msg
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: dnsEntryZoneAlias: %s' % self['dnsEntryZoneAlias'])
+			univention.admin.log.info('simpleComputer: dnsEntryZoneAlias: %s', self['dnsEntryZoneAlias'])
 
 			if self['mac']:
 				for macAddress in self['mac']:
@@ -1292,13 +1601,13 @@ class simpleComputer(simpleLdap):
 					if not macAddress:
 						continue
 
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'open: DHCP; we have a mac address: %s' % macAddress)
+					univention.admin.log.info('open: DHCP; we have a mac address: %s', macAddress)
 					ethernet = 'ethernet ' + macAddress
 					searchFilter = filter_format('(&(dhcpHWAddress=%s)(objectClass=univentionDhcpHost))', (ethernet,))
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'open: DHCP; we search for "%s"' % searchFilter)
+					univention.admin.log.info('open: DHCP; we search for "%s"', searchFilter)
 					try:
 						results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['univentionDhcpFixedAddress'], filter=searchFilter, unique=False)
-						univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'open: DHCP; the result: "%s"' % results)
+						univention.admin.log.info('open: DHCP; the result: "%s"', results)
 						for dn, attr in results:
 							service = self.lo.parentDn(dn)
 							if 'univentionDhcpFixedAddress' in attr:
@@ -1311,7 +1620,7 @@ class simpleComputer(simpleLdap):
 								entry = (service, '', macAddress)
 								if entry not in self['dhcpEntryZone']:
 									self['dhcpEntryZone'].append(entry)
-						univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'open: DHCP; self[ dhcpEntryZone ] = "%s"' % self['dhcpEntryZone'])
+						univention.admin.log.info('open: DHCP; self[ dhcpEntryZone ] = "%s"', self['dhcpEntryZone'])
 
 					except univention.admin.uexceptions.insufficientInformation, msg:
 						raise univention.admin.uexceptions.insufficientInformation, msg
@@ -1336,7 +1645,7 @@ class simpleComputer(simpleLdap):
 		# identify the dhcp object with the mac address
 
 		name = self['name']
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '__modify_dhcp_object: position: "%s"; name: "%s"; mac: "%s"; ip: "%s"' % (position, name, mac, ip))
+		univention.admin.log.info('__modify_dhcp_object: position: "%s"; name: "%s"; mac: "%s"; ip: "%s"', position, name, mac, ip)
 		if not all((name, mac)):
 			return
 
@@ -1344,19 +1653,21 @@ class simpleComputer(simpleLdap):
 
 		tmppos = univention.admin.uldap.position(self.position.getDomain())
 		if not position:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.WARN, 'could not access network object and given position is "None", using LDAP root as position for DHCP entry')
+			univention.admin.log.warn('could not access network object and given position is "None", using LDAP root as position for DHCP entry')
 			position = tmppos.getBase()
-		results = self.lo.search(base=position, scope='domain', attr=['univentionDhcpFixedAddress'], filter=filter_format('dhcpHWAddress=%s', [ethernet]), unique=False)
+		records = self.__records()
+		results = records.dhcp_hosts(mac, position)
+		records.forget_dhcp(mac)
 
 		if not results:
 			# if the dhcp object doesn't exists, then we create it
 			# but it is possible, that the hostname for the dhcp object is already used, so we use the _uv$NUM extension
 
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'the dhcp object with the mac address "%s" does not exists, we create one' % ethernet)
+			univention.admin.log.info('the dhcp object with the mac address "%s" does not exists, we create one', ethernet)
 
 			results = self.lo.searchDn(base=position, scope='domain', filter=filter_format('(&(objectClass=univentionDhcpHost)(|(cn=%s)(cn=%s_uv*)))', (name, name)), unique=False)
 			if results:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'the host "%s" already has a dhcp object, so we search for the next free uv name' % (name))
+				univention.admin.log.info('the host "%s" already has a dhcp object, so we search for the next free uv name', name)
 				RE = re.compile(r'cn=[^,]+_uv(\d+),')
 				taken = set(int(m.group(1)) for m in (RE.match(dn) for dn in results) if m)
 				n = min(set(range(max(taken) + 1)) - taken) if taken else 0
@@ -1370,21 +1681,22 @@ class simpleComputer(simpleLdap):
 				('univentionDhcpFixedAddress', [ip]),
 				('dhcpHWAddress', [ethernet]),
 			])
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we just added the object "%s"' % (dn,))
+			univention.admin.log.info('we just added the object "%s"', dn)
 		else:
 			# if the object already exists, we append or remove the ip address
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'the dhcp object with the mac address "%s" exists, we change the ip' % ethernet)
+			univention.admin.log.info('the dhcp object with the mac address "%s" exists, we change the ip', ethernet)
 			for dn, attr in results:
 				if ip:
 					if ip in attr.get('univentionDhcpFixedAddress', []):
 						continue
 					self.lo.modify(dn, [('univentionDhcpFixedAddress', '', ip)])
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we added the ip "%s"' % ip)
+					univention.admin.log.info('we added the ip "%s"', ip)
 				else:
 					self.lo.modify(dn, [('univentionDhcpFixedAddress', ip, '')])
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we removed the ip "%s"' % ip)
+					univention.admin.log.info('we removed the ip "%s"', ip)
 
 	def __rename_dns_object(self, position=None, old_name=None, new_name=None):
+		self.__records().forget_host(old_name, new_name)
 		for dns_line in self['dnsEntryZoneForward']:
 			# dns_line may be the empty string
 			if not dns_line:
@@ -1424,17 +1736,18 @@ class simpleComputer(simpleLdap):
 
 	def __rename_dhcp_object(self, old_name, new_name):
 		module = univention.admin.modules.get('dhcp/host')
-		tmppos = univention.admin.uldap.position(self.position.getDomain())
 		for mac in self['mac']:
 			# mac may be the empty string
 			if not mac:
 				continue
 			ethernet = 'ethernet %s' % mac
 
-			results = self.lo.searchDn(base=tmppos.getBase(), scope='domain', filter=filter_format('dhcpHWAddress=%s', [ethernet]), unique=False)
+			records = self.__records()
+			results = [host_dn for host_dn, attrs in records.dhcp_hosts(mac)]
+			records.forget_dhcp(mac)
 			if not results:
 				continue
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: filter [ dhcpHWAddress = %s ]; results: %s' % (ethernet, results))
+			univention.admin.log.info('simpleComputer: filter [ dhcpHWAddress = %s ]; results: %s', ethernet, results)
 
 			for result in results:
 				object = univention.admin.objects.get(module, self.co, self.lo, position=self.position, dn=result)
@@ -1446,20 +1759,21 @@ class simpleComputer(simpleLdap):
 		# if we got the mac address, then we remove the object
 		# if we only got the ip address, we remove the ip address
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should remove a dhcp object: mac="%s", ip="%s"' % (mac, ip))
+		univention.admin.log.info('we should remove a dhcp object: mac="%s", ip="%s"', mac, ip)
 
 		dn = None
 
 		tmppos = univention.admin.uldap.position(self.position.getDomain())
+		records = self.__records()
 		if ip and mac:
-			ethernet = 'ethernet %s' % mac
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we only remove the ip "%s" from the dhcp object' % ip)
-			results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['univentionDhcpFixedAddress'], filter=filter_format('(&(dhcpHWAddress=%s)(univentionDhcpFixedAddress=%s))', (ethernet, ip)), unique=False)
+			univention.admin.log.info('we only remove the ip "%s" from the dhcp object', ip)
+			results = [(host_dn, attrs) for host_dn, attrs in records.dhcp_hosts(mac) if ip in attrs.get('univentionDhcpFixedAddress', [])]
+			records.forget_dhcp(mac)
 			for dn, attr in results:
 				object = univention.admin.objects.get(univention.admin.modules.get('dhcp/host'), self.co, self.lo, position=self.position, dn=dn)
 				object.open()
 				if ip in object['fixedaddress']:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'fixedaddress: "%s"' % object['fixedaddress'])
+					univention.admin.log.info('fixedaddress: "%s"', object['fixedaddress'])
 					object['fixedaddress'].remove(ip)
 					if len(object['fixedaddress']) == 0:
 						object.remove()
@@ -1468,20 +1782,21 @@ class simpleComputer(simpleLdap):
 					dn = object.dn
 
 		elif mac:
-			ethernet = 'ethernet %s' % mac
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'Remove the following mac: ethernet: "%s"' % ethernet)
-			results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['univentionDhcpFixedAddress'], filter=filter_format('dhcpHWAddress=%s', [ethernet]), unique=False)
+			univention.admin.log.info('Remove the following mac: ethernet: "ethernet %s"', mac)
+			results = records.dhcp_hosts(mac)
+			records.forget_dhcp(mac)
 			for dn, attr in results:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '... done')
+				univention.admin.log.info('... done')
 				object = univention.admin.objects.get(univention.admin.modules.get('dhcp/host'), self.co, self.lo, position=self.position, dn=dn)
 				object.remove()
 				dn = object.dn
 
 		elif ip:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'Remove the following ip: "%s"' % ip)
+			univention.admin.log.info('Remove the following ip: "%s"', ip)
 			results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['univentionDhcpFixedAddress'], filter=filter_format('univentionDhcpFixedAddress=%s', [ip]), unique=False)
+			records.forget_dhcp()
 			for dn, attr in results:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '... done')
+				univention.admin.log.info('... done')
 				object = univention.admin.objects.get(univention.admin.modules.get('dhcp/host'), self.co, self.lo, position=self.position, dn=dn)
 				object.remove()
 				dn = object.dn
@@ -1509,7 +1824,7 @@ class simpleComputer(simpleLdap):
 		else:
 			ip = None
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'Split entry %s into zone %s and ip %s' % (entry, zone, ip))
+		univention.admin.log.info('Split entry %s into zone %s and ip %s', entry, zone, ip)
 		return (zone, ip)
 
 	def __remove_dns_reverse_object(self, name, dnsEntryZoneReverse, ip):
@@ -1519,38 +1834,34 @@ class simpleComputer(simpleLdap):
 				if len(attributes['pTRRecord']) == 1:
 					self.lo.delete('relativeDomainName=%s,%s' % (escape_dn_chars(rdn), zoneDN))
 				else:
-					for dn2, attributes2 in self.lo.search(scope='domain', attr=['zoneName'], filter=filter_format('(&(relativeDomainName=%s)(objectClass=dNSZone))', [name]), unique=False):
-						self.lo.modify(dn, [('pTRRecord', '%s.%s.' % (name, attributes2['zoneName'][0]), '')])
+					for dn2, attributes2 in self.__records().host_records(name):
+						if attributes2.get('zoneName'):
+							self.lo.modify(dn, [('pTRRecord', '%s.%s.' % (name, attributes2['zoneName'][0]), '')])
 
-				zone = univention.admin.handlers.dns.reverse_zone.object(self.co, self.lo, self.position, zoneDN)
-				zone.open()
-				zone.modify()
+				self.__records().touch_zone(zoneDN, univention.admin.handlers.dns.reverse_zone)
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should remove a dns reverse object: dnsEntryZoneReverse="%s", name="%s", ip="%s"' % (dnsEntryZoneReverse, name, ip))
+		univention.admin.log.info('we should remove a dns reverse object: dnsEntryZoneReverse="%s", name="%s", ip="%s"', dnsEntryZoneReverse, name, ip)
 		if dnsEntryZoneReverse:
 			rdn = self.calc_dns_reverse_entry_name(ip, dnsEntryZoneReverse)
 			if rdn:
 				modify(rdn, dnsEntryZoneReverse)
 
 		elif ip:
-			tmppos = univention.admin.uldap.position(self.position.getDomain())
-			results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['zoneDn'], filter=filter_format('(&(objectClass=dNSZone)(|(pTRRecord=%s)(pTRRecord=%s.*)))', (name, name)), unique=False)
-			for dn, attr in results:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'DEBUG: dn: "%s"' % dn)
-				zone = self.lo.parentDn(dn)
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'DEBUG: zone: "%s"' % zone)
+			# only reverse zones containing the IP address can hold its pointer record
+			for zone in self.__records().reverse_zones():
 				rdn = self.calc_dns_reverse_entry_name(ip, zone)
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'DEBUG: rdn: "%s"' % rdn)
-				if rdn:
-					try:
-						modify(rdn, zone)
-					except univention.admin.uexceptions.noObject:
-						pass
+				if not rdn or not self.lo.searchDn(base=zone, scope='one', filter=filter_format('(|(pTRRecord=%s)(pTRRecord=%s.*))', (name, name))):
+					continue
+				univention.admin.log.info('remove pointer record %s of zone %s', rdn, zone)
+				try:
+					modify(rdn, zone)
+				except univention.admin.uexceptions.noObject:
+					pass
 
 	def __add_dns_reverse_object(self, name, zoneDn, ip):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should create a dns reverse object: zoneDn="%s", name="%s", ip="%s"' % (zoneDn, name, ip))
+		univention.admin.log.info('we should create a dns reverse object: zoneDn="%s", name="%s", ip="%s"', zoneDn, name, ip)
 		if name and zoneDn and ip:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'dns reverse object: start')
+			univention.admin.log.info('dns reverse object: start')
 			hostname_list = []
 			if ':' in ip:  # IPv6, e.g. ip=2001:db8:100::5
 				# 0.1.8.b.d.0.1.0.0.2.ip6.arpa → 0.1.8.b.d.1.0.0.2 → ['0', '1', '8', 'b', 'd', '0', '1', '0', '0', '2', ]
@@ -1573,7 +1884,7 @@ class simpleComputer(simpleLdap):
 				ipPart = '.'.join(pointer)
 				tmppos = univention.admin.uldap.position(self.position.getDomain())
 				# check in which forward zone the ip is set
-				results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['zoneName'], filter=filter_format('(&(relativeDomainName=%s)(aAAARecord=%s))', (name, ip)), unique=False)
+				results = [(dn, attr) for dn, attr in self.__records().host_records(name) if ip.lower() in [x.lower() for x in attr.get('aAAARecord', [])]]
 			else:
 				subnet = '%s.' % ('.'.join(reversed(explode_dn(zoneDn, 1)[0].replace('.in-addr.arpa', '').split('.'))))
 				ipPart = re.sub('^%s' % (re.escape(subnet),), '', ip)
@@ -1582,7 +1893,7 @@ class simpleComputer(simpleLdap):
 				ipPart = '.'.join(reversed(ipPart.split('.')))
 				tmppos = univention.admin.uldap.position(self.position.getDomain())
 				# check in which forward zone the ip is set
-				results = self.lo.search(base=tmppos.getBase(), scope='domain', attr=['zoneName'], filter=filter_format('(&(relativeDomainName=%s)(aRecord=%s))', (name, ip)), unique=False)
+				results = [(dn, attr) for dn, attr in self.__records().host_records(name) if ip in attr.get('aRecord', [])]
 			if results:
 				for dn, attr in results:
 					if 'zoneName' in attr:
@@ -1591,7 +1902,7 @@ class simpleComputer(simpleLdap):
 							hostname_list.append(hostname)
 
 			if not hostname_list:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'Could not determine host record for name=%r, ip=%r. Not creating pointer record.' % (name, ip))
+				univention.admin.log.error('Could not determine host record for name=%r, ip=%r. Not creating pointer record.', name, ip)
 				return
 
 			# check if the object exists
@@ -1606,27 +1917,24 @@ class simpleComputer(simpleLdap):
 				])
 
 				# update Serial
-				zone = univention.admin.handlers.dns.reverse_zone.object(self.co, self.lo, self.position, zoneDn)
-				zone.open()
-				zone.modify()
+				self.__records().touch_zone(zoneDn, univention.admin.handlers.dns.reverse_zone)
 
 	def __remove_dns_forward_object(self, name, zoneDn, ip=None):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should remove a dns forward object: zoneDn="%s", name="%s", ip="%s"' % (zoneDn, name, ip))
+		univention.admin.log.info('we should remove a dns forward object: zoneDn="%s", name="%s", ip="%s"', zoneDn, name, ip)
+		self.__records().forget_host(name)
 		if name:
 			# check if dns forward object has more than one ip address
 			if not ip:
 				if zoneDn:
 					self.lo.delete('relativeDomainName=%s,%s' % (escape_dn_chars(name), zoneDn))
-					zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zoneDn)
-					zone.open()
-					zone.modify()
+					self.__records().touch_zone(zoneDn, univention.admin.handlers.dns.forward_zone)
 			else:
 				if zoneDn:
 					base = zoneDn
 				else:
 					tmppos = univention.admin.uldap.position(self.position.getDomain())
 					base = tmppos.getBase()
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'search base="%s"' % base)
+				univention.admin.log.info('search base="%s"', base)
 				if ':' in ip:
 					ip = ipaddr.IPv6Address(ip).exploded
 					(attrEdit, attrOther, ) = ('aAAARecord', 'aRecord', )
@@ -1642,9 +1950,7 @@ class simpleComputer(simpleLdap):
 						else:
 							zone = zoneDn
 
-						zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zone)
-						zone.open()
-						zone.modify()
+						self.__records().touch_zone(zone, univention.admin.handlers.dns.forward_zone)
 					else:
 						# remove only the ip address attribute
 						new_ip_list = copy.deepcopy(attr[attrEdit])
@@ -1653,13 +1959,11 @@ class simpleComputer(simpleLdap):
 						self.lo.modify(dn, [(attrEdit, attr[attrEdit], new_ip_list, ), ])
 
 						if not zoneDn:
-							zone = self.lo.parentDn(zoneDn)
+							zone = self.lo.parentDn(dn)
 						else:
 							zone = zoneDn
 
-						zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zone)
-						zone.open()
-						zone.modify()
+						self.__records().touch_zone(zone, univention.admin.handlers.dns.forward_zone)
 
 	def __add_related_ptrrecords(self, zoneDN, ip):
 		if not all((zoneDN, ip)):
@@ -1683,18 +1987,19 @@ class simpleComputer(simpleLdap):
 				self.lo.modify(dn, [('pTRRecord', ptrrecord, '')])
 
 	def check_common_name_length(self):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'check_common_name_length with self["ip"] = %r and self["dnsEntryZoneForward"] = %r' % (self['ip'], self['dnsEntryZoneForward'], ))
+		univention.admin.log.info('check_common_name_length with self["ip"] = %r and self["dnsEntryZoneForward"] = %r', self['ip'], self['dnsEntryZoneForward'])
 		if len(self['ip']) > 0 and len(self['dnsEntryZoneForward']) > 0:
 			for zone in self['dnsEntryZoneForward']:
 				if zone == '':
 					continue
 				zoneName = univention.admin.uldap.explodeDn(zone[0], 1)[0]
 				if len(zoneName) + len(self['name']) >= 63:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: length of Common Name is too long: %d' % (len(zoneName) + len(self['name']) + 1))
+					univention.admin.log.info('simpleComputer: length of Common Name is too long: %d', len(zoneName) + len(self['name']) + 1)
 					raise univention.admin.uexceptions.commonNameTooLong
 
 	def __modify_dns_forward_object(self, name, zoneDn, new_ip, old_ip):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should modify a dns forward object: zoneDn="%s", name="%s", new_ip="%s", old_ip="%s"' % (zoneDn, name, new_ip, old_ip))
+		univention.admin.log.info('we should modify a dns forward object: zoneDn="%s", name="%s", new_ip="%s", old_ip="%s"', zoneDn, name, new_ip, old_ip)
+		self.__records().forget_host(name)
 		zone = None
 		if old_ip and new_ip:
 			if not zoneDn:
@@ -1738,16 +2043,15 @@ class simpleComputer(simpleLdap):
 				zone = zoneDn
 
 			if zone:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'update the zon sOARecord for the zone: %s' % zone)
+				univention.admin.log.info('update the zon sOARecord for the zone: %s', zone)
 
-				zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zone)
-				zone.open()
-				zone.modify()
+				self.__records().touch_zone(zone, univention.admin.handlers.dns.forward_zone)
 
 	def __add_dns_forward_object(self, name, zoneDn, ip):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should add a dns forward object: zoneDn="%s", name="%s", ip="%s"' % (zoneDn, name, ip))
+		univention.admin.log.info('we should add a dns forward object: zoneDn="%s", name="%s", ip="%s"', zoneDn, name, ip)
 		if not all((name, ip, zoneDn)):
 			return
+		self.__records().forget_host(name)
 		if ip.find(':') != -1:  # IPv6
 			self.__add_dns_forward_object_ipv6(name, zoneDn, ipaddr.IPv6Address(ip).exploded)
 		else:
@@ -1768,9 +2072,7 @@ class simpleComputer(simpleLdap):
 				except univention.admin.uexceptions.objectExists, dn:
 					raise univention.admin.uexceptions.dnsAliasRecordExists, dn
 				# TODO: check if zoneDn really a forwardZone, maybe it is a container under a zone
-				zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zoneDn)
-				zone.open()
-				zone.modify()
+				self.__records().touch_zone(zoneDn, univention.admin.handlers.dns.forward_zone)
 			else:
 				for dn, attr in results:
 					if 'aAAARecord' in attr:
@@ -1795,9 +2097,7 @@ class simpleComputer(simpleLdap):
 				except univention.admin.uexceptions.objectExists, dn:
 					raise univention.admin.uexceptions.dnsAliasRecordExists, dn
 				# TODO: check if zoneDn really a forwardZone, maybe it is a container under a zone
-				zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zoneDn)
-				zone.open()
-				zone.modify()
+				self.__records().touch_zone(zoneDn, univention.admin.handlers.dns.forward_zone)
 			else:
 				for dn, attr in results:
 					if 'aRecord' in attr:
@@ -1809,8 +2109,9 @@ class simpleComputer(simpleLdap):
 						self.lo.modify(dn, [('aRecord', '', ip)])
 
 	def __add_dns_alias_object(self, name, dnsForwardZone, dnsAliasZoneContainer, alias):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'add a dns alias object: name="%s", dnsForwardZone="%s", dnsAliasZoneContainer="%s", alias="%s"' % (name, dnsForwardZone, dnsAliasZoneContainer, alias))
+		univention.admin.log.info('add a dns alias object: name="%s", dnsForwardZone="%s", dnsAliasZoneContainer="%s", alias="%s"', name, dnsForwardZone, dnsAliasZoneContainer, alias)
 		alias = alias.rstrip('.')
+		self.__records().forget_host(alias)
 		if name and dnsForwardZone and dnsAliasZoneContainer and alias:
 			results = self.lo.search(base=dnsAliasZoneContainer, scope='domain', attr=['cNAMERecord'], filter=filter_format('relativeDomainName=%s', (alias,)), unique=False)
 			if not results:
@@ -1823,26 +2124,23 @@ class simpleComputer(simpleLdap):
 				])
 
 				# TODO: check if dnsAliasZoneContainer really is a forwardZone, maybe it is a container under a zone
-				zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, dnsAliasZoneContainer)
-				zone.open()
-				zone.modify()
+				self.__records().touch_zone(dnsAliasZoneContainer, univention.admin.handlers.dns.forward_zone)
 			else:
 				# thow exeption, cNAMERecord is single value
 				raise univention.admin.uexceptions.dnsAliasAlreadyUsed, _('DNS alias is already in use.')
 
 	def __remove_dns_alias_object(self, name, dnsForwardZone, dnsAliasZoneContainer, alias=None):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'remove a dns alias object: name="%s", dnsForwardZone="%s", dnsAliasZoneContainer="%s", alias="%s"' % (name, dnsForwardZone, dnsAliasZoneContainer, alias))
+		univention.admin.log.info('remove a dns alias object: name="%s", dnsForwardZone="%s", dnsAliasZoneContainer="%s", alias="%s"', name, dnsForwardZone, dnsAliasZoneContainer, alias)
+		self.__records().forget_host(alias)
 		if name:
 			if alias:
 				if dnsAliasZoneContainer:
 					self.lo.delete('relativeDomainName=%s,%s' % (escape_dn_chars(alias), dnsAliasZoneContainer))
-					zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, dnsAliasZoneContainer)
-					zone.open()
-					zone.modify()
+					self.__records().touch_zone(dnsAliasZoneContainer, univention.admin.handlers.dns.forward_zone)
 				elif dnsForwardZone:
 					tmppos = univention.admin.uldap.position(self.position.getDomain())
 					base = tmppos.getBase()
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'search base="%s"' % base)
+					univention.admin.log.info('search base="%s"', base)
 					results = self.lo.search(base=base, scope='domain', attr=['zoneName'], filter=filter_format('(&(objectClass=dNSZone)(relativeDomainName=%s)(cNAMERecord=%s.%s.))', (alias, name, dnsForwardZone)), unique=False, required=False)
 					for dn, attr in results:
 						# remove the object
@@ -1850,9 +2148,7 @@ class simpleComputer(simpleLdap):
 						# and update the SOA version number for the zone
 						results = self.lo.searchDn(base=tmppos.getBase(), scope='domain', filter=filter_format('(&(objectClass=dNSZone)(zoneName=%s)(relativeDomainName=@))', (attr['zoneName'][0],)), unique=False)
 						for zoneDn in results:
-							zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zoneDn)
-							zone.open()
-							zone.modify()
+							self.__records().touch_zone(zoneDn, univention.admin.handlers.dns.forward_zone)
 					else:
 						# could thow some exeption
 						pass
@@ -1860,7 +2156,7 @@ class simpleComputer(simpleLdap):
 				if dnsForwardZone:
 					tmppos = univention.admin.uldap.position(self.position.getDomain())
 					base = tmppos.getBase()
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'search base="%s"' % base)
+					univention.admin.log.info('search base="%s"', base)
 					results = self.lo.search(base=base, scope='domain', attr=['zoneName'], filter=filter_format('(&(objectClass=dNSZone)(&(cNAMERecord=%s)(cNAMERecord=%s.%s.))', (name, name, dnsForwardZone)), unique=False, required=False)
 					for dn, attr in results:
 						# remove the object
@@ -1868,9 +2164,7 @@ class simpleComputer(simpleLdap):
 						# and update the SOA version number for the zone
 						results = self.lo.searchDn(base=tmppos.getBase(), scope='domain', filter=filter_format('(&(objectClass=dNSZone)(zoneName=%s)(relativeDomainName=@))', (attr['zoneName'][0],)), unique=False)
 						for zoneDn in results:
-							zone = univention.admin.handlers.dns.forward_zone.object(self.co, self.lo, self.position, zoneDn)
-							zone.open()
-							zone.modify()
+							self.__records().touch_zone(zoneDn, univention.admin.handlers.dns.forward_zone)
 				else:  # not enough info to remove alias entries
 					pass
 
@@ -1879,7 +2173,7 @@ class simpleComputer(simpleLdap):
 		self.__multiip |= len(self['mac']) > 1 or len(self['ip']) > 1
 
 		for entry in self.__changes['dhcpEntryZone']['remove']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: dhcp check: removed: %s' % (entry,))
+			univention.admin.log.info('simpleComputer: dhcp check: removed: %s', entry)
 			dn, ip, mac = self.__split_dhcp_line(entry)
 			if not ip and not mac and not self.__multiip:
 				mac = ''
@@ -1890,7 +2184,7 @@ class simpleComputer(simpleLdap):
 				self.__remove_from_dhcp_object(ip=ip, mac=mac)
 
 		for entry in self.__changes['dhcpEntryZone']['add']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: dhcp check: added: %s' % (entry,))
+			univention.admin.log.info('simpleComputer: dhcp check: added: %s', entry)
 			dn, ip, mac = self.__split_dhcp_line(entry)
 			if not ip and not mac and not self.__multiip:
 				ip, mac = ('', '')
@@ -1913,11 +2207,11 @@ class simpleComputer(simpleLdap):
 				self.__remove_related_ptrrecords(dn, ip)
 
 		for entry in self.__changes['dnsEntryZoneForward']['add']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should add a dns forward object "%s"' % (entry,))
+			univention.admin.log.info('we should add a dns forward object "%s"', entry)
 			dn, ip = self.__split_dns_line(entry)
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'changed the object to dn="%s" and ip="%s"' % (dn, ip))
+			univention.admin.log.info('changed the object to dn="%s" and ip="%s"', dn, ip)
 			if not ip and not self.__multiip:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'no multiip environment')
+				univention.admin.log.info('no multiip environment')
 				ip = ''
 				if self['ip']:
 					ip = self['ip'][0]
@@ -1956,9 +2250,9 @@ class simpleComputer(simpleLdap):
 				self.__remove_dns_alias_object(self['name'], dnsForwardZone, dnsAliasZoneContainer, alias)
 
 		for entry in self.__changes['dnsEntryZoneAlias']['add']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should add a dns alias object "%s"' % (entry,))
+			univention.admin.log.info('we should add a dns alias object "%s"', entry)
 			dnsForwardZone, dnsAliasZoneContainer, alias = entry
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'changed the object to dnsForwardZone [%s], dnsAliasZoneContainer [%s] and alias [%s]' % (dnsForwardZone, dnsAliasZoneContainer, alias))
+			univention.admin.log.info('changed the object to dnsForwardZone [%s], dnsAliasZoneContainer [%s] and alias [%s]', dnsForwardZone, dnsAliasZoneContainer, alias)
 			if not alias:
 				self.__add_dns_alias_object(self['name'], dnsForwardZone, dnsAliasZoneContainer, self['alias'][0])
 			else:
@@ -2004,7 +2298,7 @@ class simpleComputer(simpleLdap):
 						self.__add_dns_reverse_object(self['name'], x, entry)
 
 		if self.__changes['name']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: name has changed')
+			univention.admin.log.info('simpleComputer: name has changed')
 			self.__update_groups_after_namechange()
 			self.__rename_dhcp_object(old_name=self.__changes['name'][0], new_name=self.__changes['name'][1])
 			self.__rename_dns_object(position=None, old_name=self.__changes['name'][0], new_name=self.__changes['name'][1])
@@ -2250,7 +2544,7 @@ class simpleComputer(simpleLdap):
 
 	def _ldap_post_create(self):
 		for entry in self.__changes['dhcpEntryZone']['remove']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: dhcp check: removed: %s' % (entry,))
+			univention.admin.log.info('simpleComputer: dhcp check: removed: %s', entry)
 			dn, ip, mac = self.__split_dhcp_line(entry)
 			if not ip and not mac and not self.__multiip:
 				mac = ''
@@ -2261,7 +2555,7 @@ class simpleComputer(simpleLdap):
 				self.__remove_from_dhcp_object(ip=ip, mac=mac)
 
 		for entry in self.__changes['dhcpEntryZone']['add']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simpleComputer: dhcp check: added: %s' % (entry,))
+			univention.admin.log.info('simpleComputer: dhcp check: added: %s', entry)
 			dn, ip, mac = self.__split_dhcp_line(entry)
 			if not ip and not mac and not self.__multiip:
 				if len(self['ip']) > 0 and len(self['mac']) > 0:
@@ -2280,11 +2574,11 @@ class simpleComputer(simpleLdap):
 				self.__remove_dns_forward_object(self['name'], dn, ip)
 
 		for entry in self.__changes['dnsEntryZoneForward']['add']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should add a dns forward object "%s"' % (entry,))
+			univention.admin.log.info('we should add a dns forward object "%s"', entry)
 			dn, ip = self.__split_dns_line(entry)
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'changed the object to dn="%s" and ip="%s"' % (dn, ip))
+			univention.admin.log.info('changed the object to dn="%s" and ip="%s"', dn, ip)
 			if not ip and not self.__multiip:
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'no multiip environment')
+				univention.admin.log.info('no multiip environment')
 				ip = ''
 				if self['ip']:
 					ip = self['ip'][0]
@@ -2332,9 +2626,9 @@ class simpleComputer(simpleLdap):
 			else:
 				self.__remove_dns_alias_object(self['name'], dnsForwardZone, dnsAliasZoneContainer, alias)
 		for entry in self.__changes['dnsEntryZoneAlias']['add']:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'we should add a dns alias object "%s"' % (entry,))
+			univention.admin.log.info('we should add a dns alias object "%s"', entry)
 			dnsForwardZone, dnsAliasZoneContainer, alias = entry
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'changed the object to dnsForwardZone [%s], dnsAliasZoneContainer [%s] and alias [%s]' % (dnsForwardZone, dnsAliasZoneContainer, alias))
+			univention.admin.log.info('changed the object to dnsForwardZone [%s], dnsAliasZoneContainer [%s] and alias [%s]', dnsForwardZone, dnsAliasZoneContainer, alias)
 			if not alias:
 				self.__add_dns_alias_object(self['name'], dnsForwardZone, dnsAliasZoneContainer, self['alias'][0])
 			else:
@@ -2376,7 +2670,7 @@ class simpleComputer(simpleLdap):
 		oldname = self.oldinfo.get('name')
 		newname = self.info.get('name')
 		if not oldname:
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, '__update_groups_after_namechange: oldname is empty')
+			univention.admin.log.error('__update_groups_after_namechange: oldname is empty')
 			return
 
 		# Since self.dn is not updated yet, self.dn contains still the old DN.
@@ -2384,11 +2678,11 @@ class simpleComputer(simpleLdap):
 		olddn = 'cn=%s,%s' % (escape_dn_chars(oldname), self.lo.parentDn(self.dn))
 		newdn = 'cn=%s,%s' % (escape_dn_chars(newname), self.lo.parentDn(self.dn))
 
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '__update_groups_after_namechange: olddn=%s' % olddn)
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '__update_groups_after_namechange: newdn=%s' % newdn)
+		univention.admin.log.info('__update_groups_after_namechange: olddn=%s', olddn)
+		univention.admin.log.info('__update_groups_after_namechange: newdn=%s', newdn)
 
 		for group in self.info.get('groups', []):
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '__update_groups_after_namechange: grp=%s' % group)
+			univention.admin.log.info('__update_groups_after_namechange: grp=%s', group)
 
 			# Using the UDM groups/group object does not work at this point. The computer object has already been renamed.
 			# During open() of groups/group each member is checked if it exists. Because the computer object with "olddn" is missing,
@@ -2416,7 +2710,7 @@ class simpleComputer(simpleLdap):
 	def update_groups(self):
 		if not self.hasChanged('groups') and not self.oldPrimaryGroupDn and not self.newPrimaryGroupDn:
 			return
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'updating groups')
+		univention.admin.log.info('updating groups')
 
 		old_groups = DN.set(self.oldinfo.get('groups', []))
 		new_groups = DN.set(self.info.get('groups', []))
@@ -2448,7 +2742,7 @@ class simpleComputer(simpleLdap):
 	def primary_group(self):
 		if not self.hasChanged('primaryGroup'):
 			return
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'updating primary groups')
+		univention.admin.log.info('updating primary groups')
 
 		primaryGroupNumber = self.lo.getAttr(self['primaryGroup'], 'gidNumber', required=True)
 		self.newPrimaryGroupDn = self['primaryGroup']
@@ -2493,7 +2787,7 @@ class simpleComputer(simpleLdap):
 					self.exceptions.append([_('DNS Alias'), _('delete'), e])
 
 		# remove service record entries (see Bug #26400)
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '_ldap_post_remove: clean up service records, host records, and IP address saved at the forward zone')
+		univention.admin.log.info('_ldap_post_remove: clean up service records, host records, and IP address saved at the forward zone')
 		ips = set(self['ip'] or [])
 		fqdn = self['fqdn']
 		fqdnDot = '%s.' % fqdn  # we might have entires w/ or w/out trailing '.'
@@ -2501,7 +2795,7 @@ class simpleComputer(simpleLdap):
 		# iterate over all reverse zones
 		for zone in self['dnsEntryZoneReverse'] or []:
 			# load zone object
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'clean up entries for zone: %s' % zone)
+			univention.admin.log.info('clean up entries for zone: %s', zone)
 			if len(zone) < 1:
 				continue
 			zoneObj = univention.admin.objects.get(
@@ -2511,10 +2805,7 @@ class simpleComputer(simpleLdap):
 			# clean up nameserver records
 			if 'nameserver' in zoneObj:
 				if fqdnDot in zoneObj['nameserver']:
-					univention.debug.debug(
-						univention.debug.ADMIN,
-						univention.debug.INFO,
-						'removing %s from dns zone %s' % (fqdnDot, zone[0]))
+					univention.admin.log.info('removing %s from dns zone %s', fqdnDot, zone[0])
 					# nameserver is required in reverse zone
 					if len(zoneObj['nameserver']) > 1:
 						zoneObj['nameserver'].remove(fqdnDot)
@@ -2523,22 +2814,19 @@ class simpleComputer(simpleLdap):
 		# iterate over all forward zones
 		for zone in self['dnsEntryZoneForward'] or []:
 			# load zone object
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'clean up entries for zone: %s' % zone)
+			univention.admin.log.info('clean up entries for zone: %s', zone)
 			if len(zone) < 1:
 				continue
 			zoneObj = univention.admin.objects.get(
 				univention.admin.modules.get('dns/forward_zone'), self.co, self.lo, self.position, dn=zone[0])
 			zoneObj.open()
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'zone aRecords: %s' % zoneObj['a'])
+			univention.admin.log.info('zone aRecords: %s', zoneObj['a'])
 
 			zone_obj_modified = False
 			# clean up nameserver records
 			if 'nameserver' in zoneObj:
 				if fqdnDot in zoneObj['nameserver']:
-					univention.debug.debug(
-						univention.debug.ADMIN,
-						univention.debug.INFO,
-						'removing %s from dns zone %s' % (fqdnDot, zone))
+					univention.admin.log.info('removing %s from dns zone %s', fqdnDot, zone)
 					# nameserver is required in forward zone
 					if len(zoneObj['nameserver']) > 1:
 						zoneObj['nameserver'].remove(fqdnDot)
@@ -2547,10 +2835,7 @@ class simpleComputer(simpleLdap):
 			# clean up aRecords of zone itself
 			new_entries = list(set(zoneObj['a']) - ips)
 			if len(new_entries) != len(zoneObj['a']):
-				univention.debug.debug(
-					univention.debug.ADMIN,
-					univention.debug.INFO,
-					'Clean up zone records:\n%s ==> %s' % (zoneObj['a'], new_entries))
+				univention.admin.log.info('Clean up zone records:\n%s ==> %s', zoneObj['a'], new_entries)
 				zoneObj['a'] = new_entries
 				zone_obj_modified = True
 
@@ -2562,7 +2847,7 @@ class simpleComputer(simpleLdap):
 				irecord.open()
 				new_entries = [j for j in irecord['location'] if fqdn not in j and fqdnDot not in j]
 				if len(new_entries) != len(irecord['location']):
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'Entry found in "%s":\n%s ==> %s' % (irecord.dn, irecord['location'], new_entries))
+					univention.admin.log.info('Entry found in "%s":\n%s ==> %s', irecord.dn, irecord['location'], new_entries)
 					irecord['location'] = new_entries
 					irecord.modify()
 
@@ -2571,7 +2856,7 @@ class simpleComputer(simpleLdap):
 				irecord.open()
 				new_entries = list(set(irecord['a']) - ips)
 				if len(new_entries) != len(irecord['a']):
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'Entry found in "%s":\n%s ==> %s' % (irecord.dn, irecord['a'], new_entries))
+					univention.admin.log.info('Entry found in "%s":\n%s ==> %s', irecord.dn, irecord['a'], new_entries)
 					irecord['a'] = new_entries
 					irecord.modify()
 
@@ -2655,7 +2940,7 @@ class simpleLdapSub(simpleLdap):
 		self._modify()
 
 	def _remove(self, remove_childs=0):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, '_remove() called')
+		univention.admin.log.info('_remove() called')
 		self._ldap_pre_remove()
 
 		ml = self._ldap_dellist()
@@ -2713,7 +2998,7 @@ class simplePolicy(simpleLdap):
 				return key
 
 	def __makeUnique(self):
-		_d = univention.debug.function('admin.handlers.simplePolicy.__makeUnique')
+		_d = univention.admin.log.function('admin.handlers.simplePolicy.__makeUnique')
 		identifier = self.getIdentifier()
 		components = self.info[identifier].split("_uv")
 		if len(components) > 1:
@@ -2725,7 +3010,7 @@ class simplePolicy(simpleLdap):
 		else:
 			n = 0
 		self.info[identifier] = "%s_uv%d" % (components[0], n)
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simplePolicy.__makeUnique: result: %s' % self.info[identifier])
+		univention.admin.log.info('simplePolicy.__makeUnique: result: %s', self.info[identifier])
 
 	def create(self):
 		if not self.resultmode:
@@ -2736,7 +3021,7 @@ class simplePolicy(simpleLdap):
 		try:
 			self.oldinfo = {}
 			simpleLdap.create(self)
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simplePolicy.create: created object: info=%s' % (self.info))
+			univention.admin.log.info('simplePolicy.create: created object: info=%s', self.info)
 		except univention.admin.uexceptions.objectExists:
 			self.__makeUnique()
 			self.create()
@@ -2785,7 +3070,7 @@ class simplePolicy(simpleLdap):
 	def __getitem__(self, key):
 		if not self.resultmode:
 			if self.has_key('emptyAttributes') and self.mapping.mapName(key) and self.mapping.mapName(key) in simpleLdap.__getitem__(self, 'emptyAttributes'):
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simplePolicy.__getitem__: empty Attribute %s' % key)
+				univention.admin.log.info('simplePolicy.__getitem__: empty Attribute %s', key)
 				if self.descriptions[key].multivalue:
 					return []
 				else:
@@ -2798,11 +3083,11 @@ class simplePolicy(simpleLdap):
 			if self.descriptions[key].multivalue and not isinstance(self.polinfo[key], types.ListType):
 				# why isn't this correct in the first place?
 				self.polinfo[key] = [self.polinfo[key]]
-			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simplePolicy.__getitem__: presult: %s=%s' % (key, self.polinfo[key]))
+			univention.admin.log.info('simplePolicy.__getitem__: presult: %s=%s', key, self.polinfo[key])
 			return self.polinfo[key]
 
 		result = simpleLdap.__getitem__(self, key)
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'simplePolicy.__getitem__: result: %s=%s' % (key, result))
+		univention.admin.log.info('simplePolicy.__getitem__: result: %s=%s', key, result)
 		return result
 
 	def fixedAttributes(self):
@@ -2853,9 +3138,9 @@ class simplePolicy(simpleLdap):
 				if self.polinfo_more[key]['fixed'] and self.polinfo_more[key]['policy'] != self.cloned:
 					raise univention.admin.uexceptions.policyFixedAttribute, key
 				simpleLdap.__setitem__(self, key, newvalue)
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'polinfo: set key %s to newvalue %s' % (key, newvalue))
+				univention.admin.log.info('polinfo: set key %s to newvalue %s', key, newvalue)
 				if self.hasChanged(key):
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'polinfo: key:%s hasChanged' % (key))
+					univention.admin.log.info('polinfo: key:%s hasChanged', key)
 					self.changes = 1
 			return
 
@@ -35,6 +35,7 @@ import univention.admin.uldap
 import univention.admin.syntax
 import univention.admin.filter
 import univention.admin.handlers
+import univention.admin.facts
 import univention.admin.localization
 import ldap
 
@@ -212,11 +213,7 @@ class object(univention.admin.handlers.simpleLdap):
 	def open(self):
 		univention.admin.handlers.simpleLdap.open(self)
 
-		pathResult = self.lo.get('cn=directory,cn=univention,' + self.position.getDomain())
-		self.default_dn = 'cn=directory,cn=univention,' + self.position.getDomain()
-		if not pathResult:
-			pathResult = self.lo.get('cn=default containers,cn=univention,' + self.position.getDomain())
-			self.default_dn = 'cn=default containers,cn=univention,' + self.position.getDomain()
+		self.default_dn, pathResult = univention.admin.facts.directory_object(self.lo, self.position.getDomain())
 
 		self.pathKeys = ['userPath', 'groupPath', 'computerPath', 'policyPath', 'dnsPath', 'dhcpPath', 'networkPath', 'sharePath', 'printerPath', 'mailPath', 'licensePath']
 		self.ldapKeys = ['univentionUsersObject', 'univentionGroupsObject', 'univentionComputersObject', 'univentionPolicyObject', 'univentionDnsObject', 'univentionDhcpObject', 'univentionNetworksObject', 'univentionSharesObject', 'univentionPrintersObject', 'univentionMailObject', 'univentionLicenseObject']
@@ -247,6 +244,7 @@ class object(univention.admin.handlers.simpleLdap):
 
 		if changes:
 			self.lo.modify(self.default_dn, changes)
+			univention.admin.facts.invalidate()
 
 	def _ldap_pre_modify(self):
 		if self.hasChanged('name'):
@@ -264,6 +262,7 @@ class object(univention.admin.handlers.simpleLdap):
 					changes.append((self.ldapKeys[i], '', self.dn))
 		if changes:
 			self.lo.modify(self.default_dn, changes)
+			univention.admin.facts.invalidate()
 
 	def _ldap_post_move(self, olddn):
 		settings_module = univention.admin.modules.get('settings/directory')
@@ -284,6 +283,7 @@ class object(univention.admin.handlers.simpleLdap):
 			if self.oldinfo[self.pathKeys[i]] == '1':
 				changes.append((self.ldapKeys[i], self.dn, ''))
 		self.lo.modify(self.default_dn, changes)
+		univention.admin.facts.invalidate()
 
 	def _ldap_addlist(self):
 		return [
@@ -35,6 +35,7 @@ import ldap
 from univention.admin.layout import Tab, Group
 import univention.admin.filter
 import univention.admin.handlers
+import univention.admin.facts
 import univention.admin.allocators
 import univention.admin.localization
 from univention.admin.handlers.dns import stripDot
@@ -99,6 +100,18 @@ class object(univention.admin.handlers.simpleLdap):
 		ml = [(a, b, c.lower()) if a == "cn" else (a, b, c) for (a, b, c) in ml]
 		return ml
 
+	def _ldap_post_create(self):
+		univention.admin.facts.invalidate()
+
+	def _ldap_post_modify(self):
+		univention.admin.facts.invalidate()
+
+	def _ldap_post_move(self, olddn):
+		univention.admin.facts.invalidate()
+
+	def _ldap_post_remove(self):
+		univention.admin.facts.invalidate()
+
 
 def lookup(co, lo, filter_s, base='', superordinate=None, scope='sub', unique=False, required=False, timeout=-1, sizelimit=0):
 
@@ -32,6 +32,7 @@
 
 from univention.admin.layout import Tab, Group
 import univention.admin.handlers
+import univention.admin.facts
 import univention.admin.password
 import univention.admin.localization
 
@@ -185,6 +186,15 @@ class object(univention.admin.handlers.simpleLdap):
 	def _ldap_addlist(self):
 		return [('objectClass', ['top', 'univentionDefault'])]
 
+	def _ldap_post_create(self):
+		univention.admin.facts.invalidate()
+
+	def _ldap_post_modify(self):
+		univention.admin.facts.invalidate()
+
+	def _ldap_post_remove(self):
+		univention.admin.facts.invalidate()
+
 
 def lookup(co, lo, filter_s, base='', superordinate=None, scope='sub', unique=False, required=False, timeout=-1, sizelimit=0):
 
@@ -47,6 +47,7 @@ import univention.admin
 from univention.admin.layout import Tab, Group
 import univention.admin.filter
 import univention.admin.handlers
+import univention.admin.facts
 import univention.admin.handlers.groups.group
 import univention.admin.password
 import univention.admin.samba
@@ -1302,6 +1303,7 @@ mapping.register('umcProperty', 'univentionUMCProperty', mapKeyAndValue, unmapKe
 
 class object(univention.admin.handlers.simpleLdap, mungeddial.Support):
 	module = module
+	_open_cache = None
 
 	def __pwd_is_locked(self, password):
 		return password and (password.startswith('{crypt}!') or password.startswith('{LANMAN}!'))
@@ -1443,6 +1445,8 @@ class object(univention.admin.handlers.simpleLdap, mungeddial.Support):
 
 		self.save()
 
+		cache = self._open_cache or OpenCache(self.lo)
+
 		if self.exists():
 			# mailForwardCopyToSelf is a "virtual" property. The boolean value is set to True, if
 			# the LDAP attribute mailForwardAddress contains the mailPrimaryAddress. The mailPrimaryAddress
@@ -1472,22 +1476,18 @@ class object(univention.admin.handlers.simpleLdap, mungeddial.Support):
 
 					if loadGroups:  # this is optional because it can take much time on larger installations, default is true
 						self.groupsLoaded = 1
-						self['groups'] = self.lo.searchDn(filter=filter_format('(&(cn=*)(|(objectClass=univentionGroup)(objectClass=sambaGroupMapping))(uniqueMember=%s))', [self.dn]))
+						self['groups'] = cache.groups(self.dn)
 					else:
 						self.groupsLoaded = 0
 						univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'user: open with loadGroups=false for user %s' % self['username'])
 					primaryGroupNumber = self.oldattr.get('gidNumber', [''])[0]
 					if primaryGroupNumber:
-						primaryGroupResult = self.lo.searchDn(filter=filter_format('(&(cn=*)(|(objectClass=posixGroup)(objectClass=sambaGroupMapping))(gidNumber=%s))', [primaryGroupNumber]))
+						primaryGroupResult = cache.primary_group(primaryGroupNumber)
 						if primaryGroupResult:
-							self['primaryGroup'] = primaryGroupResult[0]
+							self['primaryGroup'] = primaryGroupResult
 						else:
 							try:
-								primaryGroup = self.lo.search(filter='(objectClass=univentionDefault)', base='cn=univention,' + self.position.getDomain(), attr=['univentionDefaultGroup'])
-								try:
-									primaryGroup = primaryGroup[0][1]["univentionDefaultGroup"][0]
-								except:
-									primaryGroup = None
+								primaryGroup = univention.admin.facts.default_group(self.lo, self.position.getDomain())
 							except:
 								primaryGroup = None
 
@@ -1552,20 +1552,9 @@ class object(univention.admin.handlers.simpleLdap, mungeddial.Support):
 					pass
 				if unc.find(':') > 1:
 					host, path = unc.split(':', 1)
-					sharepath = path
-					while len(sharepath) > 1:
-						res = univention.admin.modules.lookup(univention.admin.modules.get('shares/share'), None, self.lo, filter=filter_format('(&(host=%s)(path=%s))', [host, sharepath]), scope='domain')
-						if len(res) == 1:
-							self['homeShare'] = res[0].dn
-							relpath = path.replace(sharepath, '')
-							if len(relpath) > 0 and relpath[0] == '/':
-								relpath = relpath[1:]
-							self['homeSharePath'] = relpath
-							break
-						elif len(res) > 1:
-							break
-						elif len(res) < 1:
-							sharepath = os.path.split(sharepath)[0]
+					share = cache.home_share(host, path)
+					if share:
+						self['homeShare'], self['homeSharePath'] = share
 
 			if 'pki' in self.options:
 				self.reload_certificate()
@@ -1575,17 +1564,16 @@ class object(univention.admin.handlers.simpleLdap, mungeddial.Support):
 			if 'posix' in self.options:
 				primary_group_from_template = self['primaryGroup']
 				if not primary_group_from_template:
-					searchResult = self.lo.search(filter='(objectClass=univentionDefault)', base='cn=univention,' + self.position.getDomain(), attr=['univentionDefaultGroup'])
-					if not searchResult or not searchResult[0][1]:
+					defaultGroup = univention.admin.facts.default_group(self.lo, self.position.getDomain())
+					if not defaultGroup:
 						self['primaryGroup'] = None
 						self.save()
 						raise univention.admin.uexceptions.primaryGroup
 
-					for tmp, number in searchResult:
-						primaryGroupResult = self.lo.searchDn(filter=filter_format('(&(objectClass=posixGroup)(cn=%s))', (univention.admin.uldap.explodeDn(number['univentionDefaultGroup'][0], 1)[0],)), base=self.position.getDomain(), scope='domain')
-						if primaryGroupResult:
-							self['primaryGroup'] = primaryGroupResult[0]
-							self.newPrimaryGroupDn = primaryGroupResult[0]
+					primaryGroupResult = self.lo.searchDn(filter=filter_format('(&(objectClass=posixGroup)(cn=%s))', (univention.admin.uldap.explodeDn(defaultGroup, 1)[0],)), base=self.position.getDomain(), scope='domain')
+					if primaryGroupResult:
+						self['primaryGroup'] = primaryGroupResult[0]
+						self.newPrimaryGroupDn = primaryGroupResult[0]
 
 	def modify(self, *args, **kwargs):
 		try:
@@ -2777,6 +2765,128 @@ def lookup(co, lo, filter_s, base='', superordinate=None, scope='sub', unique=Fa
 	return res
 
 
+def _dn_key(dn):
+	"""Normalize `dn` for comparing it with other DNs."""
+	try:
+		return tuple(tuple(sorted((attr.lower(), value.lower()) for attr, value, flags in rdn)) for rdn in ldap.dn.str2dn(dn))
+	except ldap.DECODING_ERROR:
+		return dn.lower()
+
+
+class OpenCache(object):
+
+	"""Group, primary group and home share lookups for :meth:`object.open`.
+
+	A single :meth:`object.open` searches only what it needs, e.g. the DNs of
+	the groups of the user. :func:`open_many` shares one instance between many
+	users and fills it up front: group memberships of all users with one search
+	per :attr:`MEMBER_CHUNK` users, primary groups with one search for all
+	distinct gidNumbers, and the shares of each home server with one search per
+	host.
+	"""
+	MEMBER_CHUNK = 1000
+
+	def __init__(self, lo):
+		self.lo = lo
+		self.memberships = {}
+		self.primary_groups = {}
+		self.shares = {}
+
+	def prefetch(self, objects, loadGroups=1):
+		users = [obj for obj in objects if obj.exists() and 'posix' in obj.options]
+		if loadGroups:
+			dns = [obj.dn for obj in users]
+			for i in range(0, len(dns), self.MEMBER_CHUNK):
+				self._load_memberships(dns[i:i + self.MEMBER_CHUNK])
+		self._load_primary_groups(set(obj.oldattr['gidNumber'][0] for obj in users if obj.oldattr.get('gidNumber')))
+
+	def _load_memberships(self, dns):
+		# the groups are returned with all their members, which only pays off
+		# for many users at once
+		for dn in dns:
+			self.memberships[_dn_key(dn)] = []
+		members = ''.join(filter_format('(uniqueMember=%s)', [dn]) for dn in dns)
+		for group_dn, attrs in self.lo.search(filter='(&(cn=*)(|(objectClass=univentionGroup)(objectClass=sambaGroupMapping))(|%s))' % (members,), attr=['uniqueMember']):
+			for member in attrs.get('uniqueMember', []):
+				groups = self.memberships.get(_dn_key(member))
+				if groups is not None:
+					groups.append(group_dn)
+
+	def _load_primary_groups(self, gids):
+		gids = [gid for gid in gids if gid not in self.primary_groups]
+		if not gids:
+			return
+		for gid in gids:
+			self.primary_groups[gid] = None
+		numbers = ''.join(filter_format('(gidNumber=%s)', [gid]) for gid in gids)
+		for group_dn, attrs in self.lo.search(filter='(&(cn=*)(|(objectClass=posixGroup)(objectClass=sambaGroupMapping))(|%s))' % (numbers,), attr=['gidNumber']):
+			for gid in attrs.get('gidNumber', []):
+				if self.primary_groups.get(gid, '') is None:
+					self.primary_groups[gid] = group_dn
+
+	def groups(self, dn):
+		"""Return the DNs of the groups `dn` is a member of."""
+		key = _dn_key(dn)
+		if key not in self.memberships:
+			self.memberships[key] = self.lo.searchDn(filter=filter_format('(&(cn=*)(|(objectClass=univentionGroup)(objectClass=sambaGroupMapping))(uniqueMember=%s))', [dn]))
+		return list(self.memberships[key])
+
+	def primary_group(self, gid):
+		"""Return the DN of the group with gidNumber `gid` or `None`."""
+		self._load_primary_groups([gid])
+		return self.primary_groups[gid]
+
+	def home_share(self, host, path):
+		"""Return (share DN, path relative to the share) for the home directory `host:path` or `None`.
+
+		The longest share path containing `path` wins; if several shares on
+		`host` export that path, the home share is ambiguous.
+		"""
+		index = self._share_index(host)
+		sharepath = path
+		while len(sharepath) > 1:
+			dns = index.get(sharepath.lower(), [])
+			if len(dns) == 1:
+				relpath = path.replace(sharepath, '')
+				if len(relpath) > 0 and relpath[0] == '/':
+					relpath = relpath[1:]
+				return dns[0], relpath
+			elif dns:
+				return None
+			sharepath = os.path.split(sharepath)[0]
+		return None
+
+	def _share_index(self, host):
+		try:
+			return self.shares[host.lower()]
+		except KeyError:
+			pass
+		share_module = univention.admin.modules.get('shares/share')
+		index = {}
+		for dn, attrs in self.lo.search(filter=unicode(share_module.lookup_filter(filter_format('(host=%s)', [host]))), scope='domain', attr=['univentionSharePath']):
+			for sharepath in attrs.get('univentionSharePath', []):
+				index.setdefault(sharepath.lower(), []).append(dn)
+		self.shares[host.lower()] = index
+		return index
+
+
+def open_many(objects, loadGroups=1):
+	"""Open many user objects, resolving their groups, primary groups and
+	home shares with a few shared searches instead of several per user."""
+	objects = list(objects)
+	if not objects:
+		return objects
+	cache = OpenCache(objects[0].lo)
+	cache.prefetch(objects, loadGroups)
+	for obj in objects:
+		obj._open_cache = cache
+		try:
+			obj.open(loadGroups)
+		finally:
+			obj._open_cache = None
+	return objects
+
+
 def identify(dn, attr, canonical=0):
 
 	if isinstance(attr.get('uid', []), type([])) and len(attr.get('uid', [])) > 0 and ('$' in attr.get('uid', [])[0]):
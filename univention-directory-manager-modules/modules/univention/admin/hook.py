@@ -32,11 +32,13 @@
 
 import univention.debug
 import univention.admin.modules
+import univention.admin.plugins
 import univention.admin.uexceptions
 from univention.admin import localization
-import sys
-import os
-import traceback
+# available to hooks.d plugins, which are executed in this namespace
+import sys  # noqa: F401
+import os  # noqa: F401
+import traceback  # noqa: F401
 
 translation = localization.translation('univention/admin')
 _ = translation.translate
@@ -46,20 +48,17 @@ _ = translation.translate
 #
 
 
+plugins = univention.admin.plugins.PluginLoader(globals(), 'hook.py', 'hooks.d')
+
+
 def import_hook_files():
-	for dir in sys.path:
-		if os.path.exists(os.path.join(dir, 'univention/admin/hook.py')):
-			if os.path.isdir(os.path.join(dir, 'univention/admin/hooks.d/')):
-				for f in os.listdir(os.path.join(dir, 'univention/admin/hooks.d/')):
-					if f.endswith('.py'):
-						fn = os.path.join(dir, 'univention/admin/hooks.d/', f)
-						try:
-							with open(fn, 'r') as fd:
-								exec fd in sys.modules[__name__].__dict__
-							univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'admin.syntax.import_hook_files: importing "%s"' % fn)
-						except:
-							univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'admin.syntax.import_hook_files: loading %s failed' % fn)
-							univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'admin.syntax.import_hook_files: TRACEBACK:\n%s' % traceback.format_exc())
+	"""Load new and modified hooks from `univention/admin/hooks.d/`."""
+	plugins.load()
+
+
+def get_hook(name):
+	"""Return the hook class `name`, loading new hooks.d files if it is unknown."""
+	return plugins.get(name)
 
 
 class simpleHook(object):
@@ -40,6 +40,7 @@ import univention.admin.filter
 import univention.admin.uexceptions
 import univention.admin.localization
 import univention.admin.license_data as licenses
+import univention.admin.license_counter
 import univention.config_registry
 
 translation = univention.admin.localization.translation('univention/admin')
@@ -76,6 +77,12 @@ if configRegistry.is_true('ad/member'):
 	user_exclude_objectflags.append('synced')
 	managedclient_exclude_objectflags.append('synced')
 
+try:
+	# counts from the listener maintained store are used up to this age in seconds
+	COUNTER_MAX_AGE = int(configRegistry.get('directory/manager/license/counter/maxage', 86400))
+except ValueError:
+	COUNTER_MAX_AGE = 86400
+
 
 class License(object):
 	(ACCOUNT, CLIENT, DESKTOP, GROUPWARE) = range(4)
@@ -114,6 +121,7 @@ class License(object):
 			'IUSR_WIN-*',  # IIS account
 		)
 		self.sysAccountsFound = 0
+		self.counters = univention.admin.license_counter.CounterStore()
 		self.licenses = {
 			'1': {
 				# Version 1 till UCS 3.1
@@ -287,6 +295,7 @@ class License(object):
 	def set_values(self, lo, module):
 		self.__readLicense()
 		disable_add = 0
+		self.counters.load()
 		self.__countSysAccounts(lo)
 
 		if self.new_license:
@@ -378,26 +387,46 @@ class License(object):
 				disable_add = 9
 		return disable_add
 
-	def __countSysAccounts(self, lo):
+	def sysAccountsFilter(self, version):
 		userfilter = [univention.admin.filter.expression('uid', account) for account in self.sysAccountNames]
 		filter = univention.admin.filter.conjunction('&', [
 			univention.admin.filter.conjunction('|', userfilter),
-			self.filters[self.version][License.USERS]])
-		try:
-			searchResult = lo.searchDn(filter=str(filter))
-			self.sysAccountsFound = len(searchResult)
-		except univention.admin.uexceptions.noObject:
-			pass
+			self.filters[version][License.USERS]])
+		return str(filter)
+
+	def countedFilters(self):
+		"""Return all filters whose object count may be checked against a license."""
+		filters = set()
+		for version, version_filters in self.filters.iteritems():
+			filters.update(version_filters.itervalues())
+			filters.add(self.sysAccountsFilter(version))
+		return filters
+
+	def __countSysAccounts(self, lo):
+		filter = self.sysAccountsFilter(self.version)
+		count = self.counters.get(filter, COUNTER_MAX_AGE)
+		if count is not None:
+			self.sysAccountsFound = count
+		else:
+			try:
+				searchResult = lo.searchDn(filter=filter)
+				self.sysAccountsFound = len(searchResult)
+			except univention.admin.uexceptions.noObject:
+				pass
 		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO,
 			'LICENSE: Univention sysAccountsFound: %d' % self.sysAccountsFound)
 
 	def __countObject(self, obj, lo):
 		if self.licenses[self.version][obj] and not self.licenses[self.version][obj] == 'unlimited':
-			result = lo.searchDn(filter=self.filters[self.version][obj])
-			if result is None:
-				self.real[self.version][obj] = 0
+			count = self.counters.get(self.filters[self.version][obj], COUNTER_MAX_AGE)
+			if count is not None:
+				self.real[self.version][obj] = count
 			else:
-				self.real[self.version][obj] = len(result)
+				result = lo.searchDn(filter=self.filters[self.version][obj])
+				if result is None:
+					self.real[self.version][obj] = 0
+				else:
+					self.real[self.version][obj] = len(result)
 			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO,
 				'LICENSE: Univention %s real %d' % (self.names[self.version][obj], self.real[self.version][obj]))
 		else:
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  persistent object counters for the license check
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""Object counts used by the license check.
+
+Counting the licensed objects with one directory search per category
+transfers the DN of every user and computer on each UDM connection. The
+listener module `license_counter` keeps the counts in a small file instead:
+it updates them incrementally for every change and recounts the whole
+directory periodically. :class:`univention.admin.license.License` uses a
+count from the file as long as it was reconciled recently and falls back to
+searching the directory otherwise.
+"""
+
+import os
+import json
+import time
+import tempfile
+
+import univention.debug
+import univention.admin.filter
+
+COUNTER_FILE = '/var/lib/univention-directory-manager/license-counters.json'
+
+
+class CounterStore(object):
+
+	"""Object counts keyed by the LDAP filter string they were counted with."""
+
+	def __init__(self, filename=COUNTER_FILE):
+		self.filename = filename
+		self.counts = {}
+		self.reconciled = None
+		self.dirty = False
+
+	def load(self):
+		try:
+			with open(self.filename) as fd:
+				data = json.load(fd)
+		except (IOError, OSError, ValueError) as exc:
+			univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'LICENSE: no object counters: %s' % (exc,))
+			self.counts = {}
+			self.reconciled = None
+			return self
+		self.counts = dict((str(key), int(value)) for key, value in data.get('counts', {}).iteritems())
+		self.reconciled = data.get('reconciled')
+		return self
+
+	def save(self):
+		dirname = os.path.dirname(self.filename)
+		if not os.path.isdir(dirname):
+			os.makedirs(dirname, 0755)
+		fd, tmpname = tempfile.mkstemp(prefix='.license-counters', dir=dirname)
+		try:
+			with os.fdopen(fd, 'w') as tmp:
+				json.dump({'reconciled': self.reconciled, 'counts': self.counts}, tmp)
+			os.chmod(tmpname, 0644)
+			os.rename(tmpname, self.filename)
+		except:
+			os.unlink(tmpname)
+			raise
+		self.dirty = False
+
+	def remove(self):
+		self.counts = {}
+		self.reconciled = None
+		self.dirty = False
+		try:
+			os.unlink(self.filename)
+		except OSError:
+			pass
+
+	def age(self):
+		"""Seconds since the last full reconciliation or `None`."""
+		if self.reconciled is None:
+			return None
+		return max(0, time.time() - self.reconciled)
+
+	def get(self, filter, max_age):
+		"""Return the count for `filter` or `None` if it is unknown or older than `max_age` seconds."""
+		age = self.age()
+		if age is None or age > max_age:
+			return None
+		return self.counts.get(str(filter))
+
+	def update(self, filters, new, old):
+		"""Adjust the counts for one changed object; `new` or `old` is empty on add and remove."""
+		if self.reconciled is None:
+			return
+		for filter_s, filter_p in filters.iteritems():
+			delta = int(bool(new) and univention.admin.filter.match(filter_p, new)) - int(bool(old) and univention.admin.filter.match(filter_p, old))
+			if delta:
+				self.counts[filter_s] = max(0, self.counts.get(filter_s, 0) + delta)
+				self.dirty = True
+
+	def reconcile(self, lo, filters):
+		"""Recount all `filters` in the directory.
+
+		Each filter is evaluated by the LDAP server, so the counts follow its
+		matching rules exactly and errors of :meth:`update` do not survive.
+		"""
+		counts = {}
+		for filter_s in filters:
+			counts[filter_s] = len(lo.searchDn(filter=filter_s))
+		self.counts = counts
+		self.reconciled = time.time()
+		self.dirty = True
+		univention.debug.debug(univention.debug.ADMIN, univention.debug.PROCESS, 'LICENSE: reconciled object counters: %r' % (counts,))
+
+
+def parse_filters(filters):
+	"""Map each filter string to its parsed form for :meth:`CounterStore.update`."""
+	return dict((str(filter_s), univention.admin.filter.parse(str(filter_s))) for filter_s in filters)
@@ -32,7 +32,7 @@
 
 import ldap
 import time
-import univention.debug
+import univention.admin.log
 import univention.admin.uexceptions
 from univention.admin import localization
 
@@ -56,7 +56,7 @@ def lockDn(lo, position, type, value, scope):
 
 def lock(lo, position, type, value, scope='domain', timeout=300):
 
-	_d = univention.debug.function('admin.locking.lock type=%s value=%s scope=%s timeout=%d' % (type, value, scope, timeout))
+	_d = univention.admin.log.function('admin.locking.lock type=%s value=%s scope=%s timeout=%d', type, value, scope, timeout)
 	dn = lockDn(lo, position, type, value, scope)
 
 	now = int(time.time())
@@ -100,7 +100,7 @@ def lock(lo, position, type, value, scope='domain', timeout=300):
 
 def relock(lo, position, type, value, scope='domain', timeout=300):
 
-	_d = univention.debug.function('admin.locking.relock type=%s value=%s scope=%s timeout=%d' % (type, value, scope, timeout))
+	_d = univention.admin.log.function('admin.locking.relock type=%s value=%s scope=%s timeout=%d', type, value, scope, timeout)
 	dn = lockDn(lo, position, type, value, scope)
 
 	now = int(time.time())
@@ -123,7 +123,7 @@ def relock(lo, position, type, value, scope='domain', timeout=300):
 
 def unlock(lo, position, type, value, scope='domain'):
 
-	_d = univention.debug.function('admin.locking.unlock type=%s value=%s scope=%s' % (type, value, scope))
+	_d = univention.admin.log.function('admin.locking.unlock type=%s value=%s scope=%s', type, value, scope)
 	dn = lockDn(lo, position, type, value, scope)
 	try:
 		lo.delete(dn, exceptions=True)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  lazy, level-guarded debug logging
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""Lazy debug logging for :mod:`univention.admin`.
+
+The message is only formatted with its arguments when the debug level of
+the category is high enough to write it, so calls in hot code paths are
+cheap while debugging is turned down::
+
+	univention.admin.log.info('open: %s %r', dn, attrs)
+"""
+
+import univention.debug as ud
+
+_levels = {}
+
+try:
+	_get_level = ud.get_level
+except AttributeError:
+	_get_level = None
+
+
+def set_level(category, level):
+	"""Set the debug level of `category` like :func:`univention.debug.set_level`."""
+	_levels[category] = level
+	ud.set_level(category, level)
+
+
+def get_level(category=ud.ADMIN):
+	"""Return the effective debug level of `category`.
+
+	If the level can neither be queried from :mod:`univention.debug` nor
+	was set through :func:`set_level`, everything is considered enabled.
+	"""
+	if _get_level is not None:
+		return _get_level(category)
+	return _levels.get(category, ud.ALL)
+
+
+def enabled(level, category=ud.ADMIN):
+	return level <= get_level(category)
+
+
+def debug(level, message, *args):
+	if level <= get_level(ud.ADMIN):
+		ud.debug(ud.ADMIN, level, message % args if args else message)
+
+
+def error(message, *args):
+	debug(ud.ERROR, message, *args)
+
+
+def warn(message, *args):
+	debug(ud.WARN, message, *args)
+
+
+def process(message, *args):
+	debug(ud.PROCESS, message, *args)
+
+
+def info(message, *args):
+	debug(ud.INFO, message, *args)
+
+
+def function(message, *args):
+	"""Return a :class:`univention.debug.function` tracer or `None` below level ALL."""
+	if ud.ALL <= get_level(ud.ADMIN):
+		return ud.function(message % args if args else message)
+	return None
@@ -45,6 +45,7 @@ import univention.admin
 import univention.admin.uldap
 import univention.admin.syntax
 import univention.admin.hook
+import univention.admin.profiling
 from univention.admin import localization
 from univention.admin.layout import Tab, Group, ILayoutElement
 
@@ -56,15 +57,48 @@ _superordinates = set()  # list of all module names (strings) that are _superord
 containers = []
 
 
+def _mtime(path):
+	try:
+		return os.stat(path).st_mtime
+	except OSError:
+		return None
+
+
+def _handler_directories():
+	"""Return the modification times of all handler directories below `sys.path`."""
+	mtimes = {}
+	for p in sys.path:
+		root = os.path.join(p, 'univention/admin/handlers')
+		mtimes[root] = _mtime(root)
+		for dir, subdirs, files in os.walk(root):
+			mtimes[dir] = _mtime(dir)
+	return mtimes
+
+
+_handler_mtimes = None
+
+
+def _handlers_changed():
+	"""Check if handler modules may have been added or removed since the last :func:`update`."""
+	if _handler_mtimes is None or _handler_mtimes[0] != tuple(sys.path):
+		return True
+	return any(_mtime(dir) != mtime for dir, mtime in _handler_mtimes[1].iteritems())
+
+
 def update():
 	'''scan handler modules'''
-	global modules, _superordinates
-	modules = {}
-	_superordinates = set()
+	global modules, _superordinates, _handler_mtimes
 
 	# since last update(), syntax.d and hooks.d may have changed (Bug #31154)
 	univention.admin.syntax.import_syntax_files()
 	univention.admin.hook.import_hook_files()
+	if modules and not _handlers_changed():
+		return
+
+	modules = {}
+	_superordinates = set()
+	del containers[:]
+	_handler_mtimes = (tuple(sys.path), _handler_directories())
 
 	def _walk(root, dir, files):
 		global modules, _superordinates
@@ -82,6 +116,7 @@ def update():
 				ud.debug(ud.ADMIN, ud.ERROR, 'admin.modules.update: attribute "module" is missing in module %r' % (mod,))
 				continue
 			modules[m.module] = m
+			univention.admin.profiling.instrument_module(m)
 			if isContainer(m):
 				containers.append(m)
 
@@ -282,9 +317,8 @@ def update_extended_attributes(lo, module, position):
 
 		# get syntax
 		propertySyntaxString = attrs.get('univentionUDMPropertySyntax', [''])[0]
-		if propertySyntaxString and hasattr(univention.admin.syntax, propertySyntaxString):
-			propertySyntax = getattr(univention.admin.syntax, propertySyntaxString)
-		else:
+		propertySyntax = propertySyntaxString and univention.admin.syntax.get_syntax(propertySyntaxString)
+		if not propertySyntax:
 			if lo.search(filter=filter_format(univention.admin.syntax.LDAP_Search.FILTER_PATTERN, [propertySyntaxString])):
 				propertySyntax = univention.admin.syntax.LDAP_Search(propertySyntaxString)
 			else:
@@ -293,8 +327,9 @@ def update_extended_attributes(lo, module, position):
 		# get hooks
 		propertyHookString = attrs.get('univentionUDMPropertyHook', [''])[0]
 		propertyHook = None
-		if propertyHookString and hasattr(univention.admin.hook, propertyHookString):
-			propertyHook = getattr(univention.admin.hook, propertyHookString)()
+		propertyHookClass = propertyHookString and univention.admin.hook.get_hook(propertyHookString)
+		if propertyHookClass:
+			propertyHook = propertyHookClass()
 		register_ldap_connection = getattr(propertyHook, 'hook_ldap_connection', None)
 		if register_ldap_connection:
 			register_ldap_connection(lo, position)
@@ -31,7 +31,7 @@
 # <http://www.gnu.org/licenses/>.
 
 import re
-import univention.debug
+import univention.admin.log
 import univention.admin.modules
 
 
@@ -91,7 +91,7 @@ def open(object):
 
 
 def default(module, co, lo, position):
-	_d = univention.debug.function('admin.objects.default')
+	_d = univention.admin.log.function('admin.objects.default')
 	module = univention.admin.modules.get(module)
 	object = module.object(co, lo, position)
 	for name, property in module.property_descriptions.items():
@@ -119,7 +119,7 @@ def description(object):
 		if not description:
 			if object.dn:
 				description = univention.admin.uldap.explodeDn(object.dn, 1)[0]
-				univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'falling back to rdn: %s' % (object.dn))
+				univention.admin.log.info('falling back to rdn: %s', object.dn)
 			else:
 				description = 'None'
 		return description
@@ -182,20 +182,20 @@ def emptyAttribute(object, key):
 
 def getPolicyReference(object, policy_type):
 	# FIXME: Move this to handlers.simpleLdap?
-	_d = univention.debug.function('admin.objects.getPolicyReference policy_type=%s' % (policy_type))
+	_d = univention.admin.log.function('admin.objects.getPolicyReference policy_type=%s', policy_type)
 
 	policyReference = None
 	for policy_dn in object.policies:
 		for m in univention.admin.modules.identify(policy_dn, object.lo.get(policy_dn)):
 			if univention.admin.modules.name(m) == policy_type:
 				policyReference = policy_dn
-	univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'getPolicyReference: returning: %s' % policyReference)
+	univention.admin.log.info('getPolicyReference: returning: %s', policyReference)
 	return policyReference
 
 
 def removePolicyReference(object, policy_type):
 	# FIXME: Move this to handlers.simpleLdap?
-	_d = univention.debug.function('admin.objects.removePolicyReference policy_type=%s' % (policy_type))
+	_d = univention.admin.log.function('admin.objects.removePolicyReference policy_type=%s', policy_type)
 
 	remove = None
 	for policy_dn in object.policies:
@@ -203,28 +203,28 @@ def removePolicyReference(object, policy_type):
 			if univention.admin.modules.name(m) == policy_type:
 				remove = policy_dn
 	if remove:
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'removePolicyReference: removing reference: %s' % remove)
+		univention.admin.log.info('removePolicyReference: removing reference: %s', remove)
 		object.policies.remove(remove)
 
 
 def replacePolicyReference(object, policy_type, new_reference):
 	# FIXME: Move this to handlers.simpleLdap?
-	_d = univention.debug.function('admin.objects.replacePolicyReference policy_type=%s new_reference=%s' % (policy_type, new_reference))
+	_d = univention.admin.log.function('admin.objects.replacePolicyReference policy_type=%s new_reference=%s', policy_type, new_reference)
 
 	module = univention.admin.modules.get(policy_type)
 	if not univention.admin.modules.recognize(module, new_reference, object.lo.get(new_reference)):
-		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'replacePolicyReference: error.')
+		univention.admin.log.info('replacePolicyReference: error.')
 		return
 
 	removePolicyReference(object, policy_type)
 
-	univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'replacePolicyReference: appending reference: %s' % new_reference)
+	univention.admin.log.info('replacePolicyReference: appending reference: %s', new_reference)
 	object.policies.append(new_reference)
 
 
 def restorePolicyReference(object, policy_type):
 	# FIXME: Move this to handlers.simpleLdap?
-	_d = univention.debug.function('admin.objects.restorePolicyReference policy_type=%s' % (policy_type))
+	_d = univention.admin.log.function('admin.objects.restorePolicyReference policy_type=%s', policy_type)
 	module = univention.admin.modules.get(policy_type)
 	if not module:
 		return
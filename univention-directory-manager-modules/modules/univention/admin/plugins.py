@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  loading of syntax and hook plugins
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Loading of the ``syntax.d`` and ``hooks.d`` plugin directories.
+
+Plugin files are executed into the namespace of their module, e.g. every
+``univention/admin/syntax.d/*.py`` into :mod:`univention.admin.syntax`.
+A :class:`PluginLoader` remembers the modification time of each file and
+only executes new and changed files, so calling :meth:`PluginLoader.load`
+repeatedly is cheap.
+"""
+
+import os
+import sys
+import time
+import traceback
+
+import univention.admin.log
+
+
+class PluginLoader(object):
+	"""Execute the plugin files of `directory` into `namespace`.
+
+	:param namespace: the `globals()` of the module the plugins extend.
+	:param module: the module file name relative to :file:`univention/admin/`,
+		e.g. `syntax.py`. Only `sys.path` entries containing it are searched.
+	:param directory: the plugin directory next to `module`, e.g. `syntax.d`.
+	:param protected: names of `namespace` which plugins must not replace.
+	"""
+
+	def __init__(self, namespace, module, directory, protected=()):
+		self.namespace = namespace
+		self.module = module
+		self.directory = directory
+		self.protected = protected
+		self.mtimes = {}
+		self.timings = {}
+		self._sys_path = None
+		self._directories = []
+
+	def directories(self):
+		path = tuple(sys.path)
+		if path != self._sys_path:
+			self._directories = []
+			for dir_ in path:
+				plugin_dir = os.path.join(dir_, 'univention/admin', self.directory)
+				if os.path.exists(os.path.join(dir_, 'univention/admin', self.module)) and os.path.isdir(plugin_dir) and plugin_dir not in self._directories:
+					self._directories.append(plugin_dir)
+			self._sys_path = path
+		return self._directories
+
+	def changed(self):
+		"""Return `(filename, mtime)` of all new and modified plugin files, ordered by name."""
+		changed = []
+		for plugin_dir in self.directories():
+			try:
+				names = sorted(os.listdir(plugin_dir))
+			except OSError:
+				continue
+			for name in names:
+				if not name.endswith('.py'):
+					continue
+				filename = os.path.join(plugin_dir, name)
+				try:
+					mtime = os.stat(filename).st_mtime
+				except OSError:
+					continue
+				if self.mtimes.get(filename) != mtime:
+					changed.append((filename, mtime))
+		return changed
+
+	def load(self):
+		"""Execute new and modified plugin files and return their names.
+
+		Files are executed ordered by name. A file failing with a
+		:exc:`NameError`, e.g. because it subclasses a syntax defined in a
+		file sorting after it, is retried once the other files were loaded.
+		A failing file is not retried until it is modified again.
+		"""
+		pending = self.changed()
+		loaded = []
+		while pending:
+			deferred = []
+			for filename, mtime in pending:
+				error = self._execute(filename)
+				if isinstance(error, NameError):
+					deferred.append((filename, mtime, error))
+					continue
+				self.mtimes[filename] = mtime
+				if error is None:
+					loaded.append(filename)
+				else:
+					self._failed(filename, error)
+			if len(deferred) == len(pending):
+				for filename, mtime, error in deferred:
+					self.mtimes[filename] = mtime
+					self._failed(filename, error)
+				break
+			pending = [(filename, mtime) for filename, mtime, error in deferred]
+		return loaded
+
+	def _execute(self, filename):
+		saved = dict((name, self.namespace[name]) for name in self.protected if name in self.namespace)
+		start = time.time()
+		try:
+			with open(filename, 'r') as fd:
+				exec fd in self.namespace
+		except Exception as exc:
+			exc.traceback = traceback.format_exc()
+			return exc
+		finally:
+			self.namespace.update(saved)
+		self.timings[filename] = time.time() - start
+		univention.admin.log.info('admin.plugins: loaded "%s" in %.3fs', filename, self.timings[filename])
+		return None
+
+	def _failed(self, filename, error):
+		univention.admin.log.error('admin.plugins: loading %s failed', filename)
+		univention.admin.log.error('admin.plugins: TRACEBACK:\n%s', error.traceback)
+
+	def get(self, name):
+		"""Return `name` from the namespace, loading new plugins if it is missing."""
+		try:
+			return self.namespace[name]
+		except KeyError:
+			self.load()
+			return self.namespace.get(name)
+
+	def report(self):
+		"""Return `(seconds, filename)` of all loaded plugin files, slowest first."""
+		return sorted(((seconds, filename) for filename, seconds in self.timings.items()), reverse=True)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  opt-in sampling profiler for UDM handler modules
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""Sampling profiler for property access and object operations.
+
+When the UCR variable `directory/manager/profiling` is enabled,
+:func:`univention.admin.modules.update` instruments every handler module:
+reading and setting a property is recorded per property name, `open`,
+`create`, `modify`, `move`, `remove` and `lookup` per operation. Only every
+n-th call of each (module, name) pair is timed, n being
+`directory/manager/profiling/interval`. A summary is written to the debug
+log at exit or by calling :func:`dump`. Without the variable nothing is
+instrumented and the code paths are unchanged.
+"""
+
+import time
+import atexit
+
+from univention.admin import configRegistry
+import univention.admin.log as log
+
+PROPERTY_METHODS = ('__getitem__', '__setitem__')
+OPERATION_METHODS = ('open', 'create', 'modify', 'move', 'remove')
+
+profiler = None
+
+
+class Profiler(object):
+
+	def __init__(self, interval=100):
+		self.interval = max(1, interval)
+		self.calls = {}
+		self.timings = {}
+
+	def sample(self, module, name):
+		"""Count a call and return its start time if it is to be timed, else `None`."""
+		key = (module, name)
+		calls = self.calls.get(key, 0)
+		self.calls[key] = calls + 1
+		if calls % self.interval:
+			return None
+		return time.time()
+
+	def record(self, module, name, start):
+		elapsed = time.time() - start
+		timing = self.timings.setdefault((module, name), [0, 0.0, 0.0])
+		timing[0] += 1
+		timing[1] += elapsed
+		timing[2] = max(timing[2], elapsed)
+
+	def report(self):
+		"""Return (module, name, calls, estimated total, mean, max) sorted by estimated total."""
+		rows = []
+		for key, (samples, total, slowest) in self.timings.iteritems():
+			module, name = key
+			calls = self.calls[key]
+			mean = total / samples
+			rows.append((module, name, calls, mean * calls, mean, slowest))
+		rows.sort(key=lambda row: row[3], reverse=True)
+		return rows
+
+	def dump(self):
+		for module, name, calls, estimated, mean, slowest in self.report():
+			log.process('PROFILE: %s %s: calls=%d total~%.6fs mean=%.6fs max=%.6fs', module, name, calls, estimated, mean, slowest)
+
+
+def _wrap_method(function, per_property):
+	def wrapper(self, *args, **kwargs):
+		module = getattr(self, 'module', None)
+		name = args[0] if per_property and args else function.__name__
+		start = profiler.sample(module, name)
+		if start is None:
+			return function(self, *args, **kwargs)
+		try:
+			return function(self, *args, **kwargs)
+		finally:
+			profiler.record(module, name, start)
+	wrapper.__name__ = function.__name__
+	wrapper.__doc__ = function.__doc__
+	wrapper._profiled = function
+	return wrapper
+
+
+def _wrap_function(module, function):
+	def wrapper(*args, **kwargs):
+		start = profiler.sample(module, function.__name__)
+		if start is None:
+			return function(*args, **kwargs)
+		try:
+			return function(*args, **kwargs)
+		finally:
+			profiler.record(module, function.__name__, start)
+	wrapper.__name__ = function.__name__
+	wrapper.__doc__ = function.__doc__
+	wrapper._profiled = function
+	return wrapper
+
+
+def _original(function):
+	return getattr(function, '_profiled', function)
+
+
+def instrument_module(module):
+	"""Wrap the object methods and the lookup function of a handler module."""
+	if profiler is None:
+		return
+	cls = getattr(module, 'object', None)
+	if isinstance(cls, type):
+		for name in PROPERTY_METHODS + OPERATION_METHODS:
+			method = getattr(cls, name, None)
+			if method is None:
+				continue
+			function = _original(getattr(method, 'im_func', method))
+			setattr(cls, name, _wrap_method(function, name in PROPERTY_METHODS))
+	lookup = getattr(module, 'lookup', None)
+	if callable(lookup):
+		module.lookup = _wrap_function(getattr(module, 'module', module.__name__), _original(lookup))
+
+
+def enable(interval=100):
+	"""Start profiling; only modules instrumented afterwards are measured."""
+	global profiler
+	if profiler is None:
+		profiler = Profiler(interval)
+		atexit.register(dump)
+	return profiler
+
+
+def dump():
+	if profiler is not None:
+		profiler.dump()
+
+
+if configRegistry.is_true('directory/manager/profiling', False):
+	try:
+		enable(int(configRegistry.get('directory/manager/profiling/interval', 100)))
+	except ValueError:
+		enable()
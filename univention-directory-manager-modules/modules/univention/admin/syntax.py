@@ -36,7 +36,9 @@ import operator
 import ipaddr
 import inspect
 import univention.debug
+import univention.admin.facts
 import univention.admin.modules
+import univention.admin.plugins
 import univention.admin.uexceptions
 from univention.admin import localization
 from univention.lib.ucs import UCS_Version
@@ -44,8 +46,6 @@ from univention.lib.umc_module import get_mime_type, get_mime_description, image
 import base64
 import zlib
 import bz2
-import copy
-import sys
 import os
 import shlex
 import imghdr
@@ -59,31 +59,64 @@ from ldap.filter import filter_format
 translation = localization.translation('univention/admin')
 _ = translation.translate
 
+# maximum number of values remembered per memoized parse() method
+PARSE_CACHE_SIZE = 4096
+
+
+def memoize_parse(parse):
+	"""Remember the results of a pure `parse()` class method.
+
+	Bulk operations validate the same values many times. Only results are
+	remembered, invalid values raise again each time. The result must be
+	immutable, e.g. a string, as it is shared by all callers. The cache is
+	emptied when it reaches :data:`PARSE_CACHE_SIZE` entries.
+
+	>>> class example(simple):
+	...     @classmethod
+	...     @memoize_parse
+	...     def parse(self, text):
+	...         return text.upper()
+	>>> example.parse('a')
+	'A'
+	>>> len(example.parse.cache)
+	1
+	"""
+	cache = {}
+
+	def wrapper(self, text):
+		key = (self, type(text), text)
+		try:
+			return cache[key]
+		except KeyError:
+			pass
+		except TypeError:  # unhashable, e.g. a list
+			return parse(self, text)
+		result = parse(self, text)
+		if len(cache) >= PARSE_CACHE_SIZE:
+			cache.clear()
+		cache[key] = result
+		return result
+	wrapper.__name__ = parse.__name__
+	wrapper.__doc__ = parse.__doc__
+	wrapper.cache = cache
+	return wrapper
+
 #
 # load all additional syntax files from */site-packages/univention/admin/syntax.d/*.py
 #
 
 
+plugins = univention.admin.plugins.PluginLoader(globals(), 'syntax.py', 'syntax.d', protected=('_',))  # don't allow syntax to overwrite our global _ function.
+
+
 def import_syntax_files():
-	global _  # don't allow syntax to overwrite our global _ function.
-	gettext = _
-	for dir_ in sys.path:
-		syntax_py = os.path.join(dir_, 'univention/admin/syntax.py')
-		syntax_d = os.path.join(dir_, 'univention/admin/syntax.d/')
+	"""Load new and modified syntax definitions from `univention/admin/syntax.d/`."""
+	plugins.load()
 
-		if os.path.exists(syntax_py) and os.path.isdir(syntax_d):
-			syntax_files = (os.path.join(syntax_d, f) for f in os.listdir(syntax_d) if f.endswith('.py'))
 
-			for fn in syntax_files:
-				try:
-					with open(fn, 'r') as fd:
-						exec fd in sys.modules[__name__].__dict__
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'admin.syntax.import_syntax_files: importing "%s"' % fn)
-				except:
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'admin.syntax.import_syntax_files: loading %s failed' % fn)
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'admin.syntax.import_syntax_files: TRACEBACK:\n%s' % traceback.format_exc())
-				finally:
-					_ = gettext
+def get_syntax(name):
+	"""Return the syntax class `name`, loading new syntax.d files if it is unknown."""
+	return plugins.get(name)
 
 
 choice_update_functions = []
@@ -144,6 +177,7 @@ class simple(ISyntax):
 	error_message = _('Invalid value')
 
 	@classmethod
+	@memoize_parse
 	def parse(self, text):
 		if text is None or self.regex is None or self.regex.match(text) is not None:
 			return text
@@ -1046,6 +1080,7 @@ class ipv4Address(simple):
 	# match IPv4 (0.0.0.0 is allowed)
 
 	@classmethod
+	@memoize_parse
 	def parse(self, text):
 		try:
 			return str(ipaddr.IPv4Address(text))
@@ -1058,6 +1093,7 @@ class ipAddress(simple):
 	# match IPv4 (0.0.0.0 is allowed) or IPv6 address (with IPv4-mapped IPv6)
 
 	@classmethod
+	@memoize_parse
 	def parse(self, text):
 		try:
 			return str(ipaddr.IPAddress(text))
@@ -1260,24 +1296,19 @@ class emailAddressValidDomain(emailAddress):
 	@classmethod
 	def checkLdap(self, lo, mailaddresses):
 		# convert mailaddresses to array if neccessary
-		mailaddresses = copy.deepcopy(mailaddresses)
 		if isinstance(mailaddresses, str):
 			mailaddresses = [mailaddresses]
 		if not isinstance(mailaddresses, list):
 			return
 
 		faillist = []
-		domainCache = {}
+		# the configured mail domains are cached for all objects of this process
+		domains = univention.admin.facts.mail_domains(lo)
 		# iterate over mail addresses
 		for mailaddress in mailaddresses:
 			if mailaddress:
 				domain = mailaddress.rsplit('@', 1)[-1]
-				if domain not in domainCache:
-					ldapfilter = '(&(objectClass=univentionMailDomainname)(cn=%s))' % domain
-					result = lo.searchDn(filter=ldapfilter)
-					domainCache[domain] = bool(result)
-					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'admin.syntax.%s: address=%r   domain=%r   result=%r' % (self.name, mailaddress, domain, result))
-				if not domainCache[domain]:
+				if domain.lower() not in domains:
 					faillist.append(mailaddress)
 					univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, 'admin.syntax.%s: address=%r   domain=%r' % (self.name, mailaddress, domain))
 
@@ -1344,6 +1375,7 @@ class date(simple):
 	_re_de = re.compile('^[0-9]{1,2}\.[0-9]{1,2}\.[0-9]+$')
 
 	@classmethod
+	@memoize_parse
 	def parse(self, text):
 		if text and self._re_iso.match(text):
 			year, month, day = map(lambda(x): int(x), text.split('-'))
@@ -1361,6 +1393,7 @@ class date(simple):
 class date2(date):  # fixes the century
 
 	@classmethod
+	@memoize_parse
 	def parse(self, text):
 		if text is None:
 			return ''
@@ -1590,6 +1623,7 @@ class MAC_Address(simple):
 	error_message = _('This is not a valid MAC address (valid examples are 86:f5:d1:f5:6b:3e, 86-f5-d1-f5-6b-3e, 86f5d1f56b3e, 86f5.d1f5.6b3e)')
 
 	@classmethod
+	@memoize_parse
 	def parse(self, text):
 		if self.regexLinuxFormat.match(text) is not None:
 			return text.lower()
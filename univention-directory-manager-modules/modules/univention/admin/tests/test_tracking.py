@@ -0,0 +1,261 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  compare the change tracking of base objects with the former deep copies
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Fuzz test of :class:`univention.admin.tracking.ChangeTrackingDict`.
+
+Random sequences of the changes UDM handlers make to `info` and `oldinfo`
+are applied to a :class:`univention.admin.handlers.base` object and to a
+reference implementing save(), diff() and hasChanged() with deep copies
+like before the change tracking. Both must report the same changes.
+"""
+
+import copy
+import random
+import pickle
+import unittest
+
+import univention.admin.mapping
+import univention.admin.handlers
+from univention.admin.tracking import ChangeTrackingDict
+
+SEQUENCES = 3000
+STEPS = 30
+
+
+class Property(object):
+
+	def __init__(self, multivalue=False, options=()):
+		self.multivalue = multivalue
+		self.options = list(options)
+
+
+DESCRIPTIONS = {
+	'scalar': Property(),
+	'scalar_option': Property(options=['opt']),
+	'lower': Property(),
+	'multi': Property(multivalue=True),
+	'multi_option': Property(multivalue=True, options=['opt']),
+}
+KEYS = sorted(DESCRIPTIONS) + ['undescribed']
+SCALARS = [None, '', 'a', 'A', 'b']
+LISTS = [[], [''], ['x'], ['X'], ['x', 'y'], ['y', 'x']]
+
+MAPPING = univention.admin.mapping.mapping()
+MAPPING.register('lower', 'lowerAttribute', lambda value: value.lower() if value else value, None)
+
+
+class Tracked(univention.admin.handlers.base):
+
+	descriptions = DESCRIPTIONS
+	mapping = MAPPING
+
+	def __init__(self):
+		univention.admin.handlers.base.__init__(self, None, None, position=True, dn='cn=test')
+
+	def exists(self):
+		return True
+
+
+class Reference(object):
+
+	"""save(), diff() and hasChanged() of :class:`univention.admin.handlers.base` before the change tracking."""
+
+	descriptions = DESCRIPTIONS
+	mapping = MAPPING
+
+	def __init__(self):
+		self.info = {}
+		self.oldinfo = {}
+		self.policies = []
+		self.oldpolicies = []
+		self.options = []
+		self.old_options = []
+
+	def exists(self):
+		return True
+
+	def save(self):
+		self.oldinfo = copy.deepcopy(self.info)
+		self.oldpolicies = copy.deepcopy(self.policies)
+		self.options = list(set(self.options))
+		self.old_options = []
+		if self.exists():
+			self.old_options = copy.deepcopy(self.options)
+
+	def diff(self):
+		changes = []
+
+		for key, prop in self.descriptions.items():
+			null = [] if prop.multivalue else None
+			if prop.options and not set(prop.options) & set(self.options):
+				if self.oldinfo.get(key, null) not in (null, None):
+					changes.append((key, self.oldinfo[key], null))
+				continue
+			if (self.oldinfo.get(key) or self.info.get(key)) and self.oldinfo.get(key, null) != self.info.get(key, null):
+				changes.append((key, self.oldinfo.get(key, null), self.info.get(key, null)))
+
+		return changes
+
+	def hasChanged(self, key):
+		if isinstance(key, (list, tuple)):
+			return any(self.hasChanged(i) for i in key)
+		if (not self.oldinfo.get(key, '') or self.oldinfo[key] == [''] or self.oldinfo[key] == []) \
+			and (not self.info.get(key, '') or self.info[key] == [''] or self.info[key] == []):
+			return False
+
+		return not univention.admin.mapping.mapCmp(self.mapping, key, self.oldinfo.get(key, ''), self.info.get(key, ''))
+
+
+def _value(rand, key):
+	if key.startswith('multi'):
+		return copy.deepcopy(rand.choice(LISTS))
+	return rand.choice(SCALARS)
+
+
+def _set(rand, key):
+	value = _value(rand, key)
+	return lambda obj: obj.info.__setitem__(key, copy.deepcopy(value))
+
+
+def _append(rand, key):
+	value = rand.choice(['x', 'y', 'z'])
+
+	def change(obj):
+		values = obj.info.get(key)
+		if isinstance(values, list):
+			values.append(value)
+	return change
+
+
+def _pop(rand, key):
+	def change(obj):
+		values = obj.info.get(key)
+		if isinstance(values, list) and values:
+			values.pop(0)
+	return change
+
+
+def _delete(rand, key):
+	def change(obj):
+		if key in obj.info:
+			del obj.info[key]
+	return change
+
+
+def _update(rand, key):
+	value = _value(rand, key)
+	return lambda obj: obj.info.update({key: copy.deepcopy(value)})
+
+
+def _setdefault(rand, key):
+	value = _value(rand, key)
+	return lambda obj: obj.info.setdefault(key, copy.deepcopy(value))
+
+
+def _set_old(rand, key):
+	value = _value(rand, key)
+	return lambda obj: obj.oldinfo.__setitem__(key, copy.deepcopy(value))
+
+
+def _clear_old(rand, key):
+	def change(obj):
+		obj.oldinfo = {}
+	return change
+
+
+def _replace_info(rand, key):
+	def change(obj):
+		obj.info = dict(obj.info.items())
+	return change
+
+
+def _options(rand, key):
+	options = rand.choice([[], ['opt'], ['opt', 'other']])
+	return lambda obj: setattr(obj, 'options', list(options))
+
+
+def _save(rand, key):
+	return lambda obj: obj.save()
+
+
+CHANGES = [_set, _set, _append, _pop, _delete, _update, _setdefault, _set_old, _clear_old, _replace_info, _options, _save]
+
+
+class TestChangeTracking(unittest.TestCase):
+
+	def assertSameChanges(self, tracked, reference, steps):
+		self.assertEqual(sorted(tracked.diff()), sorted(reference.diff()), steps)
+		for key in KEYS:
+			self.assertEqual(tracked.hasChanged(key), reference.hasChanged(key), (key, steps))
+		self.assertEqual(dict(tracked.info.items()), reference.info, steps)
+		self.assertEqual(dict(tracked.oldinfo), reference.oldinfo, steps)
+
+	def test_fuzz(self):
+		rand = random.Random(4242)
+		for i in range(SEQUENCES):
+			tracked, reference = Tracked(), Reference()
+			for obj in (tracked, reference):
+				obj.info.update({'scalar': 'a', 'multi': ['x']})
+				obj.save()
+			steps = []
+			for j in range(STEPS):
+				factory = rand.choice(CHANGES)
+				key = rand.choice(KEYS)
+				steps.append((factory.__name__, key))
+				change = factory(rand, key)
+				change(tracked)
+				change(reference)
+				self.assertSameChanges(tracked, reference, steps)
+
+	def test_in_place_change(self):
+		info = ChangeTrackingDict({'groups': ['cn=a'], 'name': 'x'})
+		info.reset()
+		self.assertEqual(info.dirty(), [])
+		info['groups'].append('cn=b')
+		self.assertEqual(info.dirty(), ['groups'])
+		self.assertEqual(info.old_value('groups'), ['cn=a'])
+		self.assertEqual(dict(info.original()), {'groups': ['cn=a'], 'name': 'x'})
+
+	def test_pickle(self):
+		info = ChangeTrackingDict({'groups': ['cn=a'], 'name': 'x'})
+		info.reset()
+		info['name'] = 'y'
+		del info['groups']
+		restored = pickle.loads(pickle.dumps(info, pickle.HIGHEST_PROTOCOL))
+		self.assertEqual(restored, info)
+		self.assertEqual(dict(restored.original()), dict(info.original()))
+		self.assertEqual(sorted(restored.dirty()), ['groups', 'name'])
+
+
+if __name__ == '__main__':
+	unittest.main()
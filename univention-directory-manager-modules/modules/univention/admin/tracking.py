@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Admin Modules
+#  change tracking of object properties
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+import copy
+import collections
+
+MISSING = object()
+_IMMUTABLE = (basestring, int, long, float, bool, type(None))
+
+
+def snapshot(value):
+	'''Return a copy of value which is not affected by in-place changes of
+	value. Strings, numbers and other immutable values are returned as is.'''
+	if isinstance(value, _IMMUTABLE) or value is MISSING:
+		return value
+	if isinstance(value, list):
+		return [snapshot(v) for v in value]
+	if isinstance(value, tuple):
+		return tuple(snapshot(v) for v in value)
+	if isinstance(value, dict):
+		return dict((k, snapshot(v)) for k, v in value.iteritems())
+	return copy.deepcopy(value)
+
+
+def _restore(items, old, missing):
+	info = ChangeTrackingDict()
+	dict.update(info, items)
+	info._old = old
+	info._old.update((key, MISSING) for key in missing)
+	return info
+
+
+class ChangeTrackingDict(dict):
+
+	'''A dictionary which remembers the original value of every key since the
+	last call of reset(). A key is recorded when it is set or removed and also
+	when its value is handed out as a mutable object (e.g. a list), as the
+	caller may change it in place. Only the recorded ("dirty") keys can
+	differ from the original state.'''
+
+	def __init__(self, *args, **kwargs):
+		dict.__init__(self, *args, **kwargs)
+		self._old = {}
+
+	def __reduce_ex__(self, protocol):
+		old = dict((key, value) for key, value in self._old.iteritems() if value is not MISSING)
+		missing = [key for key, value in self._old.iteritems() if value is MISSING]
+		return (_restore, (dict(dict.items(self)), old, missing))
+
+	def _touch(self, key):
+		if key not in self._old:
+			self._old[key] = snapshot(dict.get(self, key, MISSING))
+
+	def _touch_mutable(self):
+		for key, value in dict.iteritems(self):
+			if not isinstance(value, _IMMUTABLE):
+				self._touch(key)
+
+	def reset(self, old=None):
+		'''Make the current state the original state. If old is given, it
+		becomes the original state instead.'''
+		self._old = {}
+		if old is not None:
+			for key in set(dict.keys(self)) | set(old.keys()):
+				self._old[key] = old.get(key, MISSING)
+
+	def dirty(self):
+		'''Return the keys which may have changed since the last reset().'''
+		return self._old.keys()
+
+	def is_dirty(self, key):
+		return key in self._old
+
+	def old_value(self, key, default=None):
+		'''Return the original value of key without recording it.'''
+		value = self._old.get(key, MISSING) if key in self._old else dict.get(self, key, MISSING)
+		if value is MISSING:
+			return default
+		return value
+
+	def original(self):
+		'''Return the original state as a view.'''
+		return OriginalState(self)
+
+	def __getitem__(self, key):
+		value = dict.__getitem__(self, key)
+		if not isinstance(value, _IMMUTABLE):
+			self._touch(key)
+		return value
+
+	def get(self, key, default=None):
+		if dict.__contains__(self, key):
+			return self[key]
+		return default
+
+	def __setitem__(self, key, value):
+		self._touch(key)
+		dict.__setitem__(self, key, value)
+
+	def __delitem__(self, key):
+		self._touch(key)
+		dict.__delitem__(self, key)
+
+	def pop(self, key, *default):
+		self._touch(key)
+		return dict.pop(self, key, *default)
+
+	def popitem(self):
+		for key in dict.iterkeys(self):
+			return (key, self.pop(key))
+		raise KeyError('popitem(): dictionary is empty')
+
+	def setdefault(self, key, default=None):
+		self._touch(key)
+		return dict.setdefault(self, key, default)
+
+	def update(self, *args, **kwargs):
+		items = dict(*args, **kwargs)
+		for key in items:
+			self._touch(key)
+		dict.update(self, items)
+
+	def clear(self):
+		for key in dict.keys(self):
+			self._touch(key)
+		dict.clear(self)
+
+	def copy(self):
+		self._touch_mutable()
+		return dict(dict.items(self))
+
+	def values(self):
+		self._touch_mutable()
+		return dict.values(self)
+
+	def itervalues(self):
+		self._touch_mutable()
+		return dict.itervalues(self)
+
+	def items(self):
+		self._touch_mutable()
+		return dict.items(self)
+
+	def iteritems(self):
+		self._touch_mutable()
+		return dict.iteritems(self)
+
+
+class OriginalState(collections.MutableMapping):
+
+	'''Dictionary view of the original state of a ChangeTrackingDict. Changing
+	the view changes the recorded original values.'''
+
+	def __init__(self, info):
+		self._info = info
+
+	def __getitem__(self, key):
+		info = self._info
+		if not info.is_dirty(key):
+			if not dict.__contains__(info, key):
+				raise KeyError(key)
+			value = dict.__getitem__(info, key)
+			if isinstance(value, _IMMUTABLE):
+				return value
+			info._touch(key)
+		value = info._old[key]
+		if value is MISSING:
+			raise KeyError(key)
+		return value
+
+	def __setitem__(self, key, value):
+		self._info._old[key] = value
+
+	def __delitem__(self, key):
+		self[key]
+		self._info._old[key] = MISSING
+
+	def __iter__(self):
+		info = self._info
+		for key in dict.iterkeys(info):
+			if not info.is_dirty(key):
+				yield key
+		for key, value in info._old.items():
+			if value is not MISSING:
+				yield key
+
+	def __len__(self):
+		return sum(1 for key in self)
+
+	def __contains__(self, key):
+		return self._info.old_value(key, MISSING) is not MISSING
+
+	def has_key(self, key):
+		return key in self
+
+	def __repr__(self):
+		return repr(dict(self))
@@ -33,6 +33,7 @@
 import ldap
 import string
 import time
+import collections
 
 import univention.uldap
 from univention.admin import localization
@@ -52,6 +53,9 @@ configRegistry.load()
 
 explodeDn = univention.uldap.explodeDn
 
+# number of outstanding requests of access.modify_many()
+MODIFY_WINDOW = 64
+
 
 class DN(object):
 	"""A LDAP Distinguished Name"""
@@ -500,6 +504,57 @@ class access:
 			univention.debug.debug(univention.debug.LDAP, univention.debug.ALL, 'mod dn=%s err=%s' % (dn, msg))
 			raise univention.admin.uexceptions.ldapError(_err2str(msg), original_exception=msg)
 
+	def modify_many(self, changes, ignore_license=0, window=MODIFY_WINDOW):
+		"""Apply `changes`, a list of `(dn, [(attr, oldvalues, newvalues), ...])`.
+
+		The modifications are pipelined: up to `window` requests are sent
+		before waiting for their results. Only the values differing between
+		`oldvalues` and `newvalues` are deleted and added, so concurrent
+		changes of other values are kept. All modifications are tried; the
+		first error is raised afterwards.
+		"""
+		self._validateLicense()
+		if not self.allow_modify and not ignore_license:
+			univention.debug.debug(univention.debug.ADMIN, univention.debug.ERROR, 'modify_many: %d objects' % len(changes))
+			raise univention.admin.uexceptions.licenseDisableModify
+		conn = self.lo.lo
+		pending = collections.deque()
+		errors = []
+
+		def _result():
+			msgid, dn = pending.popleft()
+			try:
+				conn.result2(msgid)
+			except ldap.LDAPError as msg:
+				univention.debug.debug(univention.debug.LDAP, univention.debug.ALL, 'mod dn=%s err=%s' % (dn, msg))
+				errors.append((dn, msg))
+
+		for dn, attrs in changes:
+			ml = []
+			for attr, oldvalues, newvalues in attrs:
+				removed = [value for value in oldvalues if value not in newvalues]
+				added = [value for value in newvalues if value not in oldvalues]
+				if removed:
+					ml.append((ldap.MOD_DELETE, attr, removed))
+				if added:
+					ml.append((ldap.MOD_ADD, attr, added))
+			if not ml:
+				continue
+			univention.debug.debug(univention.debug.LDAP, univention.debug.ALL, 'mod dn=%s ml=%s' % (dn, ml))
+			pending.append((conn.modify_ext(dn, ml), dn))
+			if len(pending) >= window:
+				_result()
+		while pending:
+			_result()
+
+		if errors:
+			dn, msg = errors[0]
+			if isinstance(msg, ldap.NO_SUCH_OBJECT):
+				raise univention.admin.uexceptions.noObject(dn)
+			if isinstance(msg, ldap.INSUFFICIENT_ACCESS):
+				raise univention.admin.uexceptions.permissionDenied
+			raise univention.admin.uexceptions.ldapError(_err2str(msg), original_exception=msg)
+
 	def rename(self, dn, newdn, move_childs=0, ignore_license=False):
 		if not move_childs == 0:
 			raise univention.admin.uexceptions.noObject(_("Moving children is not supported."))
@@ -44,6 +44,7 @@ import ldap
 
 import univention.debug
 
+import univention.admin.log
 import univention.admin.uexceptions
 import univention.admin.uldap
 import univention.admin.modules
@@ -543,7 +544,7 @@ def _doit(arglist):
 		debug_level = 0
 
 	univention.debug.set_level(univention.debug.LDAP, int(debug_level))
-	univention.debug.set_level(univention.debug.ADMIN, int(debug_level))
+	univention.admin.log.set_level(univention.debug.ADMIN, int(debug_level))
 
 	if binddn and bindpwd:
 		univention.debug.debug(univention.debug.ADMIN, univention.debug.INFO, "using %s account" % binddn)
@@ -990,12 +991,19 @@ def _doit(arglist):
 		out.append(_2utf8(filter))
 
 		try:
-			for object in univention.admin.modules.lookup(module, co, lo, scope='sub', superordinate=superordinate, base=position.getDn(), filter=filter):
+			objects = univention.admin.modules.lookup(module, co, lo, scope='sub', superordinate=superordinate, base=position.getDn(), filter=filter)
+			opened = False
+			if hasattr(module, 'open_many') and not getattr(module, 'virtual', False):
+				# e.g. users/user resolves groups of all objects at once
+				module.open_many(objects)
+				opened = True
+			for object in objects:
 				out.append('DN: %s' % _2utf8(univention.admin.objects.dn(object)))
 				out.append('ARG: %s' % univention.admin.objects.arg(object))
 
 				if (hasattr(module, 'virtual') and not module.virtual) or not hasattr(module, 'virtual'):
-					object.open()
+					if not opened:
+						object.open()
 					if hasattr(object, 'open_warning') and object.open_warning:
 						out.append('WARNING: %s' % object.open_warning)
 					for key, value in object.items():
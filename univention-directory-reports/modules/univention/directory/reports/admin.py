@@ -30,6 +30,9 @@
 # /usr/share/common-licenses/AGPL-3; if not, see
 # <http://www.gnu.org/licenses/>.
 
+import collections
+from ldap.filter import escape_filter_chars
+
 import univention.admin.uldap as ua_ldap
 import univention.admin.objects as ua_objects
 import univention.admin.modules as ua_modules
@@ -43,7 +46,7 @@ import univention.debug as ud
 
 from filter import filter_get
 
-__all__ = ['connect', 'get_object', 'cache_object', 'connected', 'identify', 'set_format']
+__all__ = ['connect', 'get_object', 'get_objects', 'cache_object', 'connected', 'identify', 'set_format']
 
 _admin = None
 
@@ -86,12 +89,16 @@ def texClean(str):
 class AdminConnection(object):
 
 	def __init__(self, userdn=None, password=None, host='localhost', base=None, start_tls=2, access=None, format=True):
-		self._cached = {}
+		self._cached = collections.OrderedDict()
 		self._modules = {}
 		self._policies = {}
 		self._format = format
 		self._bc = ConfigRegistry()
 		self._bc.load()
+		try:
+			self._cache_size = int(self._bc.get('directory/reports/cache/size', 10000))
+		except ValueError:
+			self._cache_size = 10000
 		self.__reverse = {}
 		if not base:
 			self._base = self._bc['ldap/base']
@@ -115,9 +122,50 @@ class AdminConnection(object):
 
 	def clear_cache(self):
 		del self._cached
-		self._cached = {}
+		self._cached = collections.OrderedDict()
+
+	def _cache_get(self, dn):
+		obj = self._cached.pop(dn, None)
+		if obj is not None:
+			self._cached[dn] = obj
+		return obj
+
+	def _cache_put(self, dn, obj):
+		self._cached[dn] = obj
+		while len(self._cached) > self._cache_size:
+			self._cached.popitem(last=False)
 
 	def get_object(self, module, dn):
+		dn = self._unescape(dn)
+		try:
+			return self.get_object_real(module, dn)
+		except ua_exceptions.noObject:
+			return None
+
+	def get_objects(self, module, dns):
+		"""Open the objects of a list of DNs, reading all entries which are
+		not cached yet with a single LDAP search. Returns a list of (dn,
+		object) pairs in the given order, object is None for missing DNs."""
+		dns = [self._unescape(dn) for dn in dns]
+		missing = [dn for dn in dns if dn not in self._cached]
+		entries = {}
+		if len(missing) > 1:
+			ldap_filter = '(|%s)' % ''.join('(entryDN=%s)' % escape_filter_chars(dn) for dn in missing)
+			try:
+				for dn, attrs in self._access.search(filter=ldap_filter, base=self._base):
+					entries[dn.lower()] = attrs
+			except ua_exceptions.base as exc:
+				ud.debug(ud.ADMIN, ud.WARN, 'Prefetching %d objects failed: %s' % (len(missing), exc))
+
+		result = []
+		for dn in dns:
+			try:
+				result.append((dn, self.get_object_real(module, dn, entries.get(dn.lower()))))
+			except (ua_exceptions.noObject, ua_exceptions.ldapError):
+				result.append((dn, None))
+		return result
+
+	def _unescape(self, dn):
 		if dn in self.__reverse:  # this value has been escaped => use <self.__reverse> to unescape
 			possible_real_DNs = set()
 			for possible_real_DN_set in self.__reverse[dn].values():
@@ -126,14 +174,12 @@ class AdminConnection(object):
 			if not len(possible_real_DNs) == 1:
 				raise ValueError('ambiguous DNs, cannot unescape %s (possibilities: %s)' % (repr(dn), repr(possible_real_DNs)))
 			dn = possible_real_DNs[0]
-		try:
-			return self.get_object_real(module, dn)
-		except ua_exceptions.noObject:
-			return None
+		return dn
 
-	def get_object_real(self, module, dn):
-		if dn in self._cached:
-			return self._cached[dn]
+	def get_object_real(self, module, dn, attributes=None):
+		cached = self._cache_get(dn)
+		if cached is not None:
+			return cached
 		if isinstance(module, basestring):
 			if module in self._modules:
 				module = self._modules[module]
@@ -143,11 +189,11 @@ class AdminConnection(object):
 				ua_modules.init(self._access, self._position, module)
 				self._modules[name] = module
 		elif module is None:
-			module = self.identify(dn)
+			module = self.identify(dn, attributes)
 			if not module:
 				return None
 			ua_modules.init(self._access, self._position, module)
-		new = ua_objects.get(module, self._config, self._access, position=self._position, dn=dn)
+		new = ua_objects.get(module, self._config, self._access, position=self._position, dn=dn, attributes=attributes or [])
 		# if the object is not valid it should be displayed as an empty object
 		try:
 			new.open()
@@ -170,16 +216,19 @@ class AdminConnection(object):
 				new.info[key] = value
 
 		self._get_policies(new)
-		self._cached[dn] = new
+		self._cache_put(dn, new)
 
 		return new
 
-	def identify(self, dn):
-		res = self._access.search(base=dn, scope='base')
-		if res:
-			mods = ua_modules.identify(dn, res[0][1])
-			if mods:
-				return mods[0]
+	def identify(self, dn, attributes=None):
+		if not attributes:
+			res = self._access.search(base=dn, scope='base')
+			if not res:
+				return None
+			attributes = res[0][1]
+		mods = ua_modules.identify(dn, attributes)
+		if mods:
+			return mods[0]
 		return None
 
 	# store the old value of every attribute (if it is a string) in <self.__reverse> to enable <get_object()> to reverse the escaping
@@ -277,6 +326,13 @@ def get_object(module, dn):
 		return None
 
 
+def get_objects(module, dns):
+	global _admin
+	if not _admin:
+		return [(dn, None) for dn in dns]
+	return _admin.get_objects(module, dns)
+
+
 def set_format(format):
 	global _admin
 	if _admin:
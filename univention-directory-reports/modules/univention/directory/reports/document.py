@@ -32,19 +32,17 @@
 
 import os
 import sys
-import copy
-import codecs
 import tempfile
 import subprocess
 
-from parser import Parser
-from output import Output
-from interpreter import Interpreter
+from template import Template
 import admin
 
 
 class Document(object):
 	(TYPE_LATEX, TYPE_CSV, TYPE_UNKNOWN) = range(3)
+	PREFETCH_SIZE = 200
+	CSV_FLUSH_ROWS = 1000
 
 	def __init__(self, template, header=None, footer=None):
 		self._template = template
@@ -87,39 +85,70 @@ class Document(object):
 		fd.write(tmpfd.read())
 		tmpfd.close()
 
+	def _objects(self, objects):
+		"""Yield the opened objects for a list of DNs or UDM objects,
+		reading the DNs from LDAP in batches of PREFETCH_SIZE."""
+		batch = []
+		for dn in objects:
+			if isinstance(dn, basestring):
+				batch.append(dn)
+				if len(batch) < self.PREFETCH_SIZE:
+					continue
+			for item in admin.get_objects(None, batch):
+				yield item
+			batch = []
+			if not isinstance(dn, basestring):
+				yield (dn, admin.cache_object(dn))
+		for item in admin.get_objects(None, batch):
+			yield item
+
 	def create_source(self, objects=[]):
 		"""Create report from objects (list of DNs)."""
 		tmpfile = self.__create_tempfile()
 		admin.set_format(self._type == Document.TYPE_LATEX)
-		parser = Parser(filename=self._template)
-		parser.tokenize()
-		tokens = parser._tokens
-		fd = codecs.open(tmpfile, 'wb+', encoding='utf8')
-		if parser._header:
-			fd.write(parser._header.data)
+		template = Template(filename=self._template)
+		fd = open(tmpfile, 'wb+')
+		try:
+			if self._type == Document.TYPE_CSV:
+				self._write_csv(fd, template, objects)
+			else:
+				self._write_latex(fd, template, objects)
+		finally:
+			fd.close()
+
+		return tmpfile
+
+	def _write_csv(self, fd, template, objects):
+		"""Render the rows and write them in chunks of CSV_FLUSH_ROWS."""
+		if template.header is not None:
+			fd.write(template.header.encode('utf8'))
+		rows = []
+		for dn, obj in self._objects(objects):
+			if obj is None:
+				print >>sys.stderr, "warning: dn '%s' not found, skipped." % dn
+				continue
+			rows.append(template.render(obj))
+			if len(rows) >= self.CSV_FLUSH_ROWS:
+				fd.write(u''.join(rows).encode('utf8'))
+				rows = []
+		fd.write(u''.join(rows).encode('utf8'))
+		if template.footer is not None:
+			fd.write(template.footer.encode('utf8'))
+
+	def _write_latex(self, fd, template, objects):
+		if template.header is not None:
+			fd.write(template.header.encode('utf8'))
 		elif self._header:
 			self.__append_file(fd, self._header)
-
-		for dn in objects:
-			if isinstance(dn, basestring):
-				obj = admin.get_object(None, dn)
-			else:
-				obj = admin.cache_object(dn)
+		for dn, obj in self._objects(objects):
 			if obj is None:
 				print >>sys.stderr, "warning: dn '%s' not found, skipped." % dn
 				continue
-			tks = copy.deepcopy(tokens)
-			interpret = Interpreter(obj, tks)
-			interpret.run()
-			output = Output(tks, fd=fd)
-			output.write()
-		if parser._footer:
-			fd.write(parser._footer.data)
+			fd.write(template.render(obj).encode('utf8'))
+		if template.footer is not None:
+			fd.write(template.footer.encode('utf8'))
 		elif self._footer:
 			self.__append_file(fd, self._footer)
-		fd.close()
-
-		return tmpfile
 
 	def create_pdf(self, latex_file):
 		"""Run pdflatex on latex_file and return path to generated file or None on errors."""
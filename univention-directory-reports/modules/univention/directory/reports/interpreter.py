@@ -103,78 +103,108 @@ class Interpreter(object):
 				self.policy(token, base_objects[0])
 
 	def resolve(self, token, base):
-		if 'module' in token.attrs:
-			attr = token.attrs.get('dn-attribute', None)
-			if attr and base.has_key(attr) and base[attr]:
-				values = base[attr]
-				if not isinstance(values, (list, tuple)):
-					values = [values, ]
-				for value in values:
-					new_base = admin.get_object(token.attrs['module'], value)
-					token.objects.append(new_base)
+		token.objects.extend(resolve_objects(token.attrs, base))
 
 	def query(self, token, base):
-		if 'module' in token.attrs:
-			attr = token.attrs.get('start', None)
-			if attr and base.has_key(attr) and base[attr]:
-				new_base = admin.get_object(token.attrs['module'], base[attr][0])
-				if not isinstance(base[attr], (list, tuple)):
-					base[attr] = [base[attr], ]
-				filter = token.attrs.get('pattern', None)
-				if filter:
-					filter = filter.split('=', 1)
-				regex = token.attrs.get('regex', None)
-				if regex:
-					regex = regex.split('=', 1)
-					regex[1] = re.compile(regex[1])
-				objects = self._query_recursive(base[attr], token.attrs['next'], token.attrs['module'], filter, regex)
-				token.objects.extend(objects)
-
-	def _query_recursive(self, objects, attr, module, filter=None, regex=None):
-		_objs = []
-		for dn in objects:
-			obj = admin.get_object(module, dn)
-			if not filter and not regex:
-				_objs.append(obj)
-			elif filter and obj.has_key(filter[0]) and obj[filter[0]] and fnmatch.fnmatch(obj[filter[0]], filter[1]):
-				_objs.append(obj)
-			elif regex and obj.has_key(regex[0]) and obj[regex[0]] and regex[1].match(obj[regex[0]]):
-				_objs.append(obj)
-			if not obj.has_key(attr):
-				continue
-
-			_objs.extend(self._query_recursive(obj[attr], attr, module, filter, regex))
-
-		return _objs
+		token.objects.extend(query_objects(token.attrs, base))
 
 	def policy(self, token, base):
-		if 'module' in token.attrs and ('inherited' in token.attrs or 'direct' in token.attrs):
-			policy = ua_objects.getPolicyReference(base, token.attrs['module'])
-			# need to call str() directly in order to force a correct translation
-			token.value = str(_('No'))
-			if 'direct' in token.attrs and policy:
-				token.value = str(_('Yes'))
-			elif 'inherited' in token.attrs and not policy:
-				token.value = str(_('Yes'))
+		value = policy_value(token.attrs, base)
+		if value is not None:
+			token.value = value
 
 	def attribute(self, token, base):
-		if 'name' in token.attrs:
-			if token.attrs['name'] in base.info:
-				value = base.info[token.attrs['name']]
-				if isinstance(value, (list, tuple)):
-					if not value or (isinstance(value, str) and value.lower() == 'none'):
-						if 'default' in token.attrs:
-							token.value = token.attrs['default']
-						else:
-							token.value = ''
-					else:
-						sep = token.attrs.get('separator', ', ')
-						token.value = sep.join(value)
+		value = attribute_value(token.attrs, base)
+		if value is not None:
+			token.value = value
+
+
+def resolve_objects(attrs, base):
+	"""Return the objects referenced by the dn-attribute of base."""
+	objects = []
+	if 'module' in attrs:
+		attr = attrs.get('dn-attribute', None)
+		if attr and base.has_key(attr) and base[attr]:
+			values = base[attr]
+			if not isinstance(values, (list, tuple)):
+				values = [values, ]
+			for value in values:
+				objects.append(admin.get_object(attrs['module'], value))
+	return objects
+
+
+def query_objects(attrs, base):
+	"""Return the objects found by recursively following the next attribute."""
+	objects = []
+	if 'module' in attrs:
+		attr = attrs.get('start', None)
+		if attr and base.has_key(attr) and base[attr]:
+			new_base = admin.get_object(attrs['module'], base[attr][0])
+			if not isinstance(base[attr], (list, tuple)):
+				base[attr] = [base[attr], ]
+			filter = attrs.get('pattern', None)
+			if filter:
+				filter = filter.split('=', 1)
+			regex = attrs.get('regex', None)
+			if regex:
+				regex = regex.split('=', 1)
+				regex[1] = re.compile(regex[1])
+			objects.extend(_query_recursive(base[attr], attrs['next'], attrs['module'], filter, regex))
+	return objects
+
+
+def _query_recursive(objects, attr, module, filter=None, regex=None):
+	_objs = []
+	for dn in objects:
+		obj = admin.get_object(module, dn)
+		if not filter and not regex:
+			_objs.append(obj)
+		elif filter and obj.has_key(filter[0]) and obj[filter[0]] and fnmatch.fnmatch(obj[filter[0]], filter[1]):
+			_objs.append(obj)
+		elif regex and obj.has_key(regex[0]) and obj[regex[0]] and regex[1].match(obj[regex[0]]):
+			_objs.append(obj)
+		if not obj.has_key(attr):
+			continue
+
+		_objs.extend(_query_recursive(obj[attr], attr, module, filter, regex))
+
+	return _objs
+
+
+def policy_value(attrs, base):
+	"""Return the Yes/No value of a policy token or None if it does not apply."""
+	if 'module' in attrs and ('inherited' in attrs or 'direct' in attrs):
+		policy = ua_objects.getPolicyReference(base, attrs['module'])
+		# need to call str() directly in order to force a correct translation
+		value = str(_('No'))
+		if 'direct' in attrs and policy:
+			value = str(_('Yes'))
+		elif 'inherited' in attrs and not policy:
+			value = str(_('Yes'))
+		return value
+	return None
+
+
+def attribute_value(attrs, base):
+	"""Return the value of an attribute token or None if it has no name."""
+	if 'name' not in attrs:
+		return None
+	value = ''
+	if attrs['name'] in base.info:
+		value = base.info[attrs['name']]
+		if isinstance(value, (list, tuple)):
+			if not value or (isinstance(value, str) and value.lower() == 'none'):
+				if 'default' in attrs:
+					value = attrs['default']
 				else:
-					token.value = value
-			elif 'default' in token.attrs:
-				token.value = token.attrs['default']
-			if token.value is None or token.value == '':
-				token.value = ''
-				if 'default' in token.attrs:
-					token.value = token.attrs['default']
+					value = ''
+			else:
+				sep = attrs.get('separator', ', ')
+				value = sep.join(value)
+	elif 'default' in attrs:
+		value = attrs['default']
+	if value is None or value == '':
+		value = ''
+		if 'default' in attrs:
+			value = attrs['default']
+	return value
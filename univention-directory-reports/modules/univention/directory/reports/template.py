@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Directory Reports
+#  compiles a report template into a render function
+#
+# Copyright 2007-2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+from parser import Parser
+from tokens import TextToken, ResolveToken, QueryToken, AttributeToken, PolicyToken
+from interpreter import resolve_objects, query_objects, policy_value, attribute_value
+
+
+def _unicode(value):
+	if value is None:
+		return u''
+	if isinstance(value, str):
+		return unicode(value, 'utf8')
+	return value
+
+
+class Template(object):
+
+	"""A report template which is parsed and compiled once and can then be
+	rendered for any number of objects. Rendering produces the same text the
+	Interpreter and Output produce for a deep copy of the token list."""
+
+	def __init__(self, filename=None, data=None):
+		parser = Parser(filename=filename, data=data)
+		parser.tokenize()
+		self.header = self._text(parser._header)
+		self.footer = self._text(parser._footer)
+		self._render = self._compile(parser._tokens)
+
+	@staticmethod
+	def _text(token):
+		if token is None or token.data is None:
+			return None
+		return unicode(token.data, 'utf8')
+
+	def render(self, obj):
+		"""Return the report text for obj."""
+		out = []
+		self._render(obj, out)
+		return u''.join(out)
+
+	def _compile(self, tokens):
+		renderers = [self._compile_token(token) for token in tokens]
+		renderers = [renderer for renderer in renderers if renderer is not None]
+
+		def render(base, out):
+			for renderer in renderers:
+				renderer(base, out)
+		return render
+
+	def _compile_token(self, token):
+		if isinstance(token, TextToken):
+			text = unicode(token.data, 'utf8')
+			return lambda base, out: out.append(text)
+		elif isinstance(token, (QueryToken, ResolveToken)):
+			return self._compile_context(token)
+		elif isinstance(token, AttributeToken):
+			return self._compile_attribute(token.attrs)
+		elif isinstance(token, PolicyToken):
+			attrs = token.attrs
+
+			def render_policy(base, out):
+				out.append(_unicode(policy_value(attrs, base)))
+			return render_policy
+		return None
+
+	def _compile_attribute(self, attrs):
+		append = attrs.get('append')
+		prepend = attrs.get('prepend')
+
+		def render_attribute(base, out):
+			value = attribute_value(attrs, base)
+			if value is None:
+				value = ''
+			if value:
+				if append is not None:
+					value += append
+				if prepend is not None:
+					value = prepend + value
+			out.append(_unicode(value))
+		return render_attribute
+
+	def _compile_context(self, token):
+		attrs = token.attrs
+		alternative = None
+		if 'alternative' in attrs:
+			alternative = unicode(attrs['alternative'], 'utf8')
+
+		if not len(token):
+			def render_empty(base, out):
+				if alternative is not None:
+					out.append(alternative)
+			return render_empty
+
+		if isinstance(token, QueryToken):
+			get_objects = query_objects
+		else:
+			get_objects = resolve_objects
+		children = [self._compile_token(child) or (lambda base, out: None) for child in token]
+		separator = header = footer = None
+		if 'separator' in attrs:
+			separator = unicode(attrs['separator'], 'utf8')
+		if 'header' in attrs:
+			header = unicode(attrs['header'], 'utf8')
+		if 'footer' in attrs:
+			footer = unicode(attrs['footer'], 'utf8')
+
+		def render_context(base, out):
+			objects = get_objects(attrs, base)
+			if not objects:
+				if alternative is not None:
+					out.append(alternative)
+				return
+			if header is not None:
+				out.append(header)
+			if separator is None:
+				for obj in objects:
+					for child in children:
+						child(obj, out)
+			else:
+				items = []
+				for obj in objects:
+					for child in children:
+						item = []
+						child(obj, item)
+						items.append(u''.join(item))
+				out.append(separator.join(items))
+			if footer is not None:
+				out.append(footer)
+		return render_context
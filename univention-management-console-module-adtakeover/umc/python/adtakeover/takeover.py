@@ -34,6 +34,7 @@
 import samba.getopt
 import sys
 import os
+import collections
 import re
 import subprocess
 import shutil
@@ -44,6 +45,7 @@ from samba.auth import system_session
 from samba.param import LoadParm
 import time
 import ldap
+import ldap.dn
 from samba.ndr import ndr_unpack
 from samba.dcerpc import security
 import univention.admin.uldap
@@ -87,6 +89,8 @@ BACKUP_DIR = "/var/univention-backup/ad-takeover"
 SAMBA_DIR = '/var/lib/samba'
 SAMBA_PRIVATE_DIR = os.path.join(SAMBA_DIR, 'private')
 SYSVOL_PATH = os.path.join(SAMBA_DIR, 'sysvol')
+SID_REWRITE_WINDOW = 64
+SID_REWRITE_PROGRESS_INTERVAL = 1000
 
 logging.basicConfig(filename=LOGFILE_NAME, format='%(asctime)s %(message)s', level=logging.DEBUG)
 log = logging.getLogger()
@@ -305,7 +309,7 @@ def join_to_domain_and_copy_domain_data(hostname_or_ip, username, password, prog
 	takeover.post_join_tasks_and_start_samba_without_drsuapi()
 	progress.headline(_('Rewriting SIDs in the UCS directory service'))
 	progress.percentage(22)
-	takeover.rewrite_sambaSIDs_in_OpenLDAP()
+	takeover.rewrite_sambaSIDs_in_OpenLDAP(progress)
 	progress.headline(_('Checking group policies'))
 	takeover.remove_conflicting_msgpo_objects()
 	progress.headline(_('Initializing the S4 Connector listener'))
@@ -1174,22 +1178,56 @@ class AD_Takeover():
 				log.info("Removing associated conflicting GPO directory %s." % (gpo_path,))
 				shutil.rmtree(gpo_path, ignore_errors=True)
 
-	def rewrite_sambaSIDs_in_OpenLDAP(self):
+	def _load_samdb_sids(self):
+		'''Map the lowercased sAMAccountName of every Samba object to its objectSid.'''
+		samdb_sids = {}
+		msgs = self.samdb.search(base=self.ucr["samba4/ldap/base"], scope=samba.ldb.SCOPE_SUBTREE,
+			expression="(&(sAMAccountName=*)(objectSid=*))",
+			attrs=["sAMAccountName", "objectSid"])
+		for obj in msgs:
+			# the first match wins, like the former per object search did
+			samdb_sids.setdefault(obj["sAMAccountName"][0].lower(), str(ndr_unpack(security.dom_sid, obj["objectSid"][0])))
+		log.debug("Loaded %d objectSids from Samba" % (len(samdb_sids),))
+		return samdb_sids
+
+	def _modify_pipelined(self, changes, attribute, progress=None):
+		'''Apply the list of (dn, modlist) pairs to the UCS LDAP, keeping up
+		to SID_REWRITE_WINDOW asynchronous modify operations in flight.'''
+		if not changes:
+			return
+		conn = self.lo.lo.lo
+		total = len(changes)
+		pending = collections.deque()
+		done = 0
+		for (dn, ml) in changes:
+			pending.append((conn.modify(dn, ml), dn))
+			while len(pending) >= SID_REWRITE_WINDOW or (done + len(pending) == total and pending):
+				(msgid, pending_dn) = pending.popleft()
+				try:
+					conn.result(msgid)
+				except ldap.LDAPError as exc:
+					log.error("Error: Rewriting %s of %s failed: %s" % (attribute, pending_dn, exc))
+					for (msgid, _dn) in pending:
+						conn.abandon(msgid)
+					raise
+				done += 1
+				if done % SID_REWRITE_PROGRESS_INTERVAL == 0 or done == total:
+					log.info("Rewrote %s of %d/%d objects" % (attribute, done, total))
+					if progress:
+						progress.message(_('Rewrote %(attribute)s of %(done)d/%(total)d objects') % {'attribute': attribute, 'done': done, 'total': total})
+
+	def rewrite_sambaSIDs_in_OpenLDAP(self, progress=None):
 		# Phase I.b: Pre-Map SIDs (locale adjustment etc.)
 
 		# pre-create containers in UDM
-		container_list = []
+		containers = []
 		msgs = self.samdb.search(base=self.ucr["samba4/ldap/base"], scope=samba.ldb.SCOPE_SUBTREE,
 			expression="(objectClass=organizationalunit)",
 			attrs=["dn"])
 		if msgs:
 			log.debug("Creating OUs in the Univention Directory Manager")
 		for obj in msgs:
-			container_list.append(obj["dn"].get_linearized())
-
-		container_list.sort(key=len)
-
-		for container_dn in container_list:
+			container_dn = obj["dn"].get_linearized()
 			rdn_list = ldap.explode_dn(container_dn)
 			(ou_type, ou_name) = rdn_list.pop(0).split('=', 1)
 			position = string.replace(','.join(rdn_list).lower(), self.ucr['samba4/ldap/base'].lower(), self.ucr['ldap/base'].lower())
@@ -1203,7 +1241,10 @@ class AD_Takeover():
 				log.warn("Warning: Unmapped container type %s" % container_dn)
 
 			if udm_type:
-				run_and_output_to_log(["/usr/sbin/univention-directory-manager", udm_type, "create", "--ignore_exists", "--position", position, "--set", "name=%s" % ou_name], log.debug)
+				containers.append((udm_type, position, ou_name))
+
+		udmObjectCreator = UDMObjectCreator(self.lo)
+		udmObjectCreator.create_containers(containers)
 
 		# Identify and rename UCS group names to match Samba4 (localized) group names
 		AD_well_known_sids = {}
@@ -1261,6 +1302,8 @@ class AD_Takeover():
 		# construct dict of old UCS sambaSIDs
 		old_sambaSID_dict = {}
 		samba_sid_map = {}
+		samdb_sids = self._load_samdb_sids()
+		sid_changes = []
 		# Users and Computers
 		ldap_result = self.lo.search(filter="(&(objectClass=sambaSamAccount)(sambaSID=*))", attr=["uid", "sambaSID", "univentionObjectType"])
 		for record in ldap_result:
@@ -1270,19 +1313,13 @@ class AD_Takeover():
 			if old_sid.startswith(self.old_domainsid):
 				old_sambaSID_dict[old_sid] = ucs_name
 
-				msgs = self.samdb.search(base=self.ucr["samba4/ldap/base"], scope=samba.ldb.SCOPE_SUBTREE,
-					expression="(sAMAccountName=%s)" % ucs_name,
-					attrs=["dn", "objectSid"])
-				if not msgs:
+				new_sid = samdb_sids.get(ucs_name.lower())
+				if not new_sid:
 					continue
-				else:
-					obj = msgs[0]
-					new_sid = str(ndr_unpack(security.dom_sid, obj["objectSid"][0]))
-					samba_sid_map[old_sid] = new_sid
+				samba_sid_map[old_sid] = new_sid
 
-					log.debug("Rewriting user %s SID %s to %s" % (old_sambaSID_dict[old_sid], old_sid, new_sid))
-					ml = [("sambaSID", old_sid, new_sid)]
-					self.lo.modify(ucs_object_dn, ml)
+				log.debug("Rewriting user %s SID %s to %s" % (old_sambaSID_dict[old_sid], old_sid, new_sid))
+				sid_changes.append((ucs_object_dn, [(ldap.MOD_REPLACE, "sambaSID", [new_sid])]))
 
 		# Groups
 		ldap_result = self.lo.search(filter="(&(objectClass=sambaGroupMapping)(sambaSID=*))", attr=["cn", "sambaSID", "univentionObjectType"])
@@ -1293,28 +1330,24 @@ class AD_Takeover():
 			if old_sid.startswith(self.old_domainsid):
 				old_sambaSID_dict[old_sid] = ucs_name
 
-				msgs = self.samdb.search(base=self.ucr["samba4/ldap/base"], scope=samba.ldb.SCOPE_SUBTREE,
-					expression="(sAMAccountName=%s)" % ucs_name,
-					attrs=["objectSid"])
-				if not msgs:
+				new_sid = samdb_sids.get(ucs_name.lower())
+				if not new_sid:
 					continue
-				else:
-					obj = msgs[0]
-					new_sid = str(ndr_unpack(security.dom_sid, obj["objectSid"][0]))
-					samba_sid_map[old_sid] = new_sid
+				samba_sid_map[old_sid] = new_sid
+
+				log.debug("Rewriting group '%s' SID %s to %s" % (old_sambaSID_dict[old_sid], old_sid, new_sid))
+				sid_changes.append((ucs_object_dn, [(ldap.MOD_REPLACE, "sambaSID", [new_sid])]))
 
-					log.debug("Rewriting group '%s' SID %s to %s" % (old_sambaSID_dict[old_sid], old_sid, new_sid))
-					ml = [("sambaSID", old_sid, new_sid)]
-					self.lo.modify(ucs_object_dn, ml)
+		self._modify_pipelined(sid_changes, "sambaSID", progress)
 
+		primary_group_changes = []
 		ldap_result = self.lo.search(filter="(sambaPrimaryGroupSID=*)", attr=["sambaPrimaryGroupSID"])
 		for record in ldap_result:
 			(ucs_object_dn, ucs_object_dict) = record
 			old_sid = ucs_object_dict["sambaPrimaryGroupSID"][0]
 			if old_sid.startswith(self.old_domainsid):
 				if old_sid in samba_sid_map:
-					ml = [("sambaPrimaryGroupSID", old_sid, samba_sid_map[old_sid])]
-					self.lo.modify(ucs_object_dn, ml)
+					primary_group_changes.append((ucs_object_dn, [(ldap.MOD_REPLACE, "sambaPrimaryGroupSID", [samba_sid_map[old_sid]])]))
 				else:
 					if old_sid in old_sambaSID_dict:
 						# log.error("Error: Could not find new sambaPrimaryGroupSID for %s" % old_sambaSID_dict[old_sid])
@@ -1322,6 +1355,8 @@ class AD_Takeover():
 					else:
 						log.debug("Warning: Unknown sambaPrimaryGroupSID %s" % old_sid)
 
+		self._modify_pipelined(primary_group_changes, "sambaPrimaryGroupSID", progress)
+
 		# Pre-Create mail domains for all mail and proxyAddresses:
 		msgs = self.samdb.search(base=self.ucr["samba4/ldap/base"], scope=samba.ldb.SCOPE_SUBTREE,
 			expression="(|(mail=*)(proxyAddresses=*))",
@@ -1338,10 +1373,8 @@ class AD_Takeover():
 							# ucr:directory/manager/web/modules/users/user/properties/mailAlternativeAddress/syntax=emailAddress
 							if domainpart not in maildomains:
 								maildomains.append(domainpart)
-		for maildomain in maildomains:
-			returncode = run_and_output_to_log(["univention-directory-manager", "mail/domain", "create", "--ignore_exists", "--position", "cn=domain,cn=mail,%s" % self.ucr["ldap/base"], "--set", "name=%s" % maildomain], log.debug)
-			if returncode != 0:
-				log.error("Creation of UCS mail/domain %s failed. See %s for details." % (maildomain, LOGFILE_NAME,))
+		for maildomain in udmObjectCreator.create_mail_domains(maildomains):
+			log.error("Creation of UCS mail/domain %s failed. See %s for details." % (maildomain, LOGFILE_NAME,))
 
 		# re-create DNS SPN account
 		log.debug("Attempting removal of DNS SPN account in UCS-LDAP, will be recreated later with new password.")
@@ -2314,6 +2347,86 @@ class GroupRenameHandler:
 			self.udm_rename_ucs_defaultGroup(groupdn, new_groupdn)
 
 
+class UDMObjectCreator:
+
+	''' Provides methods for creating missing containers and mail domains in UDM
+	'''
+
+	_CONTAINER_FILTER = "(|(objectClass=organizationalUnit)(objectClass=organizationalRole)(objectClass=univentionBase)(objectClass=domain))"
+
+	def __init__(self, lo):
+		self.lo = lo
+		self.position = univention.admin.uldap.position(self.lo.base)
+		self._modules = {}
+
+	def _get_module(self, udm_type):
+		if udm_type not in self._modules:
+			module = udm_modules.get(udm_type)
+			udm_modules.init(self.lo, self.position, module)
+			self._modules[udm_type] = module
+		return self._modules[udm_type]
+
+	@staticmethod
+	def _normalize_dn(dn):
+		return ldap.dn.dn2str(ldap.dn.str2dn(dn)).lower()
+
+	def udm_create(self, udm_type, position_dn, name):
+		'''Create a single object, returns False if creating it failed.'''
+		module = self._get_module(udm_type)
+		position = univention.admin.uldap.position(self.lo.base)
+		try:
+			position.setDn(position_dn)
+			obj = module.object(None, self.lo, position)
+			obj.open()
+			obj['name'] = name
+			obj.create()
+		except uexceptions.objectExists:
+			log.debug("%s '%s' already exists below %s." % (udm_type, name, position_dn))
+		except uexceptions.base as exc:
+			log.debug("Creation of %s '%s' below %s failed: %s." % (udm_type, name, position_dn, exc))
+			return False
+		else:
+			log.debug("Created %s '%s' below %s." % (udm_type, name, position_dn))
+		return True
+
+	def create_containers(self, containers):
+		'''Create the (udm_type, position_dn, name) containers which do not
+		exist yet, parents before their children.'''
+		existing = set(self._normalize_dn(dn) for dn in self.lo.searchDn(filter=self._CONTAINER_FILTER, base=self.lo.base))
+		rdn_attributes = {'container/ou': 'ou', 'container/cn': 'cn'}
+		missing = []
+		for (udm_type, position_dn, name) in containers:
+			dn = "%s=%s,%s" % (rdn_attributes[udm_type], name, position_dn)
+			if self._normalize_dn(dn) not in existing:
+				missing.append((len(ldap.dn.str2dn(dn)), udm_type, position_dn, name, dn))
+		missing.sort(key=lambda container: container[0])
+
+		log.debug("%d of %d containers are missing in UCS LDAP." % (len(missing), len(containers)))
+		for (depth, udm_type, position_dn, name, dn) in missing:
+			if self._normalize_dn(dn) in existing:
+				continue
+			if self.udm_create(udm_type, position_dn, name):
+				existing.add(self._normalize_dn(dn))
+
+	def create_mail_domains(self, maildomains):
+		'''Create the mail domains which do not exist yet, returns the ones
+		that could not be created.'''
+		position_dn = "cn=domain,cn=mail,%s" % (self.lo.base,)
+		existing = set()
+		for (dn, attrs) in self.lo.search(filter="(objectClass=univentionMailDomainname)", attr=["cn"]):
+			existing.update(value.lower() for value in attrs.get("cn", []))
+
+		failed = []
+		for maildomain in maildomains:
+			if maildomain.lower() in existing:
+				continue
+			if self.udm_create("mail/domain", position_dn, maildomain):
+				existing.add(maildomain.lower())
+			else:
+				failed.append(maildomain)
+		return failed
+
+
 def _connect_ucs(ucr, binddn=None, bindpwd=None):
 	''' Connect to OpenLDAP '''
 
@@ -32,6 +32,7 @@
 # <http://www.gnu.org/licenses/>.
 
 import time
+import threading
 import psutil
 
 from univention.lib.i18n import Translation
@@ -44,6 +45,9 @@ from univention.management.console.modules.sanitizers import PatternSanitizer
 
 _ = Translation('univention-management-console-module-top').translate
 
+SAMPLE_INTERVAL = 2.0
+IDLE_TIMEOUT = 120.0
+
 
 class Process(object):
 
@@ -64,59 +68,133 @@ class Process(object):
 			raise
 
 
+class ProcessSampler(threading.Thread):
+
+	"""Samples all processes in the background. The CPU usage of a process is
+	computed from its CPU time between two consecutive samples. Each row is
+	stored together with the string representation of its values, so that
+	queries only need to filter the latest snapshot. Sampling pauses after
+	IDLE_TIMEOUT seconds without a query."""
+
+	def __init__(self, interval=SAMPLE_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+		threading.Thread.__init__(self, name='ProcessSampler')
+		self.daemon = True
+		self.interval = interval
+		self.idle_timeout = idle_timeout
+		self._lock = threading.Lock()
+		self._wakeup = threading.Event()
+		self._ready = threading.Event()
+		self._stopped = False
+		self._paused = False
+		self._last_access = time.time()
+		self._cpu_times = {}
+		self._details = {}
+		self._rows = []
+
+	def run(self):
+		while not self._stopped:
+			try:
+				self.sample()
+			except Exception as exc:
+				MODULE.error('Sampling processes failed: %s' % (exc,))
+			# snapshot() wakes the sampler if it finds it paused, so both
+			# decide about pausing under the lock
+			with self._lock:
+				self._paused = time.time() - self._last_access > self.idle_timeout
+				if self._paused:
+					self._ready.clear()
+					self._cpu_times = {}
+			if self._paused:
+				MODULE.info('No process queries for %d seconds, pausing the sampler' % (self.idle_timeout,))
+				self._wakeup.wait()
+			else:
+				self._wakeup.wait(self.interval)
+			with self._lock:
+				self._paused = False
+				self._wakeup.clear()
+
+	def stop(self):
+		self._stopped = True
+		self._wakeup.set()
+
+	def sample(self):
+		timestamp = time.time()
+		cpu_times = {}
+		details = {}
+		rows = []
+		for process in psutil.process_iter():
+			process = Process(process)
+			try:
+				key = (process.pid, process.create_time)
+				times = process.get_cpu_times()
+				cpu_time = times.user + times.system
+				mem = process.get_memory_percent()
+				if key in self._details:
+					(username, command) = self._details[key]
+				else:
+					try:
+						username = process.username
+					except KeyError:  # fixed in psutil 2.2.0
+						username = str(process.uids.real)
+					command = ' '.join(process.cmdline or []) or process.name
+			except psutil.NoSuchProcess:
+				continue
+			cpu = 0.0
+			if key in self._cpu_times:
+				(last_timestamp, last_cpu_time) = self._cpu_times[key]
+				if timestamp > last_timestamp:
+					cpu = (cpu_time - last_cpu_time) / (timestamp - last_timestamp) * 100
+			cpu_times[key] = (timestamp, cpu_time)
+			details[key] = (username, command)
+			row = {
+				'user': username,
+				'pid': process.pid,
+				'cpu': cpu,
+				'mem': mem,
+				'command': command,
+			}
+			rows.append((row, dict((category, str(value)) for category, value in row.iteritems())))
+
+		baseline = bool(self._cpu_times)
+		self._cpu_times = cpu_times
+		self._details = details
+		with self._lock:
+			self._rows = rows
+		if baseline:
+			self._ready.set()
+
+	def snapshot(self):
+		"""Return the (row, strings) pairs of the latest sample. Waits for the
+		first CPU measurement if the sampler was paused or just started."""
+		with self._lock:
+			self._last_access = time.time()
+			if self._paused:
+				self._wakeup.set()
+		self._ready.wait(2 * self.interval)
+		with self._lock:
+			return self._rows
+
+
 class Instance(Base):
 
+	def init(self):
+		self.sampler = ProcessSampler()
+		self.sampler.start()
+
+	def destroy(self):
+		self.sampler.stop()
+
 	@sanitize(pattern=PatternSanitizer(default='.*'))
 	def query(self, request):
 		category = request.options.get('category', 'all')
 		pattern = request.options.get('pattern')
 		processes = []
-		for process in psutil.process_iter():
-			process = Process(process)
-			listEntry = {}
-			# Temporary variables; used to calculate cpu percentage
-			listEntry['timestamp'] = []
-			listEntry['cpu_time'] = []
-			listEntry['timestamp'].append(time.time())
-			(user_time, system_time, ) = process.get_cpu_times()
-			listEntry['cpu_time'].append(user_time + system_time)
-			try:
-				username = process.username
-			except KeyError:  # fixed in psutil 2.2.0
-				username = str(process.uids.real)
-			listEntry['user'] = username
-			listEntry['pid'] = process.pid
-			listEntry['cpu'] = 0.0
-			listEntry['mem'] = process.get_memory_percent()
-			listEntry['command'] = ' '.join(process.cmdline or []) or process.name
+		for (row, strings) in self.sampler.snapshot():
 			if category == 'all':
-				for value in listEntry.itervalues():
-					if pattern.match(str(value)):
-						processes.append(listEntry)
-						break
-			else:
-				if pattern.match(str(listEntry[category])):
-					processes.append(listEntry)
-
-		# Calculate correct cpu percentage
-		time.sleep(1)
-		for process_entry in processes:
-			try:
-				process = Process(psutil.Process(process_entry['pid']))
-			except psutil.NoSuchProcess:
-				pass
-			else:
-				process_entry['timestamp'].append(time.time())
-				(user_time, system_time, ) = process.get_cpu_times()
-				process_entry['cpu_time'].append(user_time + system_time)
-
-				elapsed_time = process_entry['timestamp'][1] - process_entry['timestamp'][0]
-				elapsed_cpu_time = process_entry['cpu_time'][1] - process_entry['cpu_time'][0]
-				cpu_percent = (elapsed_cpu_time / elapsed_time) * 100
-				process_entry['cpu'] = cpu_percent
-				# Cleanup request result
-				del process_entry['timestamp']
-				del process_entry['cpu_time']
+				if any(pattern.match(value) for value in strings.itervalues()):
+					processes.append(row)
+			elif pattern.match(strings[category]):
+				processes.append(row)
 
 		request.status = SUCCESS
 		self.finished(request.id, processes)
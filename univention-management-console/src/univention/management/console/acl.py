@@ -62,6 +62,7 @@ from __future__ import absolute_import
 
 import os
 import ldap
+import time
 import cPickle
 import itertools
 import operator
@@ -69,7 +70,7 @@ import traceback
 from fnmatch import fnmatch
 from ldap.filter import filter_format
 
-from .config import ucr
+from .config import ucr, get_int
 from .log import ACL
 
 import univention.admin.handlers.computers.domaincontroller_master as dc_master
@@ -114,6 +115,40 @@ class Rule(dict):
 		return self.fromUser == other.fromUser and self.host == other.host and self.command == other.command and self.flavor == other.flavor and self.options == other.options
 
 
+class _RuleMatcher(object):
+
+	"""Index of ACL rules by their command pattern. Rules with an exact
+	command are stored in a dictionary, rules with a wildcard pattern
+	(e.g. *udm/\**) are stored by the prefix of the pattern. Looking up
+	the rules for a command therefore only checks the prefixes of the
+	command which are known patterns.
+
+	:param rules: iterable of :class:`.Rule`
+	"""
+
+	def __init__(self, rules):
+		self.exact = {}
+		self.prefixes = {}
+		#: cache used by :class:`.ACLs` for lookup results
+		self.cache = {}
+		for rule in rules:
+			command = rule.command
+			if command.endswith('*'):
+				self.prefixes.setdefault(command[:-1], []).append(rule)
+			else:
+				self.exact.setdefault(command, []).append(rule)
+		self.prefix_lengths = sorted(set(len(prefix) for prefix in self.prefixes))
+
+	def candidates(self, command):
+		"""Returns all rules whose command pattern matches the given command"""
+		rules = list(self.exact.get(command, []))
+		for length in self.prefix_lengths:
+			if length > len(command):
+				break
+			rules.extend(self.prefixes.get(command[:length], []))
+		return rules
+
+
 class ACLs(object):
 
 	"""Provides methods to determine the access rights of users to
@@ -137,6 +172,11 @@ class ACLs(object):
 			self.acls = []
 		else:
 			self.acls = map(lambda x: Rule(x), acls)
+		self._reset_matcher()
+
+	def _reset_matcher(self):
+		"""Discards the compiled rules. Must be called whenever the list of rules changes."""
+		self.__matchers = {}
 
 	def _expand_hostlist(self, hostlist):
 		hosts = []
@@ -184,6 +224,7 @@ class ACLs(object):
 				command, options = self.__parse_command(command)
 				new_rule = Rule({'fromUser': fromUser, 'host': host, 'command': command, 'options': options, 'flavor': flavor[0]})
 				self.acls.append(new_rule)
+		self._reset_matcher()
 
 	def __compare_rules(self, rule1, rule2):
 		"""Hacky version of rule comparison"""
@@ -269,6 +310,35 @@ class ACLs(object):
 		# default is to prohibit the command execution
 		return False
 
+	def _get_matcher(self, hostname):
+		try:
+			return self.__matchers[hostname]
+		except KeyError:
+			matcher = self.__matchers[hostname] = _RuleMatcher(rule for rule in self.acls if rule.host == '*' or rule.host == hostname)
+			return matcher
+
+	def _option_patterns(self, command, hostname, flavor):
+		"""Returns the option patterns of all rules matching the command
+		and flavor. *None* is returned if one of these rules does not
+		restrict the options. The result is cached per command, host
+		and flavor."""
+		matcher = self._get_matcher(hostname)
+		key = (command, flavor)
+		try:
+			return matcher.cache[key]
+		except KeyError:
+			pass
+		patterns = []
+		for rule in matcher.candidates(command):
+			if self.__flavor_match(rule.flavor, flavor) == ACLs.MATCH_NONE:
+				continue
+			if not rule.options:
+				patterns = None
+				break
+			patterns.append(rule.options)
+		matcher.cache[key] = patterns
+		return patterns
+
 	def is_command_allowed(self, command, hostname=None, options={}, flavor=None):
 		"""This method verifies if the given command (with options and
 		flavor) is on the named host allowed.
@@ -282,12 +352,10 @@ class ACLs(object):
 		if not hostname:
 			hostname = ucr['hostname']
 
-		# first check the group rules. If the group policy allows the
-		# command there is no need to check the user policy
-		user_rules = [x for x in self.acls if x.fromUser]
-		group_rules = [x for x in self.acls if not x.fromUser]
-
-		return self._is_allowed(user_rules + group_rules, command, hostname, options, flavor)
+		patterns = self._option_patterns(command, hostname, flavor)
+		if patterns is None:
+			return True
+		return any(self.__option_match(pattern, options) == ACLs.MATCH_FULL for pattern in patterns)
 
 	def _dump(self):
 		"""Dumps the ACLs for the user"""
@@ -316,6 +384,7 @@ class ACLs(object):
 				if 'options' not in rule:
 					rule['options'] = {}
 				self.acls.append(rule)
+		self._reset_matcher()
 
 	def _write_to_file(self, username):
 		filename = os.path.join(ACLs.CACHE_DIR, username.replace('/', ''))
@@ -338,31 +407,99 @@ class LDAP_ACLs (ACLs):
 	"""Reads ACLs from LDAP directory for the given username. By
 	inheriting the class :class:`ACLs` the ACL definitions can be cached
 	on the local system. If the LDAP server can not be reached the cache
-	is used if available."""
+	is used if available.
+
+	The ACLs read from LDAP are additionally stored in a validated cache
+	which is used instead of searching the LDAP directory again. The
+	listener module *umc-acl-cache* removes the cache of a user if the
+	group memberships or policy references of the user change or the
+	user is moved or removed and
+	updates the generation file if UMC policies or operation sets are
+	modified, which invalidates all cached ACLs. Cached ACLs expire
+	after *umc/server/acls/cache/ttl* seconds in any case."""
 
 	FROM_USER = True
 	FROM_GROUP = False
 
+	#: defines the directory for the validated cache files
+	VALIDATED_CACHE_DIR = '/var/cache/univention-management-console/ldap-acls'
+	#: the content of this file changes whenever all cached ACLs become invalid
+	GENERATION_FILE = '/var/cache/univention-management-console/ldap-acls.generation'
+
 	def __init__(self, lo, username, ldap_base):
 		ACLs.__init__(self, ldap_base)
 		self.lo = lo
 		self.username = username
 
 		if self.lo:
-			self._read_from_ldap()
-			self._write_to_file(self.username)
+			if not self._read_from_validated_cache(self.username):
+				generation = self._get_generation()
+				if self._read_from_ldap():
+					self._write_to_validated_cache(self.username, generation)
+				self._write_to_file(self.username)
 		else:
 			# read ACLs from file
 			self._read_from_file(self.username)
 
 		self._dump()
 
+	def _get_generation(self):
+		try:
+			with open(LDAP_ACLs.GENERATION_FILE) as fd:
+				return fd.read()
+		except EnvironmentError:
+			return ''
+
+	def _read_from_validated_cache(self, username):
+		ttl = get_int('umc/server/acls/cache/ttl', 3600)
+		if ttl <= 0:
+			return False
+		filename = os.path.join(LDAP_ACLs.VALIDATED_CACHE_DIR, username.replace('/', ''))
+		try:
+			with open(filename, 'r') as fd:
+				cache = cPickle.load(fd)
+		except EnvironmentError:
+			return False
+		except Exception as exc:
+			ACL.warn('Could not load cached ACLs of %r: %s' % (username, exc,))
+			return False
+
+		if cache.get('generation') != self._get_generation():
+			ACL.info('Cached ACLs of %r are outdated' % (username,))
+			return False
+		if not 0 <= time.time() - cache.get('timestamp', 0) < ttl:
+			ACL.info('Cached ACLs of %r are expired' % (username,))
+			return False
+
+		ACL.info('Using cached ACLs of %r' % (username,))
+		self.acls = [Rule(rule) for rule in cache['acls']]
+		self._reset_matcher()
+		return True
+
+	def _write_to_validated_cache(self, username, generation):
+		filename = os.path.join(LDAP_ACLs.VALIDATED_CACHE_DIR, username.replace('/', ''))
+		cache = {
+			'generation': generation,
+			'timestamp': time.time(),
+			'acls': self.acls,
+		}
+		try:
+			tmpfile = '%s.%d' % (filename, os.getpid())
+			file = os.open(tmpfile, os.O_WRONLY | os.O_TRUNC | os.O_CREAT, 0o600)
+			os.write(file, cPickle.dumps(cache))
+			os.close(file)
+			os.rename(tmpfile, filename)
+		except EnvironmentError as exc:
+			ACL.error('Could not write ACL cache file: %s' % (exc,))
+
 	def _get_policy_for_dn(self, dn):
 		policy = self.lo.getPolicies(dn, policies=[], attrs={}, result={}, fixedattrs={})
 
 		return policy.get('umcPolicy', None)
 
 	def _read_from_ldap(self):
+		"""Reads the ACLs from the LDAP directory. Returns False if the
+		ACLs had to be read from the file instead."""
 		# TODO: check for fixed attributes
 		try:
 			userdn = self.lo.searchDn(filter_format('(&(objectClass=person)(uid=%s))', [self.username]), unique=True)[0]
@@ -371,7 +508,7 @@ class LDAP_ACLs (ACLs):
 			ACL.warn('Error reading credentials from LDAP: %s' % (traceback.format_exc(),))
 			# read ACLs from file
 			self._read_from_file(self.username)
-			return
+			return False
 
 		if policy and 'umcPolicyGrantedOperationSet' in policy:
 			for value in policy['umcPolicyGrantedOperationSet']['value']:
@@ -397,3 +534,5 @@ class LDAP_ACLs (ACLs):
 			result.append(g.next())
 
 		self.acls[:] = result
+		self._reset_matcher()
+		return True
@@ -60,5 +60,9 @@ MODULE_COMMAND = '/usr/sbin/univention-management-console-module'
 
 MODULE_DEBUG_LEVEL = get_int('umc/module/debug/level', 2)
 MODULE_INACTIVITY_TIMER = get_int('umc/module/timeout', 600) * 1000
+MODULE_STARTUP_TIMEOUT = get_int('umc/module/startup-timeout', 10) * 1000
+
+MODULE_PREFORK_MODULES = [module.strip() for module in ucr.get('umc/module/prefork/modules', '').split(',') if module.strip()]
+MODULE_PREFORK_SIZE = get_int('umc/module/prefork/size', 1)
 
 SERVER_CONNECTION_TIMEOUT = get_int('umc/server/connection-timeout', 30)
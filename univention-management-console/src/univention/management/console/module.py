@@ -386,9 +386,18 @@ class XML_Definition(ET.ElementTree):
 
 	def get_command(self, name):
 		'''Retrieves details of a command'''
-		for command in self.findall('command'):
-			if command.get('name') == name:
-				return Command(name, command.get('function'), command.get('allow_anonymous', '0').lower() in ('yes', 'true', '1'))
+		command = self._command_elements().get(name)
+		if command is not None:
+			return Command(name, command.get('function'), command.get('allow_anonymous', '0').lower() in ('yes', 'true', '1'))
+
+	def _command_elements(self):
+		try:
+			return self.__commands
+		except AttributeError:
+			self.__commands = {}
+			for command in self.findall('command'):
+				self.__commands.setdefault(command.get('name'), command)
+			return self.__commands
 
 	def __nonzero__(self):
 		module = self.find('module')
@@ -409,6 +418,7 @@ class Manager(dict):
 
 	def __init__(self):
 		dict.__init__(self)
+		self.__anonymous_commands = set()
 
 	def modules(self):
 		'''Returns list of module names'''
@@ -419,6 +429,7 @@ class Manager(dict):
 		before, the method can also be used for reloading'''
 		RESOURCES.info('Loading modules ...')
 		self.clear()
+		self.__anonymous_commands = set()
 		for filename in os.listdir(Manager.DIRECTORY):
 			if not filename.endswith('.xml'):
 				continue
@@ -432,16 +443,14 @@ class Manager(dict):
 						continue
 					# save list of definitions in self
 					self.setdefault(mod.id, []).append(mod)
+					self.__anonymous_commands.update(command for command in mod.commands() if mod.get_command(command).allow_anonymous)
 			except (xml.parsers.expat.ExpatError, ET.ParseError) as exc:
 				RESOURCES.warn('Failed to load module %s: %s' % (filename, exc))
 				continue
 
 	def is_command_allowed(self, acls, command, hostname=None, options={}, flavor=None):
-		for module_xmls in self.values():
-			for module_xml in module_xmls:
-				cmd = module_xml.get_command(command)
-				if cmd and cmd.allow_anonymous:
-					return True
+		if command in self.__anonymous_commands:
+			return True
 		return acls.is_command_allowed(command, hostname, options, flavor)
 
 	def permitted_commands(self, hostname, acls):
@@ -516,6 +525,17 @@ class Manager(dict):
 
 		return modules
 
+	def command_routes(self, modules):
+		'''Creates a dictionary mapping each command of the given
+		modules (as returned by permitted_commands) to the id of the
+		module providing it. Looking up a command in this dictionary is
+		equivalent to :meth:`module_providing`.'''
+		routes = {}
+		for module_id in modules:
+			for cmd in modules[module_id].commands:
+				routes.setdefault(cmd.name, module_id)
+		return routes
+
 	def module_providing(self, modules, command):
 		'''Searches a dictionary of modules (as returned by
 		permitted_commands) for the given command. If found, the id of
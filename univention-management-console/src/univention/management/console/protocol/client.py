@@ -39,7 +39,7 @@ import fcntl
 
 from univention.lib.i18n import Translation
 
-from .message import Request, Response, IncompleteMessageError, ParseError
+from .message import Request, Response, MessageReader, ParseError
 from .definitions import RECV_BUFFER_SIZE, BAD_REQUEST_AUTH_FAILED, SUCCESS, status_description
 from ..log import CORE, PROTOCOL
 from OpenSSL import SSL
@@ -115,7 +115,7 @@ class Client(signals.Provider, Translation):
 		self.__realsocket = self.__socket = None
 		self._init_socket()
 
-		self.__buffer = ''
+		self.__reader = MessageReader(Response)
 		self.__unfinishedRequests = {}
 		self.signal_new('response')
 		self.signal_new('authenticated')
@@ -292,14 +292,15 @@ class Client(signals.Provider, Translation):
 
 	def _recv(self, sock):
 		try:
-			recv = ''
+			chunks = []
 			while True:
-				recv += sock.recv(RECV_BUFFER_SIZE)
+				chunks.append(sock.recv(RECV_BUFFER_SIZE))
 				if self.__ssl and not self.__unix:
 					if not sock.pending():
 						break
 				else:
 					break
+			recv = ''.join(chunks)
 		except socket.error as exc:
 			CORE.warn('Client: _recv: error on socket: %s' % (exc,))
 			recv = None
@@ -323,17 +324,10 @@ class Client(signals.Provider, Translation):
 			notifier.socket_remove(sock)
 			return False
 
-		if self.__buffer:
-			recv = self.__buffer + recv
-			self.__buffer = ''
+		self.__reader.feed(recv)
 		try:
-			while recv:
-				response = Response()
-				recv = response.parse(recv)
+			for response in self.__reader:
 				self._handle(response)
-		except IncompleteMessageError:
-			self.__buffer = recv
-			# waiting for the rest
 		except ParseError as exc:
 			CORE.warn('Client: _recv: error parsing message: %s' % (exc,))
 			self.signal_emit('error', exc)
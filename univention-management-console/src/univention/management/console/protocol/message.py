@@ -204,12 +204,36 @@ class Message(object):
 		if not match:
 			if not nl:
 				raise IncompleteMessageError(_('The message header is not (yet) complete'))
+		self._parse_header(header, match)
+
+		# invalid/missing message body?
+		current_length = len(body)
+		if (not body and self._length) or self._length > current_length:
+			PARSER.info('The message body is not complete: %d of %d bytes' % (current_length, self._length))
+			raise IncompleteMessageError(_('The message body is not (yet) complete'))
+
+		remains = ''
+		if len(body) > self._length:
+			body, remains = body[:self._length], body[self._length:]
+		self._parse_body(body)
+
+		return remains
+
+	def _parse_header(self, header, match=None):
+		"""Parses the header line of a message (without the trailing
+		newline) and sets type, ID, length, MIME type, command and
+		arguments.
+
+		:raises: :class:`.ParseError`
+		"""
+		if match is None:
+			match = Message._header.match(header)
+		if not match:
 			PARSER.error('Error parsing UMCP message header: %r' % (header[:100],))
 			raise ParseError(UMCP_ERR_UNPARSABLE_HEADER, _('Unparsable message header'))
 
 		groups = match.groupdict()
 		self._type = groups['type'] == 'REQUEST' and Message.REQUEST or Message.RESPONSE
-		self._id = groups['id']
 		if 'mimetype' in groups and groups['mimetype']:
 			self.mimetype = groups['mimetype']
 
@@ -224,18 +248,12 @@ class Message(object):
 		if groups.get('arguments'):
 			self.arguments = groups['arguments'].split(' ')
 
-		# invalid/missing message body?
-		current_length = len(body)
-		if (not body and self._length) or self._length > current_length:
-			PARSER.info('The message body is not complete: %d of %d bytes' % (current_length, self._length))
-			raise IncompleteMessageError(_('The message body is not (yet) complete'))
-
-		remains = ''
-		if len(body) > self._length:
-			self.body, remains = body[:self._length], body[self._length:]
-		else:
-			self.body = body
+	def _parse_body(self, body):
+		"""Sets the complete message body. JSON bodies are decoded.
 
+		:raises: :class:`.ParseError`
+		"""
+		self.body = body
 		if self.mimetype == MIMETYPE_JSON:
 			try:
 				self.body = json.loads(self.body)
@@ -246,9 +264,76 @@ class Message(object):
 				PARSER.error('Error parsing UMCP message body: %s' % (exc,))
 				raise ParseError(UMCP_ERR_UNPARSABLE_BODY, _('error parsing UMCP message body'))
 
-		PARSER.info('UMCP %(type)s %(id)s parsed successfully' % groups)
+		PARSER.info('UMCP %s %s parsed successfully' % (self._type == Message.REQUEST and 'REQUEST' or 'RESPONSE', self._id))
 
-		return remains
+
+class MessageReader(object):
+
+	"""Incremental parser for a stream of UMCP messages. Received data is
+	passed to :meth:`feed` and complete messages are fetched by iterating
+	over the reader. The header line of a message is parsed only once;
+	afterwards the chunks of the body are collected until the announced
+	length is reached, so the cost of receiving a message is linear in
+	its size. The JSON body is decoded after it has been received
+	completely.
+
+	If a message can not be parsed a :class:`.ParseError` is raised
+	while iterating. The affected message is available as
+	:attr:`message`. A broken header discards all buffered data as the
+	stream can not be resynchronized.
+
+	:param factory: class used to create new messages (e.g. :class:`.Response`)
+	"""
+
+	def __init__(self, factory=Message):
+		self._factory = factory
+		self._buffer = bytearray()
+		self._scanned = 0
+		self._current = None
+		#: the message which has been parsed most recently (also set if parsing failed)
+		self.message = None
+
+	def feed(self, data):
+		"""Appends received data to the internal buffer"""
+		self._buffer.extend(data)
+
+	def __iter__(self):
+		return self
+
+	def next(self):
+		"""Returns the next complete message.
+
+		:raises: :class:`StopIteration` if no complete message is available (yet)
+		:raises: :class:`.ParseError`
+		"""
+		buf = self._buffer
+		if self._current is None:
+			# search for the end of the header line in newly received data only
+			pos = buf.find('\n', self._scanned)
+			if pos < 0:
+				self._scanned = len(buf)
+				raise StopIteration()
+			header = bytes(buf[:pos])
+			del buf[:pos + 1]
+			self._scanned = 0
+			self.message = self._factory()
+			try:
+				self.message._parse_header(header)
+			except ParseError:
+				del buf[:]
+				raise
+			self._current = self.message
+
+		msg = self._current
+		if len(buf) < msg._length:
+			PARSER.info('The message body is not complete: %d of %d bytes' % (len(buf), msg._length))
+			raise StopIteration()
+
+		body = bytes(buf[:msg._length])
+		del buf[:msg._length]
+		self._current = None
+		msg._parse_body(body)
+		return msg
 
 
 class Request(Message):
@@ -43,7 +43,7 @@ import socket
 import notifier
 
 from .server import Server
-from .message import Response, Message, IncompleteMessageError, ParseError
+from .message import Response, MessageReader, ParseError
 from .definitions import MODULE_ERR_INIT_FAILED, SUCCESS, RECV_BUFFER_SIZE
 
 from univention.management.console.acl import ACLs
@@ -67,11 +67,13 @@ class ModuleServer(Server):
 
 	def __init__(self, socket, module, timeout=300, check_acls=True):
 		self.__name = module
+		self.__socket = socket
 		self.__module = module
 		self.__commands = Module()
 		self.__comm = None
 		self.__client = None
-		self.__buffer = ''
+		self.__initialized = False
+		self.__reader = MessageReader()
 		self.__acls = None
 		self.__timeout = timeout
 		self.__time_remaining = timeout
@@ -123,8 +125,10 @@ class ModuleServer(Server):
 		"""In order to avoid problems when the system time is changed (e.g.,
 		via rdate), we register a timer event that counts down the session
 		timeout second-wise."""
-		# count down the remaining time
-		if not self.__active_requests:
+		# count down the remaining time. A connected but not yet
+		# initialized module process is a spare process held by the UMC
+		# server, it is shut down when the connection is closed.
+		if not self.__active_requests and (self.__comm is None or self.__initialized):
 			self.__time_remaining -= 1
 
 		if self.__time_remaining <= 0:
@@ -142,6 +146,21 @@ class ModuleServer(Server):
 		self.exit()
 		sys.exit(0)
 
+	def announce(self, address):
+		"""Notifies the UMC server listening on the UNIX socket
+		*address* that the module process accepts connections
+
+		:param str address: filename of the UNIX socket
+		"""
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		try:
+			sock.connect(address)
+			sock.sendall(self.__socket)
+		except socket.error as exc:
+			MODULE.error('Could not announce module process to UMC server: %s' % (exc,))
+		finally:
+			sock.close()
+
 	def _client(self, client, socket):
 		self.__comm = socket
 		self.__client = client
@@ -167,32 +186,30 @@ class ModuleServer(Server):
 			# remove socket from notifier
 			return False
 
-		self.__buffer += data
+		self.__reader.feed(data)
 
-		msg = None
-		while self.__buffer:
+		while True:
 			try:
-				msg = Message()
-				self.__buffer = msg.parse(self.__buffer)
-				MODULE.info("Received request %s" % msg.id)
-				self.handle(msg)
-			except IncompleteMessageError:
-				MODULE.info('Failed to parse incomplete message')
+				msg = self.__reader.next()
+			except StopIteration:
 				return True
 			except ParseError as exc:
+				msg = self.__reader.message
 				MODULE.error('Failed to parse message: %s' % (exc,))
 				if not msg.id:
 					msg.id = -1
 				status, message = exc.args
 				from ..error import UMC_Error
 				raise UMC_Error(message, status=status)
+
+			try:
+				MODULE.info("Received request %s" % msg.id)
+				self.handle(msg)
 			except (KeyboardInterrupt, SystemExit, GeneratorExit):
 				raise
 			except:
 				self.error_handling(msg, 'init', *sys.exc_info())
 
-		return True
-
 	def error_handling(self, request, method, etype, exc, etraceback):
 		if self.__handler:
 			self.__handler._Base__requests[request.id] = (request, method)
@@ -287,6 +304,7 @@ class ModuleServer(Server):
 			# 'credentials' it is the initialization of the module
 			# process
 			if 'acls' in msg.options and 'commands' in msg.options and 'credentials' in msg.options:
+				self.__initialized = True
 				try:
 					self.__handler.init()
 				except BaseException:
@@ -47,11 +47,12 @@ from OpenSSL import SSL
 
 from univention.lib.i18n import Translation
 
-from .message import Message, IncompleteMessageError, ParseError
-from .session import SessionHandler
+from .message import MessageReader, ParseError
+from .session import SessionHandler, module_pool, startup_listener
 from .definitions import RECV_BUFFER_SIZE
 
 from ..resources import moduleManager, categoryManager
+from ..locales import I18N_Manager
 from ..log import CORE, CRYPT, RESOURCES
 from ..config import ucr, SERVER_MAX_CONNECTIONS, SERVER_CONNECTION_TIMEOUT
 
@@ -67,6 +68,7 @@ class MagicBucket(object):
 
 	def __init__(self):
 		self.__states = {}
+		module_pool.start(str(I18N_Manager().locale))
 
 	def __del__(self):
 		self.exit()
@@ -104,6 +106,8 @@ class MagicBucket(object):
 			CORE.info('Shutting down connection %s' % sock)
 			self.__states.pop(sock).session.shutdown()
 			notifier.socket_remove(sock)
+		module_pool.shutdown()
+		startup_listener.close()
 
 	def _receive(self, socket):
 		"""Signal callback: Handles incoming data. Processes SSL events
@@ -135,22 +139,19 @@ class MagicBucket(object):
 			state = self.__states[socket]
 		except KeyError:
 			return False
-		state.buffer += data
+		state.reader.feed(data)
 
 		state.reset_connection_timeout()
 
 		try:
-			while state.buffer:
-				msg = Message()
-				state.buffer = msg.parse(state.buffer)
+			for msg in state.reader:
 				state.requests[msg.id] = msg
 				state.session.execute('handle', msg)
 		except (KeyboardInterrupt, SystemExit, SyntaxError):
 			raise  # let the UMC-server crash/exit
-		except IncompleteMessageError as exc:
-			CORE.info('MagicBucket: incomplete message: %s' % (exc,))
 		except ParseError as exc:
 			CORE.process('Parse error: %r' % (exc,))
+			msg = state.reader.message
 			if msg.id is None:
 				# close the connection in case we use could not parse the header
 				self._cleanup(socket)
@@ -405,7 +406,7 @@ class State(object):
 	def __init__(self, client, socket):
 		self.client = client
 		self.socket = socket
-		self.buffer = ''
+		self.reader = MessageReader()
 		self.requests = {}
 		self.resend_queue = []
 		self.session = SessionHandler()
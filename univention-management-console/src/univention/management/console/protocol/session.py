@@ -37,12 +37,13 @@ and the communication with the module processes"""
 import base64
 import ldap
 import os
-import time
+import uuid
 import json
 import traceback
 import gzip
 import re
 import errno
+import socket
 
 import ldap.filter
 
@@ -53,16 +54,16 @@ from notifier import threads
 import univention.admin.uexceptions as udm_errors
 
 from .message import Response, Request, MIMETYPE_JSON
-from .client import Client, NoSocketError
+from .client import Client
 from .version import VERSION
-from .definitions import status_description, SERVER_ERR_MODULE_FAILED, SERVER_ERR_MODULE_DIED
+from .definitions import status_description, SERVER_ERR_MODULE_FAILED, SERVER_ERR_MODULE_DIED, RECV_BUFFER_SIZE
 
 from ..resources import moduleManager, categoryManager
 from ..auth import AuthHandler
 from ..pam import PamAuth, PasswordChangeFailed
 from ..acl import LDAP_ACLs, ACLs
 from ..log import CORE
-from ..config import MODULE_INACTIVITY_TIMER, MODULE_DEBUG_LEVEL, MODULE_COMMAND, ucr
+from ..config import MODULE_INACTIVITY_TIMER, MODULE_STARTUP_TIMEOUT, MODULE_DEBUG_LEVEL, MODULE_COMMAND, MODULE_PREFORK_MODULES, MODULE_PREFORK_SIZE, SERVER_MAX_CONNECTIONS, ucr
 from ..locales import I18N, I18N_Manager
 from ..base import Base
 from ..error import UMC_Error, Unauthorized, BadRequest, NotFound, Forbidden, ServiceUnavailable
@@ -73,9 +74,100 @@ from ..modules.decorators import sanitize, simple_response, allow_get_request
 TEMPUPLOADDIR = '/var/tmp/univention-management-console-frontend'
 
 
+class ModuleStartupListener(object):
+
+	"""Receives the notifications of starting module processes. A module
+	process connects to the UNIX socket of the listener as soon as its
+	own socket accepts connections and sends the filename of its socket.
+	The corresponding :class:`.ModuleProcess` emits the signal *ready*
+	afterwards."""
+
+	SOCKET = '/var/run/univention-management-console/%u-startup.socket'
+
+	def __init__(self):
+		self.__socket = None
+		self.__waiting = {}
+		self.filename = None
+
+	def listen(self):
+		"""Creates the listening socket (if not done already)"""
+		if self.__socket is not None:
+			return
+		filename = self.SOCKET % (os.getpid(),)
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		try:
+			os.unlink(filename)
+		except OSError:
+			pass
+		# ensure that the UNIX socket is only accessable by root
+		old_umask = os.umask(0o077)
+		try:
+			sock.bind(filename)
+		finally:
+			os.umask(old_umask)
+		sock.listen(SERVER_MAX_CONNECTIONS)
+		sock.setblocking(0)
+		notifier.socket_add(sock, self._accept)
+		self.__socket = sock
+		self.filename = filename
+
+	def register(self, process):
+		"""Waits for the startup notification of the given module process"""
+		self.__waiting[process.socket_filename] = process
+
+	def unregister(self, process):
+		self.__waiting.pop(process.socket_filename, None)
+
+	def _accept(self, sock):
+		try:
+			conn, addr = sock.accept()
+		except socket.error as exc:
+			CORE.warn('Cannot accept startup notification of module process: %s' % (exc,))
+			return True
+		conn.setblocking(0)
+		notifier.socket_add(conn, notifier.Callback(self._recv, []))
+		return True
+
+	def _recv(self, conn, chunks):
+		try:
+			data = conn.recv(RECV_BUFFER_SIZE)
+		except socket.error as exc:
+			if exc.errno in (errno.EAGAIN, errno.EINTR):
+				return True
+			data = ''
+		if data:
+			chunks.append(data)
+			return True
+
+		conn.close()
+		filename = ''.join(chunks)
+		process = self.__waiting.pop(filename, None)
+		if process is None:
+			CORE.warn('Received startup notification of unknown module process: %r' % (filename,))
+		else:
+			CORE.info('Module process %s is ready' % (process.name,))
+			process.signal_emit('ready')
+		return False
+
+	def close(self):
+		if self.__socket is None:
+			return
+		notifier.socket_remove(self.__socket)
+		self.__socket.close()
+		self.__socket = None
+		try:
+			os.unlink(self.filename)
+		except OSError:
+			pass
+
+
+startup_listener = ModuleStartupListener()
+
+
 class ModuleProcess(Client):
 
-	"""handles the communication with a UMC module process
+	"""handles the communication with a UMC module process. The signal
+	*ready* is emitted as soon as the module process accepts connections.
 
 	:param str module: name of the module to start
 	:param str debug: debug level as a string
@@ -83,10 +175,11 @@ class ModuleProcess(Client):
 	"""
 
 	def __init__(self, module, debug='0', locale=None):
-		socket = '/var/run/univention-management-console/%u-%lu.socket' % (os.getpid(), long(time.time() * 1000))
+		socket = '/var/run/univention-management-console/%u-%s.socket' % (os.getpid(), uuid.uuid4())
 		# determine locale settings
 		modxmllist = moduleManager[module]
-		args = [MODULE_COMMAND, '-m', module, '-s', socket, '-d', str(debug)]
+		startup_listener.listen()
+		args = [MODULE_COMMAND, '-m', module, '-s', socket, '-d', str(debug), '-r', startup_listener.filename]
 		for modxml in modxmllist:
 			if modxml.notifier:
 				args.extend(['-n', modxml.notifier])
@@ -97,12 +190,9 @@ class ModuleProcess(Client):
 		else:
 			self.__locale = None
 		Client.__init__(self, unix=socket, ssl=False)
+		self.socket_filename = socket
 		self.signal_connect('response', self._response)
-		CORE.process('running: %s' % args)
-		self.__process = popen.RunIt(args, stdout=False)
-		self.__process.signal_connect('killed', self._died)
-		self.__pid = self.__process.start()
-		self._connect_retries = 1
+		self.signal_new('ready')
 		self.signal_new('result')
 		self.signal_new('finished')
 		self.name = module
@@ -110,9 +200,16 @@ class ModuleProcess(Client):
 		self._queued_requests = []
 		self._inactivity_timer = None
 		self._inactivity_counter = 0
+		self._startup_timer = None
+		startup_listener.register(self)
+		CORE.process('running: %s' % args)
+		self.__process = popen.RunIt(args, stdout=False)
+		self.__process.signal_connect('killed', self._died)
+		self.__pid = self.__process.start()
 
 	def __del__(self):
 		CORE.process('ModuleProcess: dying')
+		startup_listener.unregister(self)
 		if self.__process:
 			self.disconnect()
 			self.__process.signal_disconnect('killed', self._died)
@@ -122,6 +219,7 @@ class ModuleProcess(Client):
 
 	def _died(self, pid, status):
 		CORE.process('ModuleProcess: child died')
+		startup_listener.unregister(self)
 		self.signal_emit('finished', pid, status)
 
 	def _response(self, msg):
@@ -136,6 +234,117 @@ class ModuleProcess(Client):
 		"""Returns process ID of module process"""
 		return self.__pid
 
+	@property
+	def locale(self):
+		return self.__locale
+
+
+class ModuleProcessPool(object):
+
+	"""Keeps a number of started module processes for the modules
+	configured in the UCR variable *umc/module/prefork/modules*. These
+	processes have already imported the module code and are connected to
+	the UMC server but have not yet received any credentials or ACLs.
+	When a session opens such a module a spare process is handed over
+	and initialized like a newly started one, then the pool starts a
+	replacement.
+
+	:param list modules: names of the modules to keep processes for
+	:param int size: number of spare processes per module and locale
+	"""
+
+	def __init__(self, modules=MODULE_PREFORK_MODULES, size=MODULE_PREFORK_SIZE):
+		self.modules = set(modules)
+		self.size = size
+		self.__spares = {}
+		self.__starting = {}
+
+	def start(self, locale=None):
+		"""Starts the spare processes for all configured modules"""
+		for module in self.modules:
+			self.refill(module, locale)
+
+	def get(self, module, locale=None):
+		"""Returns a running and connected module process for the given
+		module and locale or None if there is no spare process."""
+		spares = self.__spares.get((module, locale))
+		if not spares:
+			self.refill(module, locale)
+			return None
+		process = spares.pop(0)
+		self._release(process)
+		CORE.info('Handing over pre-started module process %s (pid: %d)' % (module, process.pid()))
+		self.refill(module, locale)
+		return process
+
+	def refill(self, module, locale=None):
+		"""Starts new spare processes until the configured number of processes is available"""
+		if module not in self.modules:
+			return
+		key = (module, locale)
+		while len(self.__spares.get(key, [])) + len(self.__starting.get(key, [])) < self.size:
+			try:
+				process = ModuleProcess(module, debug=MODULE_DEBUG_LEVEL, locale=locale)
+			except (KeyError, EnvironmentError) as exc:
+				CORE.warn('Could not start spare module process for %s: %s' % (module, exc))
+				return
+			process._pool_callbacks = []
+			for signal, callback in (
+				('ready', notifier.Callback(self._ready, process, key)),
+				('finished', notifier.Callback(self._died, process, key)),
+				('closed', notifier.Callback(self._closed, process, key)),
+				('error', notifier.Callback(self._error, process, key)),
+			):
+				process.signal_connect(signal, callback)
+				process._pool_callbacks.append((signal, callback))
+			self.__starting.setdefault(key, []).append(process)
+
+	def _release(self, process):
+		for signal, callback in process._pool_callbacks:
+			process.signal_disconnect(signal, callback)
+		del process._pool_callbacks
+
+	def _ready(self, process, key):
+		try:
+			process.connect()
+		except Exception as exc:
+			CORE.error('Could not connect to spare module process %s: %s' % (process.name, exc))
+			self._remove(process, key)
+			return
+		self.__starting[key].remove(process)
+		process.running = True
+		self.__spares.setdefault(key, []).append(process)
+
+	def _died(self, pid, status, process, key):
+		CORE.warn('Spare module process %s died (pid: %d, status: %r)' % (process.name, pid, status))
+		self._remove(process, key)
+
+	def _closed(self, process, key):
+		self._remove(process, key)
+
+	def _error(self, exc, process, key):
+		CORE.error('Spare module process %s ran into error: %s' % (process.name, exc))
+		self._remove(process, key)
+
+	def _remove(self, process, key):
+		for processes in (self.__starting.get(key, []), self.__spares.get(key, [])):
+			if process in processes:
+				processes.remove(process)
+				self._release(process)
+				process.__del__()
+
+	def shutdown(self):
+		"""Stops all spare processes"""
+		processes = sum(self.__starting.values() + self.__spares.values(), [])
+		self.__starting = {}
+		self.__spares = {}
+		for process in processes:
+			self._release(process)
+			process.__del__()
+
+
+module_pool = ModuleProcessPool()
+
 
 class ProcessorBase(Base):
 
@@ -156,6 +365,7 @@ class ProcessorBase(Base):
 		self.__processes = {}
 		self.__killtimer = {}
 		self.__command_list = None
+		self.__command_routes = {}
 		self.i18n = I18N_Manager()
 		self.i18n['umc-core'] = I18N()
 
@@ -175,6 +385,7 @@ class ProcessorBase(Base):
 	def _reload_acls_and_permitted_commands(self):
 		self._reload_acls()
 		self.__command_list = moduleManager.permitted_commands(ucr['hostname'], self.acls)
+		self.__command_routes = moduleManager.command_routes(self.__command_list)
 
 	def _reload_acls(self):
 		try:
@@ -460,7 +671,7 @@ class ProcessorBase(Base):
 		if msg.arguments:
 			command = msg.arguments[0]
 
-		module_name = moduleManager.module_providing(self.__command_list, command)
+		module_name = self.__command_routes.get(command)
 
 		try:
 			# check if the module exists in the module manager
@@ -483,17 +694,22 @@ class ProcessorBase(Base):
 			if not is_allowed:
 				raise Forbidden()
 			if module_name not in self.__processes:
-				CORE.info('Starting new module process and passing new request to module %s: %s' % (module_name, str(msg._id)))
-				try:
-					mod_proc = ModuleProcess(module_name, debug=MODULE_DEBUG_LEVEL, locale=self.i18n.locale)
-				except EnvironmentError as exc:
-					message = self._('Could not open the module. %s Please try again later.') % {
-						errno.ENOMEM: self._('There is not enough memory available on the server.'),
-						errno.EMFILE: self._('There are too many opened files on the server.'),
-						errno.ENFILE: self._('There are too many opened files on the server.'),
-						errno.ENOSPC: self._('There is not enough free space on the server.')
-					}.get(exc.errno, self._('An unknown operating system error occurred (%s).' % (exc,)))
-					raise ServiceUnavailable(message)
+				locale = str(self.i18n.locale)
+				mod_proc = module_pool.get(module_name, locale)
+				if mod_proc is not None:
+					CORE.info('Passing new request to pre-started module process %s: %s' % (module_name, str(msg._id)))
+				else:
+					CORE.info('Starting new module process and passing new request to module %s: %s' % (module_name, str(msg._id)))
+					try:
+						mod_proc = ModuleProcess(module_name, debug=MODULE_DEBUG_LEVEL, locale=locale)
+					except EnvironmentError as exc:
+						message = self._('Could not open the module. %s Please try again later.') % {
+							errno.ENOMEM: self._('There is not enough memory available on the server.'),
+							errno.EMFILE: self._('There are too many opened files on the server.'),
+							errno.ENFILE: self._('There are too many opened files on the server.'),
+							errno.ENOSPC: self._('There is not enough free space on the server.')
+						}.get(exc.errno, self._('An unknown operating system error occurred (%s).' % (exc,)))
+						raise ServiceUnavailable(message)
 				mod_proc.signal_connect('result', self.result)
 
 				cb = notifier.Callback(self._mod_error, module_name)
@@ -507,8 +723,13 @@ class ProcessorBase(Base):
 
 				self.__processes[module_name] = mod_proc
 
-				cb = notifier.Callback(self._mod_connect, mod_proc, msg)
-				notifier.timer_add(50, cb)
+				if mod_proc.running:
+					self._mod_init(mod_proc, msg)
+				else:
+					cb = notifier.Callback(self._mod_connect, mod_proc, msg)
+					mod_proc.signal_connect('ready', cb)
+					cb = notifier.Callback(self._mod_startup_timeout, mod_proc, msg)
+					mod_proc._startup_timer = notifier.timer_add(MODULE_STARTUP_TIMEOUT, cb)
 			else:
 				proc = self.__processes[module_name]
 				if proc.running:
@@ -519,73 +740,76 @@ class ProcessorBase(Base):
 					CORE.info('Queuing incoming request for module %s that is not yet ready to receive' % module_name)
 					proc._queued_requests.append(msg)
 
+	def _mod_start_failed(self, mod, msg):
+		# inform client
+		res = Response(msg)
+		res.status = SERVER_ERR_MODULE_FAILED  # error connecting to module process
+		res.message = status_description(res.status)
+		self.result(res)
+		# cleanup module
+		mod.signal_disconnect('closed', notifier.Callback(self._socket_died))
+		mod.signal_disconnect('result', notifier.Callback(self.result))
+		mod.signal_disconnect('finished', notifier.Callback(self._mod_died))
+		if mod.name in self.__processes:
+			self.__processes[mod.name].__del__()
+			del self.__processes[mod.name]
+
+	def _mod_startup_timeout(self, mod, msg):
+		"""Callback for a timer event: The module process did not announce that it is ready"""
+		mod._startup_timer = None
+		if not mod.running:
+			CORE.info('Connection to module %s process failed' % mod.name)
+			self._mod_start_failed(mod, msg)
+		return False
+
 	def _mod_connect(self, mod, msg):
-		"""Callback for a timer event: Trying to connect to newly started module process"""
-		def _send_error():
-			# inform client
-			res = Response(msg)
-			res.status = SERVER_ERR_MODULE_FAILED  # error connecting to module process
-			res.message = status_description(res.status)
-			self.result(res)
-			# cleanup module
-			mod.signal_disconnect('closed', notifier.Callback(self._socket_died))
-			mod.signal_disconnect('result', notifier.Callback(self.result))
-			mod.signal_disconnect('finished', notifier.Callback(self._mod_died))
-			if mod.name in self.__processes:
-				self.__processes[mod.name].__del__()
-				del self.__processes[mod.name]
+		"""Callback for the ready signal: Connects to the newly started module process"""
+		if mod._startup_timer is not None:
+			notifier.timer_remove(mod._startup_timer)
+			mod._startup_timer = None
 
 		try:
 			mod.connect()
-		except NoSocketError:
-			if mod._connect_retries > 200:
-				CORE.info('Connection to module %s process failed' % mod.name)
-				_send_error()
-				return False
-			if not mod._connect_retries % 50:
-				CORE.info('No connection to module process yet')
-			mod._connect_retries += 1
-			return True
 		except Exception as exc:
 			CORE.error('Unknown error while trying to connect to module process: %s\n%s' % (exc, traceback.format_exc()))
-			_send_error()
-			return False
-		else:
-			CORE.info('Connected to new module process')
-			mod.running = True
-
-			# send acls, commands, credentials, locale
-			options = {
-				'acls': self.acls.json(),
-				'commands': self.__command_list[mod.name].json(),
-				'credentials': {
-					'auth_type': self.auth_type,
-					'username': self._username,
-					'password': self._password,
-					'user_dn': self._user_dn
-				},
-			}
-			if str(self.i18n.locale):
-				options['locale'] = str(self.i18n.locale)
-
-			# WARNING! This debug message contains credentials!!!
-			# CORE.info('Initialize module process: %s' % (options,))
-
-			req = Request('SET', options=options)
+			self._mod_start_failed(mod, msg)
+			return
+		CORE.info('Connected to new module process')
+		mod.running = True
+		self._mod_init(mod, msg)
+
+	def _mod_init(self, mod, msg):
+		"""Initializes a connected module process and passes the first request"""
+		# send acls, commands, credentials, locale
+		options = {
+			'acls': self.acls.json(),
+			'commands': self.__command_list[mod.name].json(),
+			'credentials': {
+				'auth_type': self.auth_type,
+				'username': self._username,
+				'password': self._password,
+				'user_dn': self._user_dn
+			},
+		}
+		if str(self.i18n.locale):
+			options['locale'] = str(self.i18n.locale)
+
+		# WARNING! This debug message contains credentials!!!
+		# CORE.info('Initialize module process: %s' % (options,))
+
+		req = Request('SET', options=options)
+		mod.request(req)
+
+		# send first command
+		mod.request(msg)
+
+		# send queued request that were received during start procedure
+		for req in mod._queued_requests:
 			mod.request(req)
+		mod._queued_requests = []
 
-			# send first command
-			mod.request(msg)
-
-			# send queued request that were received during start procedure
-			for req in mod._queued_requests:
-				mod.request(req)
-			mod._queued_requests = []
-
-			# watch the module's activity and kill it after X seconds inactivity
-			self.reset_inactivity_timer(mod)
-
-		return False
+		# watch the module's activity and kill it after X seconds inactivity
+		self.reset_inactivity_timer(mod)
 
 	def _mod_inactive(self, module):
 		CORE.info('The module %s is inactive for too long. Sending EXIT request to module' % module.name)
@@ -0,0 +1,108 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# Univention Management Console
+#  benchmark of parsing large UMCP messages received in chunks
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Feeds an upload request of the given size in chunks of the socket
+receive buffer size through :class:`MessageReader` and through the former
+receive loop, which concatenated the buffered data with every chunk and
+parsed it again with :meth:`Message.parse`."""
+
+import time
+from optparse import OptionParser
+
+from univention.management.console.protocol.message import Message, Request, MessageReader, IncompleteMessageError
+from univention.management.console.protocol.definitions import RECV_BUFFER_SIZE
+
+MB = 1024 * 1024
+
+
+def upload(size):
+	request = Request('UPLOAD', options=[{'filename': 'benchmark', 'tmpfile': '/tmp/benchmark', 'content': 'A' * size}])
+	return str(request)
+
+
+def chunked(data, chunk_size):
+	return [data[i:i + chunk_size] for i in xrange(0, len(data), chunk_size)]
+
+
+def read_incremental(chunks):
+	messages = []
+	reader = MessageReader()
+	for chunk in chunks:
+		reader.feed(chunk)
+		messages.extend(reader)
+	return messages
+
+
+def read_concatenated(chunks):
+	messages = []
+	buffer = ''
+	for recv in chunks:
+		if buffer:
+			recv = buffer + recv
+			buffer = ''
+		try:
+			while recv:
+				msg = Message()
+				recv = msg.parse(recv)
+				messages.append(msg)
+		except IncompleteMessageError:
+			buffer = recv
+	return messages
+
+
+def measure(function, chunks):
+	start = time.time()
+	messages = function(chunks)
+	duration = time.time() - start
+	assert len(messages) == 1 and messages[0].command == 'UPLOAD'
+	return duration
+
+
+def main():
+	parser = OptionParser(usage='%prog [options]\n\n' + __doc__)
+	parser.add_option('-s', '--size', type='int', default=50, help='size of the upload in MB [%default]')
+	parser.add_option('-o', '--old-size', type='int', default=50, help='largest upload in MB for the former receive loop, which needs quadratic time; 0 skips it [%default]')
+	parser.add_option('-c', '--chunk-size', type='int', default=RECV_BUFFER_SIZE, help='size of the received chunks in bytes [%default]')
+	options, args = parser.parse_args()
+
+	print '%-10s %12s %12s' % ('upload', 'reader', 'concatenated')
+	sizes = sorted(set([1, 10, options.old_size, options.size]) - set([0]))
+	for size in sizes:
+		chunks = chunked(upload(size * MB), options.chunk_size)
+		incremental = '%11.2fs' % (measure(read_incremental, chunks),)
+		concatenated = '%11.2fs' % (measure(read_concatenated, chunks),) if size <= options.old_size else 'skipped'
+		print '%-10s %12s %12s' % ('%d MB' % (size,), incremental, concatenated)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# Univention Management Console
+# Listener module to invalidate the cached UMC ACLs
+#
+# Copyright 2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+__package__ = ''  # workaround for PEP 366
+import listener
+
+import univention.debug as ud
+import ldap.dn
+import os
+import uuid
+
+name = 'umc-acl-cache'
+description = 'Invalidate the cached UMC ACLs of users'
+filter = '(|(objectClass=umcPolicy)(objectClass=umcOperationSet)(objectClass=univentionGroup)(objectClass=univentionDomainController)(objectClass=univentionMemberServer)(univentionPolicyReference=*)(&(objectClass=person)(uid=*)))'
+attributes = ['umcPolicyGrantedOperationSet', 'umcOperationSetCommand', 'umcOperationSetHost', 'umcOperationSetFlavor', 'uniqueMember', 'univentionPolicyReference', 'univentionService']
+
+# see univention.management.console.acl.LDAP_ACLs
+CACHE_DIR = '/var/cache/univention-management-console/ldap-acls'
+GENERATION_FILE = '/var/cache/univention-management-console/ldap-acls.generation'
+
+
+def _username(dn):
+	try:
+		rdn = ldap.dn.str2dn(dn)[0]
+	except (ldap.DECODING_ERROR, IndexError):
+		return
+	for attr, value, flags in rdn:
+		if attr.lower() == 'uid':
+			return value
+
+
+def invalidate_all():
+	ud.debug(ud.LISTENER, ud.INFO, '%s: invalidating all cached UMC ACLs' % (name,))
+	tmpfile = '%s.tmp' % (GENERATION_FILE,)
+	with open(tmpfile, 'w') as fd:
+		fd.write(str(uuid.uuid4()))
+	os.rename(tmpfile, GENERATION_FILE)
+
+
+def invalidate_user(username):
+	ud.debug(ud.LISTENER, ud.INFO, '%s: invalidating cached UMC ACLs of %r' % (name, username))
+	try:
+		os.unlink(os.path.join(CACHE_DIR, username.replace('/', '')))
+	except OSError:
+		pass
+
+
+def handler(dn, new, old):
+	object_classes = set(new.get('objectClass', []) + old.get('objectClass', []))
+	listener.setuid(0)
+	try:
+		if object_classes & set(['umcPolicy', 'umcOperationSet', 'univentionDomainController', 'univentionMemberServer']):
+			# operation sets may be granted to anyone, hosts affect service: and systemrole: patterns
+			invalidate_all()
+			return
+
+		if 'person' in object_classes and not (new and old):
+			# the ACLs depend on the policies of the containers above the user,
+			# a moved user is removed at the old and added at the new position
+			username = _username(dn)
+			if username:
+				invalidate_user(username)
+			return
+
+		if set(new.get('univentionPolicyReference', [])) != set(old.get('univentionPolicyReference', [])):
+			username = _username(dn) if 'person' in object_classes else None
+			if username:
+				invalidate_user(username)
+			else:
+				# policies of groups and containers apply to many users
+				invalidate_all()
+
+		if 'univentionGroup' in object_classes:
+			for member in set(new.get('uniqueMember', [])) ^ set(old.get('uniqueMember', [])):
+				username = _username(member)
+				if username:
+					invalidate_user(username)
+	finally:
+		listener.unsetuid()
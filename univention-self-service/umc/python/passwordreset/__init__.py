@@ -34,6 +34,7 @@
 import traceback
 import datetime
 import random
+from math import ceil
 import string
 import atexit
 from functools import wraps
@@ -53,6 +54,8 @@ from univention.management.console.modules import UMC_Error
 from univention.management.console.ldap import get_user_connection, get_machine_connection, get_admin_connection, machine_connection
 
 from univention.management.console.modules.passwordreset.tokendb import TokenDB, MultipleTokensInDB
+from univention.management.console.modules.passwordreset.ratelimit import LocalRateLimiter, MemcacheRateLimiter
+from univention.management.console.modules.passwordreset.groupcache import GroupCache
 from univention.management.console.modules.passwordreset.sending import get_plugins as get_sending_plugins
 
 _ = Translation('univention-self-service-passwordreset-umc').translate
@@ -96,40 +99,8 @@ def prevent_denial_of_service(func):
 		h, m = divmod(m, 60)
 		return _("{} hours").format(h + 1)
 
-	def _check_limits(memcache, limits):
-		limit_reached = False
-		_max_wait = datetime.datetime.now()
-		for key, decay, limit in limits:
-			# Not really a "decay", as for that we'd have to store the date for
-			# each request. Then a moving window could be implemented. But
-			# my guess is that we won't need that, so this is simpler.
-			# Continue even if a limit was reached, so that all counters are
-			# incremented.
-			if limit == 0:
-				# limit deactivated by UCR
-				continue
-			try:
-				count = memcache.incr(key)
-			except pylibmc.NotFound:
-				count = 1
-				memcache.set_multi(
-					{
-						key: count,
-						"{}:exp".format(key): datetime.datetime.now() + datetime.timedelta(seconds=decay)
-					},
-					decay
-				)
-			if count > limit:
-				limit_reached = True
-				_max_wait = max(_max_wait, memcache.get("{}:exp".format(key)))
-		return limit_reached, _max_wait
-
 	@wraps(func)
 	def _decorated(self, *args, **kwargs):
-		# check total request limits
-		total_limit_reached, total_max_wait = _check_limits(self.memcache, self.total_limits)
-
-		# check user request limits
 		try:
 			if "username" in kwargs:
 				username = kwargs["username"]
@@ -141,21 +112,20 @@ def prevent_denial_of_service(func):
 			raise
 			# TODO: return func(self, *args, **kwargs) here?!
 
-		if len(username) > MEMCACHED_MAX_KEY - 9:  # "_hour:exp"
+		if len(username) > MEMCACHED_MAX_KEY - 20:  # "_minute:<number of minute>"
 			raise ServiceForbidden()
 
-		username = self.email2username(username)
-		user_limits = [
-			("{}_minute".format(username), 60, self.limit_user_minute),
-			("{}_hour".format(username), 3600, self.limit_user_hour),
-			("{}_day".format(username), 86400, self.limit_user_day)
-		]
-
-		user_limit_reached, user_max_wait = _check_limits(self.memcache, user_limits)
+		# check total and user request limits before anything is looked
+		# up in LDAP, so that floods are rejected right away
+		wait = self.rate_limiter.hit(self.total_limits + self._user_limits(username))
+		if not wait and "@" in username:
+			# count requests for the email address also for its user
+			uid = self.email2username(username)
+			if uid != username:
+				wait = self.rate_limiter.hit(self._user_limits(uid))
 
-		if total_limit_reached or user_limit_reached:
-			time_s = _pretty_time((max(total_max_wait, user_max_wait) - datetime.datetime.now()).seconds)
-			raise ConnectionLimitReached(time_s)
+		if wait:
+			raise ConnectionLimitReached(_pretty_time(int(ceil(wait))))
 
 		return func(self, *args, **kwargs)
 	return _decorated
@@ -207,13 +177,12 @@ class Instance(Base):
 			return
 
 		self.usersmod = None
-		self.groupmod = None
 
 		self.db = TokenDB(MODULE)
-		self.conn = self.db.conn
 		atexit.register(self.db.close_db)
 		if not self.db.table_exists():
 			self.db.create_table()
+		self.db.create_index()
 
 		def ucr_try_int(variable, default):
 			try:
@@ -223,6 +192,8 @@ class Instance(Base):
 				return default
 
 		self.token_validity_period = ucr_try_int("umc/self-service/passwordreset/token_validity_period", 3600)
+		self.db.start_expiry_sweeper(max(TOKEN_VALIDITY_TIME, self.token_validity_period))
+		self.group_cache = GroupCache(ucr_try_int("umc/self-service/passwordreset/blacklist/cache/ttl", 300))
 		self.send_plugins = get_sending_plugins(MODULE.process)
 		self.memcache = pylibmc.Client([MEMCACHED_SOCKET], binary=True)
 
@@ -239,6 +210,18 @@ class Instance(Base):
 			("t:c_day", 86400, limit_total_day)
 		]
 
+		if ucr.get("umc/self-service/passwordreset/limit/backend", "memcached") == "local":
+			self.rate_limiter = LocalRateLimiter()
+		else:
+			self.rate_limiter = MemcacheRateLimiter(self.memcache)
+
+	def _user_limits(self, username):
+		return [
+			("{}_minute".format(username), 60, self.limit_user_minute),
+			("{}_hour".format(username), 3600, self.limit_user_hour),
+			("{}_day".format(username), 86400, self.limit_user_day)
+		]
+
 	@forward_to_master
 	@prevent_denial_of_service
 	@sanitize(
@@ -304,24 +287,10 @@ class Instance(Base):
 		username = user["username"]
 
 		if len(user[plugin.udm_property]) > 0:
-			# found contact info
-			try:
-				token_from_db = self.db.get_one(username=username)
-			except MultipleTokensInDB as e:
-				# this should not happen, delete all tokens
-				MODULE.error("send_token(): {}".format(e))
-				self.db.delete_tokens(username=username)
-				token_from_db = None
-
+			# found contact info, store a new or replace the existing token
 			token = self.create_token(plugin.token_length)
-			if token_from_db:
-				# replace with fresh token
-				MODULE.info("send_token(): Updating token for user '{}'...".format(username))
-				self.db.update_token(username, method, token)
-			else:
-				# store a new token
-				MODULE.info("send_token(): Adding new token for user '{}'...".format(username))
-				self.db.insert_token(username, method, token)
+			MODULE.info("send_token(): Storing token for user '{}'...".format(username))
+			self.db.set_token(username, method, token)
 			try:
 				self.send_message(username, method, user[plugin.udm_property], token)
 			except:
@@ -490,19 +459,13 @@ class Instance(Base):
 
 		# get groups
 		try:
-			filter_s = filter_format("(|(uid=%s)(mailPrimaryAddress=%s))", (username, username))
-			userdn = ldap_connection.search(filter=filter_s)[0][0]
-			groups_dns = self.get_groups(userdn)
-			for group_dn in list(groups_dns):
-				groups_dns.extend(self.get_nested_groups(group_dn))
-			groups_dns = list(set(groups_dns))
-			gr_names = map(str.lower, self.dns_to_groupname(groups_dns))
+			gr_names = self.group_cache.get_user_groups(ldap_connection, username)
 		except IndexError:
 			# no user or no group found
 			return True
 
 		# group blacklist
-		if any(gr in bl_groups for gr in gr_names):
+		if gr_names.intersection(bl_groups):
 			MODULE.info("is_blacklisted({}): match in blacklisted groups".format(username))
 			return True
 
@@ -513,7 +476,7 @@ class Instance(Base):
 			return False
 
 		# group whitelist
-		if any(gr in wh_groups for gr in gr_names):
+		if gr_names.intersection(wh_groups):
 			MODULE.info("is_blacklisted({}): match in whitelisted groups".format(username))
 			return False
 
@@ -521,35 +484,13 @@ class Instance(Base):
 		MODULE.info("is_blacklisted({}): neither black nor white listed".format(username))
 		return bool(wh_users or wh_groups)
 
-	def get_groups(self, userdn):
-		user = self.get_udm_user_dn(userdn=userdn)
-		groups = user["groups"]
-		prim_group = user["primaryGroup"]
-		if prim_group not in groups:
-			groups.append(prim_group)
-		return groups
-
-	def get_nested_groups(self, groupdn):
-		group = self.get_udm_group(groupdn)
-		res = group["nestedGroup"] or []
-		for ng in list(res):
-			res.extend(self.get_nested_groups(ng))
-		return res
-
-	def dns_to_groupname(self, dns):
-		names = list()
-		for groupdn in dns:
-			group = self.get_udm_group(groupdn)
-			names.append(group["name"])
-		return names
-
 	def get_udm_user_dn(self, userdn, admin=False):
 		if admin:
 			lo, po = get_admin_connection()
 		else:
 			lo, po = get_machine_connection()
-		univention.admin.modules.update()
 		if self.usersmod is None:
+			univention.admin.modules.update()
 			self.usersmod = univention.admin.modules.get("users/user")
 			univention.admin.modules.init(lo, po, self.usersmod)
 		user = self.usersmod.object(None, lo, po, userdn)
@@ -564,18 +505,6 @@ class Instance(Base):
 		dn = lo.searchDn(filter=filter_s, base=base)[0]
 		return self.get_udm_user_dn(dn)
 
-	@machine_connection
-	def get_udm_group(self, groupdn, ldap_connection=None, ldap_position=None):
-		# reuse module for recursive lookups by get_nested_groups()
-		if not self.groupmod:
-			univention.admin.modules.update()
-			self.groupmod = univention.admin.modules.get("groups/group")
-			univention.admin.modules.init(ldap_connection, ldap_position, self.groupmod)
-
-		group = self.groupmod.object(None, ldap_connection, ldap_position, groupdn)
-		group.open()
-		return group
-
 	@machine_connection  # TODO: overwrite StringSanitizer and do it there
 	def email2username(self, email, ldap_connection=None, ldap_position=None):
 		if "@" not in email:
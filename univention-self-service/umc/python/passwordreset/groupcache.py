@@ -0,0 +1,108 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# Univention Management Console
+#  resolve the (nested) groups of users
+#
+# Copyright 2015-2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+import time
+
+from ldap.filter import filter_format
+
+
+class GroupCache(object):
+	"""
+	Resolves the group names of a user including the groups nested in
+	them (the `nestedGroup` property of UDM `groups/group`). Instead of
+	opening UDM objects, `cn` and `uniqueMember` of all groups are read
+	with one search and the transitive closure of every group is
+	memorized. Both are dropped after *ttl* seconds.
+	"""
+
+	group_filter = '(&(cn=*)(|(objectClass=univentionGroup)(objectClass=sambaGroupMapping)))'
+
+	def __init__(self, ttl=300):
+		self.ttl = ttl
+		self._expires = 0
+		self._names = {}
+		self._nested = {}
+		self._closures = {}
+
+	def _refresh(self, lo):
+		if time.time() < self._expires:
+			return
+		names = {}
+		members = {}
+		univention_groups = set()
+		for dn, attrs in lo.search(filter=self.group_filter, attr=['cn', 'uniqueMember', 'objectClass']):
+			key = dn.lower()
+			names[key] = attrs['cn'][0]
+			members[key] = [member.lower() for member in attrs.get('uniqueMember', [])]
+			if 'univentionGroup' in attrs.get('objectClass', []):
+				univention_groups.add(key)
+		self._names = names
+		self._nested = dict((dn, [member for member in dn_members if member in univention_groups]) for dn, dn_members in members.iteritems())
+		self._closures = {}
+		self._expires = time.time() + self.ttl
+
+	def _closure(self, dn):
+		try:
+			return self._closures[dn]
+		except KeyError:
+			pass
+		closure = set([dn])
+		todo = [dn]
+		while todo:
+			for nested in self._nested.get(todo.pop(), []):
+				if nested not in closure:
+					closure.add(nested)
+					todo.append(nested)
+		self._closures[dn] = closure = frozenset(closure)
+		return closure
+
+	def get_user_groups(self, lo, username):
+		"""
+		:return: the lower case names of all groups of the user
+		:raises IndexError: if no such user exists
+		"""
+		self._refresh(lo)
+		userdn, attrs = lo.search(filter=filter_format('(|(uid=%s)(mailPrimaryAddress=%s))', (username, username)), attr=['gidNumber'])[0]
+		group_filter = filter_format('(uniqueMember=%s)', (userdn,))
+		if attrs.get('gidNumber'):
+			group_filter = '(|%s%s)' % (group_filter, filter_format('(gidNumber=%s)', (attrs['gidNumber'][0],)))
+		direct_groups = [dn.lower() for dn in lo.searchDn(filter='(&%s%s)' % (self.group_filter, group_filter))]
+		if any(dn not in self._names for dn in direct_groups):
+			# group created after the cache was filled
+			self._expires = 0
+			self._refresh(lo)
+		groups = set()
+		for dn in direct_groups:
+			groups.update(self._closure(dn))
+		return set(self._names[dn].lower() for dn in groups if dn in self._names)
@@ -0,0 +1,152 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# Univention Management Console
+#  limit the number of requests to the password reset service
+#
+# Copyright 2015-2017 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+import time
+from collections import deque
+from threading import Lock
+
+import pylibmc
+
+
+class RateLimiter(object):
+	"""
+	Counts requests in windows of (key, period, limit) tuples. A request
+	is counted in all windows, even if one of them is already exceeded.
+	A limit of 0 deactivates a window.
+	"""
+
+	def hit(self, windows):
+		"""
+		Count a request in all windows.
+
+		:return: seconds until all windows allow requests again, 0 if
+			none of them is exceeded
+		"""
+		raise NotImplementedError()
+
+
+class LocalRateLimiter(RateLimiter):
+	"""
+	Sliding window log kept in the memory of the current process.
+	Only the most recent *limit* requests are stored per window.
+	"""
+
+	cleanup_interval = 1000
+
+	def __init__(self, clock=time.time):
+		self._clock = clock
+		self._hits = {}
+		self._lock = Lock()
+		self._requests = 0
+
+	def hit(self, windows):
+		wait = 0
+		with self._lock:
+			now = self._clock()
+			for key, period, limit in windows:
+				if not limit:
+					continue
+				hits = self._hits.get((key, period))
+				if hits is None or hits.maxlen != limit:
+					hits = self._hits[(key, period)] = deque(hits or (), maxlen=limit)
+				while hits and hits[0] <= now - period:
+					hits.popleft()
+				if len(hits) >= limit:
+					wait = max(wait, hits[0] + period - now)
+				hits.append(now)
+			self._requests += 1
+			if self._requests % self.cleanup_interval == 0:
+				self._cleanup(now)
+		return wait
+
+	def _cleanup(self, now):
+		for (key, period), hits in self._hits.items():
+			if not hits or hits[-1] <= now - period:
+				del self._hits[(key, period)]
+
+
+class MemcacheRateLimiter(RateLimiter):
+	"""
+	Sliding window counter in memcached: every window has a counter per
+	period ("<key>:<number of period>"). The counter of the previous
+	period is weighted by how much of it still overlaps the window.
+	All counters are read with one get_multi(), as neither incr_multi()
+	nor add_multi() return the counts needed to check the limits, and
+	written with one incr_multi(), plus one add_multi() for the counters
+	of windows whose period begins with this request.
+	"""
+
+	def __init__(self, memcache, clock=time.time):
+		self._memcache = memcache
+		self._clock = clock
+
+	def hit(self, windows):
+		now = self._clock()
+		counters = []
+		keys = []
+		for key, period, limit in windows:
+			if not limit:
+				continue
+			number = int(now // period)
+			current = '{}:{}'.format(key, number)
+			previous = '{}:{}'.format(key, number - 1)
+			counters.append((current, previous, period, limit, now - number * period))
+			keys.extend([current, previous])
+		if not counters:
+			return 0
+
+		counts = self._memcache.get_multi(keys)
+		wait = 0
+		existing = []
+		new = {}
+		expiry = 0
+		for current, previous, period, limit, elapsed in counters:
+			if current in counts:
+				existing.append(current)
+			else:
+				new[current] = 1
+				expiry = max(expiry, 2 * period)
+			count = counts.get(current, 0) + 1 + counts.get(previous, 0) * (period - elapsed) / period
+			if count > limit:
+				wait = max(wait, period - elapsed)
+
+		if new:
+			# another process may have started a counter in the meantime
+			existing.extend(self._memcache.add_multi(new, time=expiry))
+		if existing:
+			try:
+				self._memcache.incr_multi(existing)
+			except pylibmc.NotFound:
+				pass  # expired in the meantime
+		return wait
@@ -31,59 +31,105 @@
 # /usr/share/common-licenses/AGPL-3; if not, see
 # <http://www.gnu.org/licenses/>.
 
+
 import traceback
 import datetime
+import sqlite3
+from contextlib import contextmanager
+from threading import Thread, Event, Lock
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.extensions
+import psycopg2.pool
 
 DB_USER = "selfservice"
 DB_NAME = "selfservice"
 DB_SECRETS_FILE = "/etc/self-service-db.secret"
+DB_POOL_SIZE = 4
+COLUMNS = ("id", "username", "method", "timestamp", "token")
 
 
 class MultipleTokensInDB(Exception):
 	pass
 
 
-class TokenDB(object):
+class BaseTokenDB(object):
+	"""
+	Storage of tokens. The SQL of all statements is fixed, every "{}"
+	is a parameter whose placeholder depends on the backend. Lookups by
+	arbitrary columns get a statement per combination of columns.
+	"""
+
+	IntegrityError = None
+	statements = {
+		"insert": ("INSERT INTO tokens (username, method, timestamp, token) VALUES ({}, {}, {}, {})", ("username", "method", "timestamp", "token")),
+		"update": ("UPDATE tokens SET method={}, timestamp={}, token={} WHERE username={}", ("method", "timestamp", "token", "username")),
+		"expire": ("DELETE FROM tokens WHERE timestamp < {}", ("timestamp",)),
+	}
 
 	def __init__(self, logger):
 		self.logger = logger
-		self.conn = self.open_db()
+		self._sweeper = None
+		self._stop_sweeper = Event()
+		self.open_db()
+
+	@contextmanager
+	def _cursor(self):
+		"""yields a cursor, commits afterwards or rolls back on errors"""
+		raise NotImplementedError()
+
+	def _execute(self, cur, name, sql, keys, data):
+		raise NotImplementedError()
+
+	def _run(self, cur, name, data):
+		sql, keys = self.statements[name]
+		self._execute(cur, name, sql, keys, data)
+
+	def _run_where(self, cur, action, data):
+		keys = tuple(sorted(data))
+		if not keys or any(key not in COLUMNS for key in keys):
+			raise ValueError("Invalid columns: {!r}".format(keys))
+		name = "{}_by_{}".format(action, "_".join(keys))
+		sql = "{} FROM tokens WHERE {}".format("SELECT *" if action == "select" else "DELETE", " AND ".join("{}={{}}".format(key) for key in keys))
+		self._execute(cur, name, sql, keys, data)
 
 	def insert_token(self, username, method, token):
-		sql = "INSERT INTO tokens (username, method, timestamp, token) VALUES (%(username)s, %(method)s, %(ts)s, %(token)s);"
-		data = {"username": username, "method": method, "ts": datetime.datetime.now(), "token": token}
-		cur = self.conn.cursor()
-		cur.execute(sql, data)
-		self.conn.commit()
-		cur.close()
+		data = {"username": username, "method": method, "timestamp": datetime.datetime.now(), "token": token}
+		with self._cursor() as cur:
+			self._run(cur, "insert", data)
 
 	def update_token(self, username, method, token):
-		sql = "UPDATE tokens SET method=%(method)s, timestamp=%(ts)s, token=%(token)s WHERE username=%(username)s;"
-		data = {"username": username, "method": method, "ts": datetime.datetime.now(), "token": token}
-		cur = self.conn.cursor()
-		cur.execute(sql, data)
-		self.conn.commit()
-		cur.close()
+		data = {"username": username, "method": method, "timestamp": datetime.datetime.now(), "token": token}
+		with self._cursor() as cur:
+			self._run(cur, "update", data)
+
+	def set_token(self, username, method, token):
+		"""insert the token or replace the one already stored for the user"""
+		data = {"username": username, "method": method, "timestamp": datetime.datetime.now(), "token": token}
+		try:
+			with self._cursor() as cur:
+				self._run(cur, "update", data)
+				if cur.rowcount == 0:
+					self._run(cur, "insert", data)
+		except self.IntegrityError:
+			# inserted by another process in the meantime
+			self.update_token(username, method, token)
 
 	def delete_tokens(self, **kwargs):
-		sql = "DELETE FROM tokens WHERE "
-		sql += " AND ".join(["{0}=%({0})s".format(key) for key in kwargs.keys()])
-		cur = self.conn.cursor()
-		cur.execute(sql, kwargs)
-		self.conn.commit()
-		cur.close()
+		with self._cursor() as cur:
+			self._run_where(cur, "delete", kwargs)
+
+	def delete_expired(self, max_age):
+		data = {"timestamp": datetime.datetime.now() - datetime.timedelta(seconds=max_age)}
+		with self._cursor() as cur:
+			self._run(cur, "expire", data)
+			return cur.rowcount
 
 	def get_all(self, **kwargs):
-		sql = "SELECT * FROM tokens WHERE "
-		sql += " AND ".join(["{0}=%({0})s".format(key) for key in kwargs.keys()])
-		cur = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-		cur.execute(sql, kwargs)
-		rows = cur.fetchall()
-		cur.close()
-		return rows
+		with self._cursor() as cur:
+			self._run_where(cur, "select", kwargs)
+			return cur.fetchall()
 
 	def get_one(self, **kwargs):
 		rows = self.get_all(**kwargs)
@@ -94,19 +140,108 @@ class TokenDB(object):
 		else:
 			return None
 
+	def start_expiry_sweeper(self, max_age, interval=600):
+		"""delete tokens older than max_age seconds every interval seconds in a background thread"""
+		def _sweep():
+			while not self._stop_sweeper.is_set():
+				try:
+					deleted = self.delete_expired(max_age)
+				except Exception:
+					self.logger.error("expiry_sweeper(): Error deleting expired tokens: {}".format(traceback.format_exc()))
+				else:
+					if deleted > 0:
+						self.logger.info("expiry_sweeper(): Deleted {} expired token(s).".format(deleted))
+				self._stop_sweeper.wait(interval)
+		self._sweeper = Thread(target=_sweep, name="TokenDB expiry sweeper")
+		self._sweeper.daemon = True
+		self._sweeper.start()
+
+	def stop_expiry_sweeper(self):
+		self._stop_sweeper.set()
+		if self._sweeper is not None:
+			self._sweeper.join()
+			self._sweeper = None
+
+	def open_db(self):
+		raise NotImplementedError()
+
+	def close_db(self):
+		raise NotImplementedError()
+
+	def table_exists(self):
+		raise NotImplementedError()
+
+	def create_table(self):
+		raise NotImplementedError()
+
+	def create_index(self):
+		raise NotImplementedError()
+
+
+class _PreparingConnection(psycopg2.extensions.connection):
+	"""remembers the statements prepared in its session"""
+
+	def __init__(self, *args, **kwargs):
+		super(_PreparingConnection, self).__init__(*args, **kwargs)
+		self.prepared = set()
+
+
+class TokenDB(BaseTokenDB):
+	"""
+	Tokens in PostgreSQL. Connections are taken from a pool and every
+	statement is prepared once per connection.
+	"""
+
+	IntegrityError = psycopg2.IntegrityError
+
+	@contextmanager
+	def _cursor(self):
+		conn = self.pool.getconn()
+		try:
+			cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+			try:
+				yield cur
+				conn.commit()
+			except BaseException:
+				conn.rollback()
+				raise
+			finally:
+				cur.close()
+		except (psycopg2.OperationalError, psycopg2.InterfaceError):
+			# connection lost, do not hand it out again
+			self.pool.putconn(conn, close=True)
+			raise
+		except BaseException:
+			self.pool.putconn(conn)
+			raise
+		else:
+			self.pool.putconn(conn)
+
+	def _execute(self, cur, name, sql, keys, data):
+		name = "tokens_{}".format(name)
+		if name not in cur.connection.prepared:
+			cur.execute("PREPARE {} AS {}".format(name, sql.format(*["${}".format(i + 1) for i in range(len(keys))])))
+			cur.connection.prepared.add(name)
+		cur.execute("EXECUTE {} ({})".format(name, ", ".join(["%s"] * len(keys))), [data[key] for key in keys])
+
 	def create_table(self):
 		self.logger.info("db_create_table(): Creating table 'tokens' and constraints...")
-		cur = self.conn.cursor()
-		cur.execute("""CREATE TABLE tokens
+		with self._cursor() as cur:
+			cur.execute("""CREATE TABLE tokens
 (id SERIAL PRIMARY KEY NOT NULL,
 username VARCHAR(255) NOT NULL,
 method VARCHAR(255) NOT NULL,
 timestamp TIMESTAMP NOT NULL,
 token VARCHAR(255) NOT NULL);""")
-		cur.execute("ALTER TABLE tokens ADD CONSTRAINT unique_id UNIQUE (id);")
-		cur.execute("ALTER TABLE tokens ADD CONSTRAINT unique_username UNIQUE (username);")
-		self.conn.commit()
-		cur.close()
+			cur.execute("ALTER TABLE tokens ADD CONSTRAINT unique_id UNIQUE (id);")
+			cur.execute("ALTER TABLE tokens ADD CONSTRAINT unique_username UNIQUE (username);")
+
+	def create_index(self):
+		with self._cursor() as cur:
+			cur.execute("SELECT * FROM pg_catalog.pg_indexes WHERE tablename='tokens' AND indexname='tokens_timestamp'")
+			if not cur.fetchall():
+				self.logger.info("db_create_index(): Creating index on timestamp of table 'tokens'...")
+				cur.execute("CREATE INDEX tokens_timestamp ON tokens (timestamp);")
 
 	def open_db(self):
 		try:
@@ -116,22 +251,86 @@ token VARCHAR(255) NOT NULL);""")
 			self.logger.error("db_open(): Could not read {}: {}".format(DB_SECRETS_FILE, e))
 			raise
 		try:
-			conn = psycopg2.connect("dbname={db_name} user={db_user} host='localhost' password='{db_pw}'".format(
-				db_name=DB_NAME, db_user=DB_USER, db_pw=password))
+			self.pool = psycopg2.pool.ThreadedConnectionPool(
+				1, DB_POOL_SIZE,
+				"dbname={db_name} user={db_user} host='localhost' password='{db_pw}'".format(db_name=DB_NAME, db_user=DB_USER, db_pw=password),
+				connection_factory=_PreparingConnection)
+			conn = self.pool.getconn()
 			self.logger.info("db_open(): Connected to database '{}' on server with version {} using protocol version {}.".format(
 				DB_NAME, conn.server_version, conn.protocol_version))
-			return conn
+			self.pool.putconn(conn)
 		except:
 			self.logger.error("db_open(): Error connecting to database '{}': {}".format(DB_NAME, traceback.format_exc()))
 			raise
 
 	def close_db(self):
+		self.stop_expiry_sweeper()
+		self.pool.closeall()
+		self.logger.info("close_database(): closed database connections.")
+
+	def table_exists(self):
+		with self._cursor() as cur:
+			cur.execute("SELECT * FROM pg_catalog.pg_tables WHERE tablename='tokens'")
+			rows = cur.fetchall()
+		return len(rows) > 0
+
+
+class SQLiteTokenDB(BaseTokenDB):
+	"""
+	Tokens in a SQLite database, e.g. for testing without PostgreSQL.
+	The sqlite3 module caches the prepared statements itself, the single
+	connection is shared between threads.
+	"""
+
+	IntegrityError = sqlite3.IntegrityError
+
+	def __init__(self, logger, filename=":memory:"):
+		self.filename = filename
+		self._lock = Lock()
+		super(SQLiteTokenDB, self).__init__(logger)
+
+	@contextmanager
+	def _cursor(self):
+		with self._lock:
+			cur = self.conn.cursor()
+			try:
+				yield cur
+				self.conn.commit()
+			except BaseException:
+				self.conn.rollback()
+				raise
+			finally:
+				cur.close()
+
+	def _execute(self, cur, name, sql, keys, data):
+		cur.execute(sql.format(*["?"] * len(keys)), [data[key] for key in keys])
+
+	def create_table(self):
+		self.logger.info("db_create_table(): Creating table 'tokens'...")
+		with self._cursor() as cur:
+			cur.execute("""CREATE TABLE tokens
+(id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+username VARCHAR(255) NOT NULL UNIQUE,
+method VARCHAR(255) NOT NULL,
+timestamp TIMESTAMP NOT NULL,
+token VARCHAR(255) NOT NULL);""")
+
+	def create_index(self):
+		with self._cursor() as cur:
+			cur.execute("CREATE INDEX IF NOT EXISTS tokens_timestamp ON tokens (timestamp);")
+
+	def open_db(self):
+		self.conn = sqlite3.connect(self.filename, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+		self.conn.row_factory = sqlite3.Row
+		self.logger.info("db_open(): Opened SQLite database '{}'.".format(self.filename))
+
+	def close_db(self):
+		self.stop_expiry_sweeper()
 		self.conn.close()
 		self.logger.info("close_database(): closed database connection.")
 
 	def table_exists(self):
-		cur = self.conn.cursor()
-		cur.execute("SELECT * FROM pg_catalog.pg_tables WHERE tablename='tokens'")
-		rows = cur.fetchall()
-		cur.close()
+		with self._cursor() as cur:
+			cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='tokens'")
+			rows = cur.fetchall()
 		return len(rows) > 0